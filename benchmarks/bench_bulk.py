@@ -0,0 +1,76 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+from src.bulk import export_notes, import_notes
+
+from .common import TemporaryVault, markdown_corpus
+
+
+def write_corpus(directory, count, words):
+    source = os.path.join(directory, "source")
+    os.makedirs(source)
+    archive_path = os.path.join(directory, "source.zip")
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for title, content in markdown_corpus(count, words):
+            data = content.encode()
+            with open(os.path.join(source, title + ".md"), "wb") as file:
+                file.write(data)
+            archive.writestr(title + ".md", data)
+    return source, archive_path
+
+
+def rate(count, function, *arguments):
+    started = time.perf_counter()
+    function(*arguments)
+    return count / (time.perf_counter() - started)
+
+
+def run(count, words, workers):
+    directory = tempfile.mkdtemp(prefix="hiddenote-bench-")
+    try:
+        source, archive_path = write_corpus(directory, count, words)
+        results = {}
+        for name, path in (("import directory", source), ("import zip", archive_path)):
+            with TemporaryVault() as vault:
+                results[name] = rate(
+                    count, import_notes, vault.db_manager, path, None, workers
+                )
+                if name == "import zip":
+                    for export_name, destination in (
+                        ("export directory", os.path.join(directory, "out")),
+                        ("export zip", os.path.join(directory, "out.zip")),
+                    ):
+                        results[export_name] = rate(
+                            count,
+                            export_notes,
+                            vault.db_manager,
+                            destination,
+                            None,
+                            workers,
+                        )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{count} notes of ~{words} words")
+    for name, notes_per_second in results.items():
+        print(f"  {name:18} {notes_per_second:8.0f} notes/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Notes per second for bulk import and export through "
+        "src.bulk on a generated markdown corpus."
+    )
+    parser.add_argument("--notes", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--workers", type=int)
+    options = parser.parse_args()
+    run(options.notes, options.words, options.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import time
+
+from src.migrations import MigrationRunner
+
+from .common import TemporaryVault, fill_vault, format_rate, throughput
+
+
+SIZES = [1024, 64 * 1024, 1024 * 1024]
+
+
+def cipher_table(cipher, rounds):
+    print(f"  {'size':>8} {'format':7} {'stored/plain':>12} {'encrypt':>10} {'decrypt':>10}")
+    for size in SIZES:
+        payloads = [os.urandom(size) for _ in range(max(1, (4 << 20) // size))]
+        formats = [
+            ("fernet", cipher.fernet.encrypt, cipher.fernet.decrypt),
+            ("aes-gcm", cipher.encrypt, cipher.decrypt),
+        ]
+        for name, encrypt, decrypt in formats:
+            blobs = [encrypt(payload) for payload in payloads]
+            ratio = len(blobs[0]) / size
+            encrypt_rate = throughput(encrypt, payloads, rounds)
+            decrypt_rate = throughput(decrypt, blobs, rounds) * size / len(blobs[0])
+            print(
+                f"  {size // 1024:>6}Ki {name:7} {ratio:12.3f} "
+                f"{format_rate(encrypt_rate):>10} {format_rate(decrypt_rate):>10}"
+            )
+
+
+def make_legacy(db_manager):
+    conn = db_manager.conn
+    with db_manager.lock, conn:
+        for table in ("notes", "note_chunks"):
+            rows = conn.execute(f"SELECT id, content FROM {table}").fetchall()
+            conn.executemany(
+                f"UPDATE {table} SET content = ? WHERE id = ?",
+                [
+                    (
+                        db_manager.cipher_suite.fernet.encrypt(
+                            db_manager.cipher_suite.decrypt(blob)
+                        ),
+                        row_id,
+                    )
+                    for row_id, blob in rows
+                ],
+            )
+        conn.execute("DELETE FROM migration_progress")
+
+
+def timed_loads(db_manager, titles):
+    db_manager.forget_notes(titles)
+    started = time.perf_counter()
+    for title in titles:
+        db_manager.load_note(title)
+    return (time.perf_counter() - started) / len(titles)
+
+
+def vault_table(notes, words):
+    with TemporaryVault() as vault:
+        db_manager = vault.db_manager
+        fill_vault(db_manager, notes, words)
+        titles = [f"note {number:06d}" for number in range(notes)]
+        aead_load = timed_loads(db_manager, titles)
+
+        make_legacy(db_manager)
+        legacy_load = timed_loads(db_manager, titles)
+
+        started = time.perf_counter()
+        MigrationRunner(db_manager, throttle=0).run()
+        migration = time.perf_counter() - started
+        migrated_load = timed_loads(db_manager, titles)
+
+    print(f"  load_note, Fernet rows        {legacy_load * 1e6:8.0f} us")
+    print(f"  load_note, AES-GCM rows       {aead_load * 1e6:8.0f} us")
+    print(f"  load_note, after migration    {migrated_load * 1e6:8.0f} us")
+    print(
+        f"  background migration          {notes / migration:8.0f} notes/s "
+        "(includes the search-index check)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Legacy Fernet against the AES-GCM note format: blob size "
+        "and throughput of NoteCipher, then DatabaseManager.load_note and the "
+        "online migration on a vault of generated notes."
+    )
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3)
+    options = parser.parse_args()
+
+    with TemporaryVault() as vault:
+        print("NoteCipher, random data")
+        cipher_table(vault.db_manager.cipher_suite, options.rounds)
+    print(f"DatabaseManager, {options.notes} notes of ~{options.words} words")
+    vault_table(options.notes, options.words)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import time
+
+from .common import TemporaryVault, format_rate, markdown_corpus
+
+
+SETTINGS = [
+    ("none", 0),
+    ("zlib", 1),
+    ("zlib", 6),
+    ("zlib", 9),
+    ("bz2", 9),
+    ("lzma", 6),
+]
+
+
+def load_corpus(source, limit):
+    if source is None:
+        return [content for _, content in markdown_corpus(limit)]
+
+    corpus = []
+    for root, _, files in os.walk(source):
+        for filename in sorted(files):
+            if not filename.lower().endswith(".md"):
+                continue
+            with open(os.path.join(root, filename), encoding="utf-8") as file:
+                try:
+                    corpus.append(file.read())
+                except UnicodeDecodeError:
+                    continue
+            if len(corpus) >= limit:
+                return corpus
+    return corpus
+
+
+def best_time(function, items, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(corpus, rounds):
+    plain_size = sum(len(content.encode()) for content in corpus)
+    print(f"{len(corpus)} notes, {plain_size / 1e6:.1f} MB of plaintext")
+    print(f"  {'codec':8} {'stored/plain':>12} {'encrypt':>10} {'decrypt':>10}")
+    for codec, level in SETTINGS:
+        with TemporaryVault(compression_codec=codec, compression_level=level) as vault:
+            db_manager = vault.db_manager
+            blobs = [db_manager.encrypt_content(content) for content in corpus]
+            stored = sum(len(blob) for blob in blobs)
+            encrypt = best_time(db_manager.encrypt_content, corpus, rounds)
+            decrypt = best_time(db_manager.decrypt_content, blobs, rounds)
+        name = codec if codec == "none" else f"{codec}-{level}"
+        print(
+            f"  {name:8} {stored / plain_size:12.3f} "
+            f"{format_rate(plain_size / encrypt):>10} "
+            f"{format_rate(plain_size / decrypt):>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stored size and DatabaseManager.encrypt_content/"
+        "decrypt_content throughput for each compression codec and level."
+    )
+    parser.add_argument(
+        "--source",
+        help="directory of .md files to use as the corpus "
+        "(default: generated markdown notes)",
+    )
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3)
+    options = parser.parse_args()
+    run(load_corpus(options.source, options.limit), options.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from src.database import DatabaseManager
+
+from .common import PASSWORD, markdown_corpus
+
+
+def open_vault(path):
+    db_manager = DatabaseManager(path)
+    try:
+        db_manager.setup_encryption(PASSWORD, background=False)
+    except TypeError:
+        db_manager.setup_encryption(PASSWORD)
+    return db_manager
+
+
+def flush(db_manager):
+    if hasattr(db_manager, "flush"):
+        db_manager.flush()
+
+
+def close(db_manager):
+    if hasattr(db_manager, "close"):
+        db_manager.close()
+
+
+def timed(function, arguments):
+    started = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - started) / len(arguments)
+
+
+def run(notes, samples, words):
+    directory = tempfile.mkdtemp(prefix="hiddenote-bench-")
+    path = os.path.join(directory, "bench.db")
+    try:
+        db_manager = open_vault(path)
+        started = time.perf_counter()
+        for title, content in markdown_corpus(notes, words):
+            db_manager.save_note(title, content)
+        flush(db_manager)
+        fill_seconds = time.perf_counter() - started
+        close(db_manager)
+
+        titles = random.Random(2).sample(
+            [f"note {number:06d}" for number in range(notes)], samples
+        )
+        db_manager = open_vault(path)
+        results = {
+            "load_note (first read)": timed(db_manager.load_note, titles),
+            "load_note (repeat read)": timed(db_manager.load_note, titles),
+        }
+
+        def save(title):
+            content = db_manager.load_note(title)
+            db_manager.save_note(title, content + f"edited {time.time()}\n")
+            flush(db_manager)
+
+        results["save_note + flush (one line added)"] = timed(save, titles)
+        started = time.perf_counter()
+        listed = len(db_manager.get_all_notes())
+        results[f"get_all_notes ({listed} rows)"] = time.perf_counter() - started
+        close(db_manager)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{notes} notes of ~{words} words, filled in {fill_seconds:.1f} s")
+    for name, seconds in results.items():
+        print(f"  {name:44} {seconds * 1e6:10.0f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-call latency of the common DatabaseManager calls. "
+        "The script only uses calls that every revision has, so it can be "
+        "copied into an older checkout to get before/after numbers."
+    )
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--words", type=int, default=100)
+    options = parser.parse_args()
+    run(options.notes, options.samples, options.words)
+
+
+if __name__ == "__main__":
+    main()
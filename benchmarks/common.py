@@ -0,0 +1,84 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from src.database import DatabaseManager
+
+
+PASSWORD = "benchmark"
+WORDS = (
+    "note meeting project draft idea list todo review release plan budget "
+    "design server client query index cache vault sync backup export import "
+    "search title summary weekly monthly follow up owner status blocked done"
+).split()
+
+
+class TemporaryVault:
+    def __init__(self, **options):
+        self.options = options
+        self.directory = None
+        self.db_manager = None
+
+    def __enter__(self):
+        self.directory = tempfile.mkdtemp(prefix="hiddenote-bench-")
+        self.db_manager = open_vault(self.path, **self.options)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.db_manager is not None:
+            self.db_manager.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, "bench.db")
+
+
+def open_vault(path, **options):
+    db_manager = DatabaseManager(path, **options)
+    db_manager.setup_encryption(PASSWORD, background=False)
+    return db_manager
+
+
+def markdown_note(rng, words=300):
+    lines = [f"# {' '.join(rng.choices(WORDS, k=4)).title()}", ""]
+    remaining = words
+    while remaining > 0:
+        count = min(remaining, rng.randint(8, 24))
+        remaining -= count
+        prefix = rng.choice(("", "", "- ", "- [ ] ", "1. "))
+        lines.append(prefix + " ".join(rng.choices(WORDS, k=count)))
+        if rng.random() < 0.15:
+            lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def markdown_corpus(count, words=300, seed=1):
+    rng = random.Random(seed)
+    for number in range(count):
+        yield f"note {number:06d}", markdown_note(rng, words)
+
+
+def fill_vault(db_manager, count, words=300):
+    for title, content in markdown_corpus(count, words):
+        db_manager.save_note(title, content)
+    db_manager.flush()
+
+
+def throughput(function, payloads, rounds=3):
+    total = sum(len(payload) for payload in payloads)
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for payload in payloads:
+            function(payload)
+        best = min(best, time.perf_counter() - started)
+    return total / best
+
+
+def format_rate(bytes_per_second):
+    if bytes_per_second >= 1e9:
+        return f"{bytes_per_second / 1e9:.1f} GB/s"
+    return f"{bytes_per_second / 1e6:.0f} MB/s"
@@ -0,0 +1,88 @@
+import os
+
+from .bulk import export_notes, import_notes
+from .database import CATALOG_PAGE_SIZE, DatabaseManager
+from .sync import SyncEngine
+from .vaults import VaultRegistry
+
+
+class Vault:
+    def __init__(self, db_manager, name=None):
+        self.db_manager = db_manager
+        self.name = name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.db_manager.conn is not None:
+            self.db_manager.close()
+
+    def iter_notes(self, page_size=CATALOG_PAGE_SIZE):
+        after = None
+        while True:
+            notes = self.db_manager.get_notes_page(after=after, limit=page_size)
+            yield from notes
+            if len(notes) < page_size:
+                return
+            title, _, updated_at = notes[-1]
+            after = (updated_at, title)
+
+    def exists(self, title):
+        return self.db_manager.note_exists(title)
+
+    def read(self, title):
+        if not self.exists(title):
+            raise KeyError(title)
+        return "".join(self.db_manager.iter_note_chunks(title))
+
+    def write(self, title, content):
+        changed = self.db_manager.save_note(title, content)
+        self.db_manager.flush()
+        return changed
+
+    def delete(self, title):
+        self.db_manager.delete_note(title)
+
+    def search(self, query, limit=50):
+        return self.db_manager.search_notes(query, limit)
+
+    def import_notes(self, source, progress=None):
+        return import_notes(self.db_manager, source, progress)
+
+    def export_notes(self, destination, progress=None):
+        return export_notes(self.db_manager, destination, progress)
+
+    def sync(self, sync_dir):
+        return SyncEngine(self.db_manager, sync_dir).sync()
+
+
+def resolve_vault_path(name=None, path=None, registry=None):
+    if path is not None:
+        return name, path
+    registry = registry or VaultRegistry()
+    if name is None:
+        name = registry.last_used
+    if name not in registry.vaults:
+        raise ValueError(f"no vault called '{name}'")
+    return name, registry.vault_path(name)
+
+
+def open_vault(password, name=None, path=None, registry=None, create=False):
+    name, path = resolve_vault_path(name, path, registry)
+    if not create and not os.path.exists(path):
+        raise ValueError(f"{path} doesn't exist")
+
+    db_manager = DatabaseManager(path)
+    try:
+        if db_manager.is_first_time():
+            if not create:
+                raise ValueError(f"{path} isn't a hiddenote vault yet")
+        db_manager.setup_encryption(password, background=False)
+    except Exception:
+        db_manager.close()
+        raise
+    return Vault(db_manager, name)
@@ -5,23 +5,34 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,
     QLineEdit,
     QPushButton,
-    QTextEdit,
-    QTextBrowser,
     QFrame,
-    QListWidgetItem,
-    QLabel,
     QMessageBox,
     QMainWindow,
     QDockWidget,
     QTabWidget,
     QMenu,
+    QFileDialog,
+    QApplication,
 )
-from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtCore import QBuffer, QIODevice, QTimer, Qt
 from PyQt6.QtGui import QShortcut, QKeySequence, QIcon
 
+from .attachments import attachment_url
 from .auth import AuthManager
+from .backup import BackupManager
+from .bulk import import_notes, export_notes
+from .database import CATALOG_PAGE_SIZE
+from .maintenance import MaintenanceRunner
+from .sync import SyncEngine
 from .ui.dialogs import CustomTitleBar, CustomInputDialog, CustomMessageBox
-from .ui.widgets import NoteListWidget, NoteItemWidget
+from .ui.preview import NotePreview
+from .ui.switcher import QuickSwitcher
+from .ui.widgets import NoteEditor, NoteListView
+from .ui.workers import IdleWatcher, PersistenceBridge, run_in_background
+
+
+CHANGE_FEED_INTERVAL_MS = 1000
+SEARCH_DEBOUNCE_MS = 150
 
 
 class HiddenoteApp(QMainWindow):
@@ -29,7 +40,16 @@ class HiddenoteApp(QMainWindow):
         super().__init__()
         self.auth_manager = AuthManager()
         self.db_manager = None
+        self.persistence = None
         self.current_note = None
+        self.catalog_exhausted = True
+        self.save_error_shown = False
+        self.bulk_task = None
+        self.attachment_tasks = []
+        self.maintenance = None
+        self.maintenance_task = None
+        self.search_task = None
+        self.content_query = None
 
         self.init_ui()
         self.show()
@@ -37,10 +57,11 @@ class HiddenoteApp(QMainWindow):
         if not self.auth_manager.authenticate_user(self):
             sys.exit()
 
-        self.db_manager = self.auth_manager.get_database_manager()
         self.setup_shortcuts()
         self.setup_auto_save()
-        self.load_notes()
+        self.setup_maintenance()
+        self.setup_change_feed()
+        self.activate_vault()
 
     def init_ui(self):
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
@@ -94,10 +115,16 @@ class HiddenoteApp(QMainWindow):
 
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("search notes...")
-        self.search_input.textChanged.connect(self.filter_notes)
+        self.search_input.textChanged.connect(self.schedule_search)
         sidebar_layout.addWidget(self.search_input)
 
-        self.notes_list = NoteListWidget(self)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(
+            lambda: self.filter_notes(self.search_input.text())
+        )
+
+        self.notes_list = NoteListView(self)
         self.notes_list.currentRowChanged.connect(self.load_note)
         sidebar_layout.addWidget(self.notes_list)
 
@@ -115,8 +142,10 @@ class HiddenoteApp(QMainWindow):
         )
 
     def setup_editor_dock(self):
-        self.edit_tab = QTextEdit()
+        self.edit_tab = NoteEditor()
         self.edit_tab.textChanged.connect(self.on_text_changed)
+        self.edit_tab.image_pasted.connect(self.attach_image)
+        self.edit_tab.files_dropped.connect(self.attach_files)
 
         self.editor_dock = QDockWidget("Editor", self.dock_main_window)
         self.editor_dock.setWidget(self.edit_tab)
@@ -135,7 +164,8 @@ class HiddenoteApp(QMainWindow):
         )
 
     def setup_preview_dock(self):
-        self.preview_tab = QTextBrowser()
+        self.preview_tab = NotePreview()
+        self.preview_tab.attachment_clicked.connect(self.save_attachment)
 
         self.preview_dock = QDockWidget("Preview", self.dock_main_window)
         self.preview_dock.setWidget(self.preview_tab)
@@ -225,6 +255,45 @@ class HiddenoteApp(QMainWindow):
 
         context_menu.addSeparator()
 
+        bulk_enabled = self.bulk_task is None and self.db_manager is not None
+
+        import_action = context_menu.addAction("Import Folder...")
+        import_action.setEnabled(bulk_enabled)
+        import_action.triggered.connect(lambda: self.import_notes(from_zip=False))
+
+        import_zip_action = context_menu.addAction("Import Zip...")
+        import_zip_action.setEnabled(bulk_enabled)
+        import_zip_action.triggered.connect(lambda: self.import_notes(from_zip=True))
+
+        export_action = context_menu.addAction("Export Notes...")
+        export_action.setEnabled(bulk_enabled)
+        export_action.triggered.connect(self.export_notes)
+
+        backup_action = context_menu.addAction("Back Up Now")
+        backup_action.setEnabled(bulk_enabled)
+        backup_action.triggered.connect(self.backup_vault)
+
+        sync_action = context_menu.addAction("Sync With Folder...")
+        sync_action.setEnabled(bulk_enabled)
+        sync_action.triggered.connect(self.sync_vault)
+
+        context_menu.addSeparator()
+
+        vault_menu = context_menu.addMenu("Switch Vault")
+        vault_menu.setEnabled(self.bulk_task is None)
+        for vault_name in self.auth_manager.registry.names():
+            vault_action = vault_menu.addAction(vault_name)
+            vault_action.setCheckable(True)
+            vault_action.setChecked(vault_name == self.auth_manager.vault_name)
+            vault_action.triggered.connect(
+                lambda checked, vault_name=vault_name: self.switch_vault(vault_name)
+            )
+        vault_menu.addSeparator()
+        new_vault_action = vault_menu.addAction("New Vault...")
+        new_vault_action.triggered.connect(self.create_vault)
+
+        context_menu.addSeparator()
+
         reset_action = context_menu.addAction("Reset Layout")
         reset_action.triggered.connect(self.reset_layout)
 
@@ -257,6 +326,194 @@ class HiddenoteApp(QMainWindow):
         self.dock_main_window.tabifyDockWidget(self.editor_dock, self.preview_dock)
         self.editor_dock.raise_()
 
+    def import_notes(self, from_zip=False):
+        if from_zip:
+            source, _ = QFileDialog.getOpenFileName(
+                self, "import notes from zip", "", "Zip archive (*.zip)"
+            )
+        else:
+            source = QFileDialog.getExistingDirectory(self, "import notes from folder")
+        if not source:
+            return
+
+        self.save_current_note()
+        self.bulk_task = run_in_background(
+            lambda progress: import_notes(self.db_manager, source, progress),
+            self.on_import_finished,
+            lambda message: self.on_bulk_failed("import failed", message),
+            lambda done, total: self.show_bulk_progress("importing", done, total),
+        )
+
+    def export_notes(self):
+        destination, _ = QFileDialog.getSaveFileName(
+            self, "export notes", "hiddenote-export.zip", "Zip archive (*.zip)"
+        )
+        if not destination:
+            return
+
+        self.save_current_note()
+        self.bulk_task = run_in_background(
+            lambda progress: export_notes(self.db_manager, destination, progress),
+            self.on_export_finished,
+            lambda message: self.on_bulk_failed("export failed", message),
+            lambda done, total: self.show_bulk_progress("exporting", done, total),
+        )
+
+    def backup_vault(self):
+        backup_dir = os.path.join(
+            os.path.dirname(os.path.abspath(self.db_manager.db_path)),
+            "hiddenote-backups",
+        )
+        backup_manager = BackupManager(self.db_manager, backup_dir)
+
+        self.save_current_note()
+        self.bulk_task = run_in_background(
+            backup_manager.backup,
+            self.on_backup_finished,
+            lambda message: self.on_bulk_failed("backup failed", message),
+            lambda done, total: self.show_bulk_progress("backing up", done, total),
+        )
+
+    def sync_vault(self):
+        sync_dir = QFileDialog.getExistingDirectory(
+            self, "sync through folder", self.db_manager.journal.last_sync_dir() or ""
+        )
+        if not sync_dir:
+            return
+
+        self.auto_save_timer.stop()
+        self.save_current_note()
+        self.edit_tab.setReadOnly(True)
+        sync_engine = SyncEngine(self.db_manager, sync_dir)
+        self.title_bar.update_title("hiddenote - syncing...")
+        self.bulk_task = run_in_background(
+            sync_engine.sync,
+            self.on_sync_finished,
+            self.on_sync_failed,
+        )
+
+    def on_sync_failed(self, message):
+        self.edit_tab.setReadOnly(False)
+        self.on_bulk_failed("sync failed", message)
+
+    def on_sync_finished(self, report):
+        self.bulk_task = None
+        self.edit_tab.setReadOnly(False)
+        for title in dict.fromkeys(report["changed"]):
+            note = self.db_manager.get_note_summary(title)
+            if note is None:
+                self.notes_list.remove_note(title)
+                if title == self.current_note:
+                    self.close_current_note()
+                continue
+            self.notes_list.upsert_note(*note, self.catalog_exhausted)
+            if title == self.current_note:
+                self.reload_current_note()
+        self.update_window_title(self.current_note)
+        CustomMessageBox.warning(
+            self,
+            "sync done",
+            f"sent {report['sent']} and received {report['received']} changes, "
+            f"merged {report['merged']} notes ({report['conflicts']} conflicts)",
+        )
+
+    def on_backup_finished(self, entry):
+        self.bulk_task = None
+        self.update_window_title(self.current_note)
+        CustomMessageBox.warning(
+            self, "backup done", f"saved a {entry['kind']} backup: {entry['name']}"
+        )
+
+    def show_bulk_progress(self, action, done, total):
+        self.title_bar.update_title(f"hiddenote - {action} {done}/{total}")
+
+    def on_import_finished(self, result):
+        self.bulk_task = None
+        imported, skipped = result
+        self.update_window_title(self.current_note)
+        self.load_notes()
+        CustomMessageBox.warning(
+            self,
+            "import done",
+            f"imported {imported} notes, skipped {skipped} that already existed",
+        )
+
+    def on_export_finished(self, exported):
+        self.bulk_task = None
+        self.update_window_title(self.current_note)
+        CustomMessageBox.warning(self, "export done", f"exported {exported} notes")
+
+    def on_bulk_failed(self, title, message):
+        self.bulk_task = None
+        self.update_window_title(self.current_note)
+        CustomMessageBox.critical(self, title, message)
+
+    def attach_image(self, image):
+        if not self.current_note or image.isNull():
+            return
+        buffer = QBuffer()
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        image.save(buffer, "PNG")
+        self.attach("pasted-image.png", bytes(buffer.data()))
+
+    def attach_files(self, paths):
+        if not self.current_note:
+            return
+        for path in paths:
+            if os.path.isfile(path):
+                self.attach(os.path.basename(path), path)
+
+    def attach(self, name, source):
+        title = self.current_note
+        self.save_current_note()
+        db_manager = self.db_manager
+
+        def attached(key):
+            if title != self.current_note or db_manager is not self.db_manager:
+                return
+            link = f"[{name}]({attachment_url(key)})"
+            if db_manager.attachments.info(key)["mime"].startswith("image/"):
+                link = "!" + link
+            self.edit_tab.textCursor().insertText(link)
+
+        self.run_attachment_task(
+            lambda: db_manager.attachments.add(title, name, source),
+            attached,
+            "couldn't attach",
+        )
+
+    def save_attachment(self, key):
+        info = self.db_manager.attachments.info(key)
+        if info is None:
+            return
+        destination, _ = QFileDialog.getSaveFileName(
+            self, "save attachment", info["name"]
+        )
+        if not destination:
+            return
+
+        db_manager = self.db_manager
+        self.run_attachment_task(
+            lambda: db_manager.attachments.export(key, destination),
+            None,
+            "couldn't save attachment",
+        )
+
+    def run_attachment_task(self, task, on_finished, error_title):
+        tasks = []
+
+        def finished(result):
+            self.attachment_tasks.remove(tasks[0])
+            if on_finished:
+                on_finished(result)
+
+        def failed(message):
+            self.attachment_tasks.remove(tasks[0])
+            CustomMessageBox.critical(self, error_title, message)
+
+        tasks.append(run_in_background(task, finished, failed))
+        self.attachment_tasks.append(tasks[0])
+
     def setup_shortcuts(self):
         new_note_shortcut = QShortcut(QKeySequence("Ctrl+N"), self)
         new_note_shortcut.activated.connect(self.create_new_note)
@@ -270,16 +527,169 @@ class HiddenoteApp(QMainWindow):
         search_shortcut = QShortcut(QKeySequence("Ctrl+F"), self)
         search_shortcut.activated.connect(self.focus_search)
 
+        switcher_shortcut = QShortcut(QKeySequence("Ctrl+P"), self)
+        switcher_shortcut.activated.connect(self.open_quick_switcher)
+
+    def activate_vault(self):
+        self.db_manager = self.auth_manager.get_database_manager()
+        self.setup_persistence()
+        self.maintenance = MaintenanceRunner(self.db_manager)
+        self.preview_tab.set_database_manager(self.db_manager)
+        self.current_note = None
+        self.edit_tab.textChanged.disconnect()
+        self.edit_tab.clear()
+        self.edit_tab.textChanged.connect(self.on_text_changed)
+        self.preview_tab.clear()
+        self.search_input.clear()
+        self.update_window_title()
+        self.load_notes(self.auth_manager.take_prefetched_notes())
+        self.load_title_index()
+
+    def load_title_index(self):
+        self.title_index_task = run_in_background(self.db_manager.load_title_index)
+
+    def switch_vault(self, vault_name):
+        if vault_name == self.auth_manager.vault_name or self.bulk_task:
+            return
+
+        self.auto_save_timer.stop()
+        self.save_current_note()
+        if not self.auth_manager.authenticate_user(self, vault_name):
+            return
+
+        self.maintenance.stop()
+        self.persistence.detach()
+        self.persistence.deleteLater()
+        self.activate_vault()
+
+    def create_vault(self):
+        vault_name, ok = CustomInputDialog.getText(
+            self, "new vault", "what should we call it?"
+        )
+        vault_name = vault_name.strip()
+        if not ok or not vault_name:
+            return
+        if vault_name in self.auth_manager.registry.names():
+            CustomMessageBox.warning(
+                self, "hmm", "you already have a vault with that name"
+            )
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "where should it live?", f"{vault_name}.db", "Vault (*.db)"
+        )
+        if not path:
+            return
+
+        self.auth_manager.registry.add_vault(vault_name, path)
+        self.switch_vault(vault_name)
+
+    def setup_persistence(self):
+        self.persistence = PersistenceBridge(self.db_manager, self)
+        self.persistence.notes_saved.connect(self.on_notes_saved)
+        self.persistence.save_failed.connect(self.on_save_failed)
+
+    def on_notes_saved(self, titles):
+        self.save_error_shown = False
+
+    def on_save_failed(self, message):
+        if self.save_error_shown:
+            return
+        self.save_error_shown = True
+        CustomMessageBox.critical(
+            self, "couldn't save", f"your changes haven't been saved yet: {message}"
+        )
+
+    def setup_maintenance(self):
+        self.idle_watcher = IdleWatcher(QApplication.instance(), parent=self)
+        self.idle_watcher.idle.connect(self.run_maintenance)
+        self.idle_watcher.active.connect(lambda: self.maintenance.stop())
+
+    def run_maintenance(self):
+        if self.maintenance_task or self.bulk_task or not self.maintenance.is_due():
+            return
+        self.save_current_note()
+        self.maintenance_task = run_in_background(
+            self.maintenance.run,
+            self.on_maintenance_finished,
+            lambda message: self.on_maintenance_finished(None),
+        )
+
+    def on_maintenance_finished(self, report):
+        self.maintenance_task = None
+        if not report or not report["completed"]:
+            return
+        reclaimed = report["reclaimed"] / (1024 * 1024)
+        self.title_bar.update_title(
+            f"hiddenote - maintenance reclaimed {reclaimed:.1f} MB "
+            f"in {report['elapsed']:.1f}s"
+        )
+        QTimer.singleShot(5000, lambda: self.update_window_title(self.current_note))
+
+    def setup_change_feed(self):
+        self.change_feed_timer = QTimer(self)
+        self.change_feed_timer.timeout.connect(self.apply_external_changes)
+        self.change_feed_timer.start(CHANGE_FEED_INTERVAL_MS)
+
+    def apply_external_changes(self):
+        if self.db_manager is None:
+            return
+        changes = self.db_manager.poll_changes()
+        if changes is None:
+            self.current_note = None
+            self.load_notes()
+            self.load_title_index()
+            return
+
+        for title, created_at, updated_at, deleted in changes:
+            if deleted:
+                self.notes_list.remove_note(title)
+                if title == self.current_note:
+                    self.close_current_note()
+                continue
+
+            self.notes_list.upsert_note(
+                title, created_at, updated_at, self.catalog_exhausted
+            )
+            if title == self.current_note and not self.auto_save_timer.isActive():
+                self.reload_current_note()
+
+    def close_current_note(self):
+        self.current_note = None
+        self.edit_tab.textChanged.disconnect()
+        self.edit_tab.clear()
+        self.edit_tab.textChanged.connect(self.on_text_changed)
+        self.preview_tab.clear()
+        self.update_window_title()
+
+    def reload_current_note(self):
+        content = self.db_manager.load_note(self.current_note)
+        if content == self.edit_tab.toPlainText():
+            return
+
+        cursor = self.edit_tab.textCursor()
+        position = min(cursor.position(), len(content))
+        scroll_value = self.edit_tab.verticalScrollBar().value()
+        self.edit_tab.textChanged.disconnect()
+        self.edit_tab.setPlainText(content)
+        self.edit_tab.textChanged.connect(self.on_text_changed)
+        cursor = self.edit_tab.textCursor()
+        cursor.setPosition(position)
+        self.edit_tab.setTextCursor(cursor)
+        self.edit_tab.verticalScrollBar().setValue(scroll_value)
+        self.update_preview()
+
     def setup_auto_save(self):
         self.auto_save_timer = QTimer()
         self.auto_save_timer.timeout.connect(self.auto_save)
         self.auto_save_timer.setSingleShot(True)
 
     def update_window_title(self, note_title=None):
+        title = "hiddenote"
+        if len(self.auth_manager.registry.names()) > 1:
+            title = f"{title} [{self.auth_manager.vault_name}]"
         if note_title:
-            title = f"hiddenote - {note_title}"
-        else:
-            title = "hiddenote"
+            title = f"{title} - {note_title}"
         self.title_bar.update_title(title)
 
     def create_new_note(self):
@@ -288,12 +698,8 @@ class HiddenoteApp(QMainWindow):
         )
         if ok and title.strip():
             title = title.strip()
-            existing_titles = []
 
-            for title_data, _, _ in self.notes_list.all_notes:
-                existing_titles.append(title_data)
-
-            if title in existing_titles:
+            if self.db_manager.note_exists(title):
                 CustomMessageBox.warning(
                     self, "hmm", "you already have a note with that name"
                 )
@@ -301,7 +707,11 @@ class HiddenoteApp(QMainWindow):
 
             self.save_current_note()
             self.db_manager.save_note(title, "")
-            self.load_notes()
+            self.search_input.clear()
+            self.notes_list.upsert_note(
+                *self.db_manager.get_note_summary(title), self.catalog_exhausted
+            )
+            self.notes_list.setCurrentRow(self.notes_list.find_row(title))
 
     def delete_note(self, title):
         reply = CustomMessageBox.question(
@@ -313,55 +723,68 @@ class HiddenoteApp(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             self.db_manager.delete_note(title)
+            row = self.notes_list.remove_note(title)
 
             if title == self.current_note:
-                self.current_note = None
-                self.edit_tab.textChanged.disconnect()
-                self.edit_tab.clear()
-                self.edit_tab.textChanged.connect(self.on_text_changed)
-                self.preview_tab.clear()
-                self.update_window_title()
-
-            self.load_notes()
-
-            search_text = self.search_input.text()
-            if search_text.strip():
-                self.notes_list.filter_notes(search_text)
+                self.close_current_note()
+                if row >= 0 and self.notes_list.count():
+                    self.notes_list.setCurrentRow(min(row, self.notes_list.count() - 1))
 
-    def load_notes(self):
-        notes = self.db_manager.get_all_notes()
-        self.notes_list.set_all_notes(notes)
-        self.notes_list.clear()
-
-        for title, created_at, updated_at in notes:
-            item = QListWidgetItem()
-            widget = NoteItemWidget(title, created_at, updated_at)
-            item.setSizeHint(widget.sizeHint())
-            self.notes_list.addItem(item)
-            self.notes_list.setItemWidget(item, widget)
+    def load_notes(self, notes=None):
+        if notes is None:
+            notes = self.db_manager.get_notes_page()
+        self.catalog_exhausted = len(notes) < CATALOG_PAGE_SIZE
+        self.notes_list.set_notes(notes)
 
         if notes:
             self.notes_list.setCurrentRow(0)
 
+    def fetch_more_notes(self):
+        last_note = self.notes_list.last_note()
+        if self.catalog_exhausted or last_note is None:
+            return
+        if self.notes_list.searching():
+            return
+
+        last_title, _, last_updated_at = last_note
+        notes = self.db_manager.get_notes_page(after=(last_updated_at, last_title))
+        self.catalog_exhausted = len(notes) < CATALOG_PAGE_SIZE
+        self.notes_list.append_notes(notes)
+
     def load_note(self, index):
         if index >= 0:
-            self.save_current_note()
+            self.show_note(self.notes_list.title(index))
+        else:
+            self.current_note = None
+            self.update_window_title()
 
-            item = self.notes_list.item(index)
-            widget = self.notes_list.itemWidget(item)
-            title = widget.findChild(QLabel, "noteTitle").text()
-            content = self.db_manager.load_note(title)
-            self.current_note = title
+    def show_note(self, title):
+        self.save_current_note()
+        content = self.db_manager.load_note(title)
+        self.current_note = title
 
-            self.edit_tab.textChanged.disconnect()
-            self.edit_tab.setPlainText(content)
-            self.edit_tab.textChanged.connect(self.on_text_changed)
+        self.edit_tab.textChanged.disconnect()
+        self.edit_tab.setPlainText(content)
+        self.edit_tab.textChanged.connect(self.on_text_changed)
 
-            self.update_preview()
-            self.update_window_title(title)
+        self.update_preview()
+        self.update_window_title(title)
+
+    def open_quick_switcher(self):
+        if self.db_manager is None:
+            return
+        title = QuickSwitcher.pick(self, self.db_manager)
+        if title is None:
+            return
+
+        self.search_input.clear()
+        row = self.notes_list.find_row(title)
+        if row >= 0:
+            self.notes_list.setCurrentRow(row)
+            self.notes_list.scrollTo(self.notes_list.currentIndex())
         else:
-            self.current_note = None
-            self.update_window_title()
+            self.notes_list.select_quietly(-1)
+            self.show_note(title)
 
     def save_current_note(self):
         if self.current_note:
@@ -379,18 +802,66 @@ class HiddenoteApp(QMainWindow):
     def update_preview(self):
         markdown_text = self.edit_tab.toPlainText()
         html = markdown.markdown(markdown_text)
-        self.preview_tab.setHtml(html)
+        self.preview_tab.set_preview_html(html)
 
     def closeEvent(self, event):
         self.save_current_note()
+        if self.db_manager:
+            self.maintenance.stop()
+            try:
+                self.auth_manager.close_all()
+            except Exception as error:
+                CustomMessageBox.critical(
+                    self,
+                    "couldn't save",
+                    f"your changes haven't been saved yet: {error}",
+                )
+                event.ignore()
+                return
+            self.persistence.detach()
         event.accept()
 
     def focus_search(self):
         self.search_input.setFocus()
         self.search_input.selectAll()
 
+    def schedule_search(self, search_text):
+        if search_text.strip():
+            self.search_timer.start(SEARCH_DEBOUNCE_MS)
+        else:
+            self.search_timer.stop()
+            self.filter_notes(search_text)
+
     def filter_notes(self, search_text):
         if search_text.strip():
-            self.notes_list.filter_notes(search_text)
+            title_matches = self.db_manager.search_titles(search_text.strip())
+            self.notes_list.filter_notes(title_matches)
+            self.content_query = (search_text, title_matches)
+            if self.search_task is None:
+                self.search_content()
         else:
-            self.load_notes()
+            self.content_query = None
+            self.notes_list.show_catalog(self.current_note)
+
+    def search_content(self):
+        search_text, title_matches = self.content_query
+        db_manager = self.db_manager
+
+        def finished(content_matches):
+            self.on_content_searched(search_text, title_matches, content_matches)
+
+        self.search_task = run_in_background(
+            lambda: db_manager.search_notes(search_text),
+            finished,
+            lambda message: finished([]),
+        )
+
+    def on_content_searched(self, search_text, title_matches, content_matches):
+        self.search_task = None
+        if self.content_query is None:
+            return
+        if self.content_query[0] != search_text:
+            self.search_content()
+            return
+        self.content_query = None
+        self.notes_list.filter_notes(title_matches, content_matches)
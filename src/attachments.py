@@ -0,0 +1,204 @@
+import json
+import mimetypes
+import os
+import secrets
+
+
+ATTACHMENT_SCHEME = "attachment"
+ATTACHMENT_CHUNK_SIZE = 64 * 1024
+CHUNK_OVERHEAD = 1 + 12 + 16
+TOUCH_NOTE_SQL = "UPDATE notes SET updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+
+
+def attachment_url(key):
+    return f"{ATTACHMENT_SCHEME}:{key}"
+
+
+def encrypted_size(size, chunk_size=ATTACHMENT_CHUNK_SIZE):
+    chunk_count = -(-size // chunk_size)
+    return size + chunk_count * CHUNK_OVERHEAD
+
+
+def chunk_context(key, index):
+    return f"{key}:{index}".encode()
+
+
+class AttachmentStore:
+    def __init__(self, db_manager, chunk_size=ATTACHMENT_CHUNK_SIZE):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def create_tables(cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attachments (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                note_id INTEGER NOT NULL REFERENCES notes (id) ON DELETE CASCADE,
+                size INTEGER NOT NULL,
+                chunk_size INTEGER NOT NULL,
+                meta BLOB NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attachment_blobs (
+                id INTEGER PRIMARY KEY REFERENCES attachments (id) ON DELETE CASCADE,
+                content BLOB NOT NULL
+            )
+        """)
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attachments_note ON attachments (note_id)"
+        )
+
+    def add(self, title, name, source, mime=None):
+        if isinstance(source, (bytes, bytearray)):
+            return self.add_stream(title, name, len(source), iter([source]), mime)
+
+        with open(source, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            blocks = iter(lambda: file.read(self.chunk_size), b"")
+            return self.add_stream(title, name, size, blocks, mime)
+
+    def add_stream(self, title, name, size, blocks, mime=None):
+        db_manager = self.db_manager
+        if mime is None:
+            mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        key = secrets.token_hex(16)
+        meta = db_manager.encrypt_content(json.dumps({"name": name, "mime": mime}))
+
+        db_manager.flush()
+        with db_manager.lock, db_manager.conn:
+            cursor = db_manager.conn.cursor()
+            note_id = db_manager.note_id(cursor, title)
+            cursor.execute(
+                """
+                INSERT INTO attachments (key, note_id, size, chunk_size, meta)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, note_id, size, self.chunk_size, meta),
+            )
+            attachment_id = cursor.lastrowid
+            cursor.execute(
+                "INSERT INTO attachment_blobs (id, content) VALUES (?, zeroblob(?))",
+                (attachment_id, encrypted_size(size, self.chunk_size)),
+            )
+
+        try:
+            self.write_chunks(key, attachment_id, name, size, blocks)
+        except BaseException:
+            self.delete(key)
+            raise
+
+        with db_manager.lock, db_manager.conn:
+            db_manager.conn.execute(TOUCH_NOTE_SQL, (note_id,))
+        db_manager.advance_feed()
+        return key
+
+    def write_chunks(self, key, attachment_id, name, size, blocks):
+        db_manager = self.db_manager
+        written = 0
+        offset = 0
+        for index, chunk in enumerate(self.iter_plain_chunks(blocks)):
+            written += len(chunk)
+            if written > size:
+                raise ValueError(f"{name} grew while it was being attached")
+            encrypted = db_manager.cipher_suite.encrypt(
+                chunk, chunk_context(key, index)
+            )
+            with db_manager.lock:
+                with db_manager.conn.blobopen(
+                    "attachment_blobs", "content", attachment_id
+                ) as blob:
+                    blob.seek(offset)
+                    blob.write(encrypted)
+            offset += len(encrypted)
+        if written != size:
+            raise ValueError(f"{name} changed while it was being attached")
+
+    def iter_plain_chunks(self, blocks):
+        pending = b""
+        for block in blocks:
+            if pending:
+                block = pending + block
+            offset = 0
+            while len(block) - offset >= self.chunk_size:
+                yield block[offset : offset + self.chunk_size]
+                offset += self.chunk_size
+            pending = block[offset:]
+        if pending:
+            yield pending
+
+    def info(self, key):
+        with self.db_manager.lock:
+            cursor = self.db_manager.conn.cursor()
+            cursor.execute(
+                "SELECT id, size, chunk_size, meta FROM attachments WHERE key = ?",
+                (key,),
+            )
+            result = cursor.fetchone()
+        if not result:
+            return None
+
+        attachment_id, size, chunk_size, meta = result
+        info = json.loads(self.db_manager.decrypt_content(meta))
+        info.update(id=attachment_id, key=key, size=size, chunk_size=chunk_size)
+        return info
+
+    def list_attachments(self, title):
+        with self.db_manager.lock:
+            cursor = self.db_manager.conn.cursor()
+            cursor.execute(
+                """
+                SELECT a.key FROM attachments a
+                JOIN notes n ON n.id = a.note_id
+                WHERE n.title = ?
+                ORDER BY a.id
+                """,
+                (title,),
+            )
+            keys = [row[0] for row in cursor.fetchall()]
+        return [self.info(key) for key in keys]
+
+    def iter_chunks(self, key):
+        info = self.info(key)
+        if info is None:
+            raise KeyError(key)
+
+        db_manager = self.db_manager
+        offset = 0
+        remaining = info["size"]
+        index = 0
+        while remaining:
+            plain_size = min(info["chunk_size"], remaining)
+            with db_manager.lock:
+                with db_manager.conn.blobopen(
+                    "attachment_blobs", "content", info["id"], readonly=True
+                ) as blob:
+                    blob.seek(offset)
+                    encrypted = blob.read(plain_size + CHUNK_OVERHEAD)
+            yield db_manager.cipher_suite.decrypt(encrypted, chunk_context(key, index))
+            offset += len(encrypted)
+            remaining -= plain_size
+            index += 1
+
+    def read(self, key):
+        return b"".join(self.iter_chunks(key))
+
+    def export(self, key, destination):
+        with open(destination, "wb") as file:
+            for chunk in self.iter_chunks(key):
+                file.write(chunk)
+
+    def delete(self, key):
+        db_manager = self.db_manager
+        with db_manager.lock, db_manager.conn:
+            cursor = db_manager.conn.cursor()
+            cursor.execute("SELECT note_id FROM attachments WHERE key = ?", (key,))
+            result = cursor.fetchone()
+            if result is None:
+                return
+            cursor.execute("DELETE FROM attachments WHERE key = ?", (key,))
+            cursor.execute(TOUCH_NOTE_SQL, result)
+        db_manager.advance_feed()
@@ -1,40 +1,113 @@
 from PyQt6.QtWidgets import QDialog
 from .ui.dialogs import PasswordDialog, CustomMessageBox
-from .database import DatabaseManager
+from .ui.workers import run_in_background
+from .database import DatabaseManager, WRONG_PASSWORD
+from .vaults import VaultRegistry
 
 
 class AuthManager:
-    def __init__(self):
+    def __init__(self, registry=None):
+        self.registry = registry or VaultRegistry()
+        self.vault_name = None
         self.db_manager = None
+        self.unlocked_vaults = {}
         self.is_authenticated = False
+        self.prefetched_notes = None
+        self.tasks = []
 
-    def authenticate_user(self, parent=None):
-        db_manager = DatabaseManager()
-
-        if db_manager.is_first_time():
-            dialog = PasswordDialog(is_new_user=True, parent=parent)
-            if dialog.exec() == QDialog.DialogCode.Accepted:
-                db_manager.setup_encryption(dialog.password)
-                self.db_manager = db_manager
-                self.is_authenticated = True
-                return True
-            return False
-        else:
-            dialog = PasswordDialog(is_new_user=False, parent=parent)
-            if dialog.exec() == QDialog.DialogCode.Accepted:
-                if db_manager.verify_password(dialog.password):
-                    db_manager.setup_encryption(dialog.password)
-                    self.db_manager = db_manager
-                    self.is_authenticated = True
-                    return True
-                else:
-                    CustomMessageBox.critical(
-                        parent,
-                        "wrong password",
-                        "that's not the right password",
-                    )
-                    return False
-            return False
+    def authenticate_user(self, parent=None, vault_name=None):
+        if vault_name is None:
+            vault_name = self.registry.last_used
+
+        db_manager = self.unlocked_vaults.get(vault_name)
+        if db_manager is None:
+            db_manager = DatabaseManager(self.registry.vault_path(vault_name))
+            if not self.prompt_password(db_manager, vault_name, parent):
+                db_manager.close()
+                return False
+            self.unlocked_vaults[vault_name] = db_manager
+
+        self.vault_name = vault_name
+        self.db_manager = db_manager
+        self.is_authenticated = True
+        self.registry.mark_used(vault_name)
+        return True
+
+    def prompt_password(self, db_manager, vault_name, parent):
+        is_new_user = db_manager.is_first_time()
+        dialog = PasswordDialog(
+            is_new_user=is_new_user, parent=parent, vault_name=vault_name
+        )
+        dialog.password_submitted.connect(
+            lambda password: self.unlock(db_manager, dialog, password, parent)
+        )
+        return dialog.exec() == QDialog.DialogCode.Accepted
+
+    def is_unlocked(self, vault_name):
+        return vault_name in self.unlocked_vaults
+
+    def lock_vault(self, vault_name):
+        db_manager = self.unlocked_vaults.get(vault_name)
+        if db_manager is not None:
+            db_manager.close()
+            del self.unlocked_vaults[vault_name]
+        if vault_name == self.vault_name:
+            self.vault_name = None
+            self.db_manager = None
+            self.is_authenticated = False
+
+    def close_all(self):
+        for vault_name in list(self.unlocked_vaults):
+            self.lock_vault(vault_name)
+
+    def unlock(self, db_manager, dialog, password, parent):
+        dialog.set_busy(True)
+        pending = {"key"}
+
+        def step_done(step):
+            pending.discard(step)
+            if not pending:
+                dialog.set_busy(False)
+                dialog.accept()
+
+        def unlock_failed(message):
+            dialog.set_busy(False)
+            pending.add("failed")
+            self.prefetched_notes = None
+            if message == WRONG_PASSWORD:
+                CustomMessageBox.critical(parent, "wrong password", message)
+            else:
+                CustomMessageBox.critical(parent, "couldn't unlock", message)
+            dialog.reject()
+
+        def catalog_loaded(notes):
+            if "failed" not in pending:
+                self.prefetched_notes = notes
+            step_done("catalog")
+
+        if not dialog.is_new_user:
+            pending.add("catalog")
+            self.tasks.append(
+                run_in_background(
+                    db_manager.get_notes_page,
+                    catalog_loaded,
+                    lambda message: step_done("catalog"),
+                )
+            )
+
+        self.tasks.append(
+            run_in_background(
+                lambda: db_manager.setup_encryption(password),
+                lambda result: step_done("key"),
+                unlock_failed,
+            )
+        )
+
+    def take_prefetched_notes(self):
+        notes = self.prefetched_notes
+        self.prefetched_notes = None
+        self.tasks = []
+        return notes
 
     def get_database_manager(self):
         return self.db_manager
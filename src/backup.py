@@ -0,0 +1,373 @@
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_PAUSE = 0.005
+KEEP_FULL_BACKUPS = 3
+MAX_INCREMENTALS = 10
+MANIFEST_NAME = "manifest.json"
+
+NOTE_COLUMNS = "id, title, content, created_at, updated_at, format"
+CHUNK_COLUMNS = "id, note_id, digest, content"
+AUTH_COLUMNS = "id, password_hash, salt, wrapped_key"
+REVISION_COLUMNS = "id, note_id, saved_at, content"
+ATTACHMENT_COLUMNS = "id, key, note_id, size, chunk_size, meta"
+
+
+class BackupManager:
+    def __init__(
+        self,
+        db_manager,
+        backup_dir,
+        keep_full=KEEP_FULL_BACKUPS,
+        max_incrementals=MAX_INCREMENTALS,
+    ):
+        self.db_manager = db_manager
+        self.backup_dir = backup_dir
+        self.keep_full = keep_full
+        self.max_incrementals = max_incrementals
+        os.makedirs(backup_dir, exist_ok=True)
+
+    def manifest_path(self):
+        return os.path.join(self.backup_dir, MANIFEST_NAME)
+
+    def load_manifest(self):
+        return load_manifest(self.backup_dir)
+
+    def save_manifest(self, manifest):
+        temp_path = self.manifest_path() + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(temp_path, self.manifest_path())
+
+    def list_backups(self):
+        return self.load_manifest()["backups"]
+
+    def backup(self, progress=None):
+        backups = self.list_backups()
+        incrementals = 0
+        for entry in reversed(backups):
+            if entry["kind"] == "full":
+                break
+            incrementals += 1
+
+        if not backups or incrementals >= self.max_incrementals:
+            entry = self.create_full_backup(progress)
+        else:
+            entry = self.create_incremental_backup(backups[-1]["started_at"])
+        self.apply_retention()
+        return entry
+
+    def current_timestamp(self):
+        with self.db_manager.lock:
+            cursor = self.db_manager.conn.execute("SELECT CURRENT_TIMESTAMP")
+            return cursor.fetchone()[0]
+
+    def backup_name(self, kind):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return f"{kind}-{stamp}.db"
+
+    def create_full_backup(self, progress=None):
+        self.db_manager.flush()
+        started_at = self.current_timestamp()
+        name = self.backup_name("full")
+        path = os.path.join(self.backup_dir, name)
+        temp_path = path + ".tmp"
+
+        lock = self.db_manager.lock
+
+        def step_done(status, remaining, total):
+            if progress:
+                progress(total - remaining, total)
+            lock.release()
+            time.sleep(BACKUP_STEP_PAUSE)
+            lock.acquire()
+
+        target = sqlite3.connect(temp_path)
+        try:
+            with lock:
+                self.db_manager.conn.backup(
+                    target, pages=BACKUP_PAGES_PER_STEP, progress=step_done
+                )
+        finally:
+            target.close()
+        os.replace(temp_path, path)
+
+        return self.record_backup(name, "full", started_at)
+
+    def create_incremental_backup(self, since):
+        self.db_manager.flush()
+        name = self.backup_name("incremental")
+        path = os.path.join(self.backup_dir, name)
+        temp_path = path + ".tmp"
+
+        target = sqlite3.connect(temp_path)
+        try:
+            create_incremental_tables(target)
+            with self.db_manager.lock:
+                source = self.db_manager.conn
+                started_at = source.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+                copy_changes(source, target, since)
+            target.commit()
+        finally:
+            target.close()
+        os.replace(temp_path, path)
+
+        return self.record_backup(name, "incremental", started_at)
+
+    def record_backup(self, name, kind, started_at):
+        manifest = self.load_manifest()
+        entry = {"name": name, "kind": kind, "started_at": started_at}
+        manifest["backups"].append(entry)
+        self.save_manifest(manifest)
+        return entry
+
+    def apply_retention(self):
+        manifest = self.load_manifest()
+        backups = manifest["backups"]
+        full_indexes = [i for i, entry in enumerate(backups) if entry["kind"] == "full"]
+        if len(full_indexes) <= self.keep_full:
+            return
+
+        cutoff = full_indexes[-self.keep_full]
+        for entry in backups[:cutoff]:
+            path = os.path.join(self.backup_dir, entry["name"])
+            if os.path.exists(path):
+                os.remove(path)
+        manifest["backups"] = backups[cutoff:]
+        self.save_manifest(manifest)
+
+
+def load_manifest(backup_dir):
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"backups": []}
+    with open(path) as file:
+        return json.load(file)
+
+
+def create_incremental_tables(target):
+    target.execute("""
+        CREATE TABLE notes (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            content BLOB NOT NULL,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            format INTEGER NOT NULL
+        )
+    """)
+    target.execute("""
+        CREATE TABLE note_chunks (
+            id INTEGER PRIMARY KEY,
+            note_id INTEGER NOT NULL,
+            digest BLOB NOT NULL,
+            content BLOB NOT NULL
+        )
+    """)
+    target.execute("""
+        CREATE TABLE user_auth (
+            id INTEGER PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            salt BLOB NOT NULL,
+            wrapped_key BLOB
+        )
+    """)
+    target.execute("""
+        CREATE TABLE note_revisions (
+            id INTEGER PRIMARY KEY,
+            note_id INTEGER NOT NULL,
+            saved_at REAL NOT NULL,
+            content BLOB NOT NULL
+        )
+    """)
+    target.execute("""
+        CREATE TABLE attachments (
+            id INTEGER PRIMARY KEY,
+            key TEXT NOT NULL,
+            note_id INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            chunk_size INTEGER NOT NULL,
+            meta BLOB NOT NULL
+        )
+    """)
+    target.execute(
+        "CREATE TABLE attachment_blobs (id INTEGER PRIMARY KEY, content BLOB NOT NULL)"
+    )
+    target.execute("CREATE TABLE live_notes (id INTEGER PRIMARY KEY)")
+
+
+def copy_changes(source, target, since):
+    changed = source.execute(
+        f"SELECT {NOTE_COLUMNS} FROM notes WHERE updated_at >= ?", (since,)
+    )
+    note_ids = []
+    for row in changed:
+        target.execute(
+            f"INSERT INTO notes ({NOTE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)", row
+        )
+        note_ids.append(row[0])
+
+    for note_id in note_ids:
+        chunks = source.execute(
+            f"SELECT {CHUNK_COLUMNS} FROM note_chunks WHERE note_id = ?", (note_id,)
+        )
+        target.executemany(
+            f"INSERT INTO note_chunks ({CHUNK_COLUMNS}) VALUES (?, ?, ?, ?)", chunks
+        )
+        revisions = source.execute(
+            f"SELECT {REVISION_COLUMNS} FROM note_revisions WHERE note_id = ?",
+            (note_id,),
+        )
+        target.executemany(
+            f"INSERT INTO note_revisions ({REVISION_COLUMNS}) VALUES (?, ?, ?, ?)",
+            revisions,
+        )
+        attachments = source.execute(
+            f"SELECT {ATTACHMENT_COLUMNS} FROM attachments WHERE note_id = ?",
+            (note_id,),
+        ).fetchall()
+        target.executemany(
+            f"INSERT INTO attachments ({ATTACHMENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+            attachments,
+        )
+        for attachment in attachments:
+            blob = source.execute(
+                "SELECT id, content FROM attachment_blobs WHERE id = ?",
+                (attachment[0],),
+            ).fetchone()
+            target.execute(
+                "INSERT INTO attachment_blobs (id, content) VALUES (?, ?)", blob
+            )
+
+    target.executemany(
+        f"INSERT INTO user_auth ({AUTH_COLUMNS}) VALUES (?, ?, ?, ?)",
+        source.execute(f"SELECT {AUTH_COLUMNS} FROM user_auth"),
+    )
+    target.executemany(
+        "INSERT INTO live_notes (id) VALUES (?)", source.execute("SELECT id FROM notes")
+    )
+
+
+def restore_backup(backup_dir, target_path, upto=None):
+    backups = load_manifest(backup_dir)["backups"]
+    if upto is not None:
+        names = [entry["name"] for entry in backups]
+        backups = backups[: names.index(upto) + 1]
+
+    full_indexes = [i for i, entry in enumerate(backups) if entry["kind"] == "full"]
+    if not full_indexes:
+        raise ValueError("no full backup to restore from")
+    chain = backups[full_indexes[-1] :]
+
+    check_closed(target_path)
+    temp_path = target_path + ".restore"
+    shutil.copyfile(os.path.join(backup_dir, chain[0]["name"]), temp_path)
+
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        for entry in chain[1:]:
+            apply_incremental(conn, os.path.join(backup_dir, entry["name"]))
+        if len(chain) > 1:
+            conn.execute("DELETE FROM search_documents")
+            conn.execute("DELETE FROM search_terms")
+            conn.execute(
+                "DELETE FROM migration_progress WHERE name = 'search-index-backfill'"
+            )
+            conn.commit()
+        forget_sync_replica(conn)
+    finally:
+        conn.close()
+
+    try:
+        check_closed(target_path)
+    except ValueError:
+        os.remove(temp_path)
+        raise
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(target_path + suffix):
+            os.remove(target_path + suffix)
+    os.replace(temp_path, target_path)
+
+
+def check_closed(path):
+    if not os.path.exists(path):
+        return
+    conn = sqlite3.connect(path, timeout=0)
+    try:
+        conn.execute("PRAGMA journal_mode = DELETE")
+    except sqlite3.OperationalError:
+        raise ValueError(
+            "this vault is open; close or lock it before restoring over it"
+        ) from None
+    finally:
+        conn.close()
+
+
+def forget_sync_replica(conn):
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_state'"
+    ).fetchone()
+    if exists:
+        with conn:
+            conn.execute("DELETE FROM sync_state")
+
+
+def apply_incremental(conn, path):
+    conn.execute("ATTACH DATABASE ? AS incremental", (path,))
+    try:
+        with conn:
+            conn.execute(
+                "DELETE FROM notes WHERE id NOT IN (SELECT id FROM incremental.live_notes)"
+            )
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO notes ({NOTE_COLUMNS})
+                SELECT {NOTE_COLUMNS} FROM incremental.notes
+                """
+            )
+            conn.execute(
+                "DELETE FROM note_chunks WHERE note_id IN (SELECT id FROM incremental.notes)"
+            )
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO note_chunks ({CHUNK_COLUMNS})
+                SELECT {CHUNK_COLUMNS} FROM incremental.note_chunks
+                """
+            )
+            conn.execute(
+                "DELETE FROM note_revisions WHERE note_id IN (SELECT id FROM incremental.notes)"
+            )
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO note_revisions ({REVISION_COLUMNS})
+                SELECT {REVISION_COLUMNS} FROM incremental.note_revisions
+                """
+            )
+            conn.execute(
+                "DELETE FROM attachments WHERE note_id IN (SELECT id FROM incremental.notes)"
+            )
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO attachments ({ATTACHMENT_COLUMNS})
+                SELECT {ATTACHMENT_COLUMNS} FROM incremental.attachments
+                """
+            )
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO attachment_blobs (id, content)
+                SELECT id, content FROM incremental.attachment_blobs
+                """
+            )
+            conn.execute("DELETE FROM user_auth")
+            conn.execute(
+                f"INSERT INTO user_auth ({AUTH_COLUMNS}) SELECT {AUTH_COLUMNS} FROM incremental.user_auth"
+            )
+    finally:
+        conn.execute("DETACH DATABASE incremental")
@@ -0,0 +1,178 @@
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_PAGE_SIZE = 500
+NOTE_EXTENSION = ".md"
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+def default_workers():
+    return min(8, os.cpu_count() or 1)
+
+
+def iter_markdown_sources(source):
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(NOTE_EXTENSION):
+                    continue
+                title = os.path.splitext(os.path.basename(info.filename))[0]
+                yield title, archive.read(info)
+        return
+
+    for root, _, files in os.walk(source):
+        for filename in sorted(files):
+            if not filename.lower().endswith(NOTE_EXTENSION):
+                continue
+            path = os.path.join(root, filename)
+            yield os.path.splitext(filename)[0], read_file(path)
+
+
+def read_file(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def count_markdown_sources(source):
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return sum(
+                1
+                for info in archive.infolist()
+                if not info.is_dir()
+                and info.filename.lower().endswith(NOTE_EXTENSION)
+            )
+    return sum(
+        1
+        for _, _, files in os.walk(source)
+        for filename in files
+        if filename.lower().endswith(NOTE_EXTENSION)
+    )
+
+
+def import_notes(
+    db_manager,
+    source,
+    progress=None,
+    workers=None,
+    batch_size=IMPORT_BATCH_SIZE,
+):
+    total = count_markdown_sources(source)
+    imported = 0
+    skipped = 0
+    seen = set()
+
+    def prepare(item):
+        title, data = item
+        return db_manager.prepare_note(title, data.decode("utf-8", errors="replace"))
+
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+        batch = []
+        in_flight = []
+        for title, data in iter_markdown_sources(source):
+            title = title.strip()
+            if not title or title in seen or db_manager.note_exists(title):
+                skipped += 1
+                continue
+            seen.add(title)
+            batch.append((title, data))
+            if len(batch) < batch_size:
+                continue
+
+            futures = [pool.submit(prepare, item) for item in batch]
+            batch = []
+            imported += commit_import_batch(db_manager, in_flight)
+            in_flight = futures
+            if progress:
+                progress(imported + skipped, total)
+
+        futures = [pool.submit(prepare, item) for item in batch]
+        imported += commit_import_batch(db_manager, in_flight)
+        imported += commit_import_batch(db_manager, futures)
+        if progress:
+            progress(imported + skipped, total)
+
+    return imported, skipped
+
+
+def commit_import_batch(db_manager, futures):
+    if not futures:
+        return 0
+
+    plans = []
+    titles = []
+    for future in futures:
+        plan = future.result()
+        plans.append(plan)
+        titles.append(plan["title"])
+    db_manager.commit_notes(plans)
+    db_manager.forget_notes(titles)
+    return len(plans)
+
+
+def export_filename(title, used):
+    base = UNSAFE_FILENAME_CHARS.sub("_", title).strip(" .") or "untitled"
+    filename = base + NOTE_EXTENSION
+    counter = 2
+    while filename.lower() in used:
+        filename = f"{base} ({counter}){NOTE_EXTENSION}"
+        counter += 1
+    used.add(filename.lower())
+    return filename
+
+
+def iter_note_titles(db_manager, page_size=EXPORT_PAGE_SIZE):
+    db_manager.flush()
+    last_id = 0
+    while True:
+        with db_manager.lock:
+            cursor = db_manager.conn.cursor()
+            cursor.execute(
+                "SELECT id, title FROM notes WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, page_size),
+            )
+            page = cursor.fetchall()
+        if not page:
+            return
+        last_id = page[-1][0]
+        yield [title for _, title in page]
+
+
+def export_notes(db_manager, destination, progress=None, workers=None):
+    with db_manager.lock:
+        total = db_manager.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+    as_zip = destination.lower().endswith(".zip")
+    if as_zip:
+        archive = zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED)
+    else:
+        os.makedirs(destination, exist_ok=True)
+
+    def decrypt(title):
+        return title, "".join(db_manager.iter_note_chunks(title))
+
+    exported = 0
+    used = set()
+    try:
+        with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+            for titles in iter_note_titles(db_manager):
+                for title, content in pool.map(decrypt, titles):
+                    filename = export_filename(title, used)
+                    data = content.encode("utf-8")
+                    if as_zip:
+                        archive.writestr(filename, data)
+                    else:
+                        with open(os.path.join(destination, filename), "wb") as file:
+                            file.write(data)
+                    exported += 1
+                if progress:
+                    progress(exported, total)
+    finally:
+        if as_zip:
+            archive.close()
+
+    return exported
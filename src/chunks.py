@@ -0,0 +1,75 @@
+import hashlib
+import hmac
+import zlib
+
+
+NOTE_FORMAT_INLINE = 0
+NOTE_FORMAT_CHUNKED = 1
+
+CHUNK_THRESHOLD = 256 * 1024
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 128 * 1024
+BOUNDARY_MASK = 0x3F
+
+
+def split_chunks(content):
+    chunks = []
+    start = 0
+    position = 0
+    length = len(content)
+
+    while position < length:
+        newline = content.find("\n", position, start + MAX_CHUNK_SIZE)
+        if newline == -1:
+            end = min(length, start + MAX_CHUNK_SIZE)
+            chunks.append(content[start:end])
+            start = position = end
+            continue
+
+        line_start = position
+        position = newline + 1
+        if position - start < MIN_CHUNK_SIZE:
+            continue
+
+        line_hash = zlib.crc32(content[line_start:position].encode())
+        if line_hash & BOUNDARY_MASK == 0:
+            chunks.append(content[start:position])
+            start = position
+
+    if start < length:
+        chunks.append(content[start:])
+    return chunks
+
+
+class ChunkStore:
+    def __init__(self, key):
+        self.key = hmac.new(key, b"hiddenote-note-chunks", hashlib.sha256).digest()
+
+    @staticmethod
+    def create_tables(cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS note_chunks (
+                id INTEGER PRIMARY KEY,
+                note_id INTEGER NOT NULL REFERENCES notes (id) ON DELETE CASCADE,
+                digest BLOB NOT NULL,
+                content BLOB NOT NULL
+            )
+        """)
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_note_chunks_note ON note_chunks (note_id)"
+        )
+
+    def chunk_digest(self, chunk):
+        return hmac.new(self.key, chunk.encode(), hashlib.sha256).digest()[:16]
+
+    def existing_chunks(self, cursor, title):
+        cursor.execute(
+            """
+            SELECT c.digest, c.id FROM note_chunks c
+            JOIN notes n ON n.id = c.note_id
+            WHERE n.title = ?
+            """,
+            (title,),
+        )
+        return dict(cursor.fetchall())
@@ -0,0 +1,140 @@
+import argparse
+import getpass
+import os
+import sys
+
+from .api import open_vault
+
+
+PASSWORD_ENV = "HIDDENOTE_PASSWORD"
+
+
+def read_password(args):
+    if args.password_file:
+        with open(args.password_file) as file:
+            return file.readline().rstrip("\n")
+    if os.environ.get(PASSWORD_ENV):
+        return os.environ[PASSWORD_ENV]
+    return getpass.getpass("password: ")
+
+
+def command_list(vault, args):
+    for title, created_at, updated_at in vault.iter_notes():
+        if args.long:
+            print(f"{updated_at}\t{created_at}\t{title}")
+        else:
+            print(title)
+
+
+def command_cat(vault, args):
+    for title in args.titles:
+        sys.stdout.write(vault.read(title))
+
+
+def command_search(vault, args):
+    for title, _, updated_at, score, snippet in vault.search(args.query, args.limit):
+        if args.long:
+            print(f"{score:.3f}\t{updated_at}\t{title}\t{snippet}")
+        else:
+            print(title)
+
+
+def command_put(vault, args):
+    if args.file and args.file != "-":
+        with open(args.file, encoding="utf-8") as file:
+            content = file.read()
+    else:
+        content = sys.stdin.read()
+    vault.write(args.title, content)
+
+
+def command_rm(vault, args):
+    for title in args.titles:
+        if not vault.exists(title):
+            raise KeyError(title)
+        vault.delete(title)
+
+
+def command_export(vault, args):
+    exported = vault.export_notes(args.destination)
+    print(f"exported {exported} notes", file=sys.stderr)
+
+
+def command_import(vault, args):
+    imported, skipped = vault.import_notes(args.source)
+    print(f"imported {imported} notes, skipped {skipped}", file=sys.stderr)
+
+
+def command_sync(vault, args):
+    report = vault.sync(args.directory)
+    print(
+        f"sent {report['sent']}, received {report['received']}, "
+        f"merged {report['merged']} ({report['conflicts']} conflicts) "
+        f"in {report['elapsed']:.2f}s",
+        file=sys.stderr,
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="hiddenote", description="read and write a hiddenote vault"
+    )
+    parser.add_argument("--vault", help="vault name from the registry")
+    parser.add_argument("--db", help="path to a vault database")
+    parser.add_argument("--password-file", help="read the password from a file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list note titles")
+    list_parser.add_argument("-l", "--long", action="store_true")
+    list_parser.set_defaults(handler=command_list)
+
+    cat_parser = commands.add_parser("cat", help="print notes")
+    cat_parser.add_argument("titles", nargs="+")
+    cat_parser.set_defaults(handler=command_cat)
+
+    search_parser = commands.add_parser("search", help="search note contents")
+    search_parser.add_argument("query")
+    search_parser.add_argument("-n", "--limit", type=int, default=50)
+    search_parser.add_argument("-l", "--long", action="store_true")
+    search_parser.set_defaults(handler=command_search)
+
+    put_parser = commands.add_parser("put", help="write a note from a file or stdin")
+    put_parser.add_argument("title")
+    put_parser.add_argument("file", nargs="?")
+    put_parser.set_defaults(handler=command_put)
+
+    rm_parser = commands.add_parser("rm", help="delete notes")
+    rm_parser.add_argument("titles", nargs="+")
+    rm_parser.set_defaults(handler=command_rm)
+
+    export_parser = commands.add_parser("export", help="export to a folder or zip")
+    export_parser.add_argument("destination")
+    export_parser.set_defaults(handler=command_export)
+
+    import_parser = commands.add_parser("import", help="import a folder or zip")
+    import_parser.add_argument("source")
+    import_parser.set_defaults(handler=command_import)
+
+    sync_parser = commands.add_parser("sync", help="sync through a shared folder")
+    sync_parser.add_argument("directory")
+    sync_parser.set_defaults(handler=command_sync)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        with open_vault(read_password(args), name=args.vault, path=args.db) as vault:
+            args.handler(vault, args)
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except KeyError as error:
+        print(f"hiddenote: no such note: {error.args[0]}", file=sys.stderr)
+        return 1
+    except (ValueError, OSError) as error:
+        print(f"hiddenote: {error}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,70 @@
+import bz2
+import lzma
+import zlib
+
+
+BLOB_MAGIC = b"\x00HN"
+BLOB_VERSION = 1
+MIN_COMPRESS_SIZE = 128
+
+
+class Codec:
+    def __init__(self, codec_id, name, compress, decompress):
+        self.codec_id = codec_id
+        self.name = name
+        self.compress = compress
+        self.decompress = decompress
+
+
+CODECS_BY_ID = {}
+CODECS_BY_NAME = {}
+
+
+def register_codec(codec):
+    CODECS_BY_ID[codec.codec_id] = codec
+    CODECS_BY_NAME[codec.name] = codec
+
+
+register_codec(Codec(0, "none", lambda data, level: data, lambda data: data))
+register_codec(
+    Codec(1, "zlib", lambda data, level: zlib.compress(data, level), zlib.decompress)
+)
+register_codec(
+    Codec(2, "bz2", lambda data, level: bz2.compress(data, level), bz2.decompress)
+)
+register_codec(
+    Codec(
+        3,
+        "lzma",
+        lambda data, level: lzma.compress(data, preset=level),
+        lzma.decompress,
+    )
+)
+
+
+def get_codec(name):
+    if name not in CODECS_BY_NAME:
+        raise ValueError(f"unknown compression codec: {name}")
+    return CODECS_BY_NAME[name]
+
+
+def pack(data, codec_name="zlib", level=6):
+    codec = get_codec(codec_name)
+    if len(data) >= MIN_COMPRESS_SIZE and codec.codec_id != 0:
+        compressed = codec.compress(data, level)
+        if len(compressed) < len(data):
+            return BLOB_MAGIC + bytes((BLOB_VERSION, codec.codec_id)) + compressed
+    return BLOB_MAGIC + bytes((BLOB_VERSION, 0)) + data
+
+
+def unpack(blob):
+    if not blob.startswith(BLOB_MAGIC):
+        return blob
+
+    header_end = len(BLOB_MAGIC) + 2
+    version, codec_id = blob[len(BLOB_MAGIC) : header_end]
+    if version != BLOB_VERSION:
+        raise ValueError(f"unsupported note blob version: {version}")
+    if codec_id not in CODECS_BY_ID:
+        raise ValueError(f"unknown compression codec id: {codec_id}")
+    return CODECS_BY_ID[codec_id].decompress(blob[header_end:])
@@ -1,152 +1,699 @@
 import sqlite3
 import hashlib
 import os
-from cryptography.fernet import Fernet
+import threading
+import time
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-import base64
+import json
+
+from . import compression
+from .attachments import AttachmentStore
+from .chunks import (
+    ChunkStore,
+    split_chunks,
+    CHUNK_THRESHOLD,
+    NOTE_FORMAT_INLINE,
+    NOTE_FORMAT_CHUNKED,
+)
+from .history import RevisionStore
+from .maintenance import convert_auto_vacuum
+from .migrations import MigrationRunner, migrate_schema
+from .note_cipher import NoteCipher, wrap_key, unwrap_key
+from .note_cache import NoteCache, DEFAULT_CACHE_BUDGET
+from .search_index import SearchIndex
+from .sync import ChangeJournal
+from .title_index import TitleIndex
+from .writer import NoteWriter
+
+
+WRONG_PASSWORD = "that's not the right password"
+SQLITE_PRAGMAS = (
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA foreign_keys = ON",
+)
+
+CATALOG_PAGE_SIZE = 200
+
+UPSERT_NOTE_SQL = """
+    INSERT INTO notes (title, content, format) VALUES (?, ?, ?)
+    ON CONFLICT (title) DO UPDATE SET
+        content = excluded.content,
+        format = excluded.format,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def legacy_password_hash(password):
+    return hashlib.sha256(password.encode()).hexdigest()
 
 
 class DatabaseManager:
-    def __init__(self, db_path="hiddenote.db"):
+    def __init__(
+        self,
+        db_path="hiddenote.db",
+        cache_budget=DEFAULT_CACHE_BUDGET,
+        compression_codec="zlib",
+        compression_level=6,
+    ):
         self.db_path = db_path
+        self.compression_codec = compression.get_codec(compression_codec).name
+        self.compression_level = compression_level
         self.cipher_suite = None
+        self.data_key = None
+        self.search_index = None
+        self.chunk_store = None
+        self.revisions = RevisionStore(self)
+        self.attachments = AttachmentStore(self)
+        self.journal = ChangeJournal(self)
+        self.feed_position = 0
+        self.data_version = None
+        self.note_cache = NoteCache(cache_budget)
+        self.title_index = TitleIndex()
+        self.note_digests = {}
+        self.skipped_saves = 0
+        self.lock = threading.RLock()
+        self.conn = self.open_connection()
         self.init_db()
+        self.writer = NoteWriter(self.write_notes)
+        self.writer.start()
+
+    def open_connection(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def close(self):
+        self.writer.flush()
+        self.writer.stop()
+        self.note_cache.clear()
+        self.data_key = None
+        with self.lock:
+            if self.conn is not None:
+                self.conn.execute("PRAGMA optimize")
+                convert_auto_vacuum(self.conn)
+                self.conn.close()
+                self.conn = None
 
     def init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_auth (
-                id INTEGER PRIMARY KEY,
-                password_hash TEXT NOT NULL,
-                salt BLOB NOT NULL
-            )
-        """)
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL UNIQUE,
-                content BLOB NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        conn.commit()
-        conn.close()
-
-    def setup_encryption(self, password):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT salt FROM user_auth WHERE id = 1")
-        result = cursor.fetchone()
-
-        is_first_setup = result is None
-
-        if result:
-            salt = result[0]
-        else:
-            salt = os.urandom(16)
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            cursor.execute(
-                "INSERT INTO user_auth (password_hash, salt) VALUES (?, ?)",
-                (password_hash, salt),
-            )
-            conn.commit()
-
-        conn.close()
-
+        with self.lock:
+            migrate_schema(self.conn)
+            self.journal.load(self.conn.cursor())
+            self.data_version = self.read_data_version()
+            self.feed_position = self.conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM note_changes"
+            ).fetchone()[0]
+
+    def derive_password_key(self, password, salt):
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
             salt=salt,
             iterations=100000,
         )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        self.cipher_suite = Fernet(key)
+        return kdf.derive(password.encode())
+
+    def setup_encryption(self, password, background=True):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT password_hash, salt, wrapped_key FROM user_auth WHERE id = 1"
+            )
+            result = cursor.fetchone()
+
+        is_first_setup = result is None
+
+        if is_first_setup:
+            salt = os.urandom(16)
+            data_key = os.urandom(32)
+            password_key = self.derive_password_key(password, salt)
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "INSERT INTO user_auth (password_hash, salt, wrapped_key) VALUES ('', ?, ?)",
+                    (salt, wrap_key(password_key, data_key)),
+                )
+        else:
+            password_hash, salt, wrapped_key = result
+            if wrapped_key is None:
+                if password_hash != legacy_password_hash(password):
+                    raise ValueError(WRONG_PASSWORD)
+                data_key = self.derive_password_key(password, salt)
+                wrapped_key = wrap_key(data_key, data_key)
+            else:
+                data_key = self.unwrap_data_key(password, salt, wrapped_key)
+            if password_hash:
+                with self.lock, self.conn:
+                    self.conn.execute(
+                        "UPDATE user_auth SET password_hash = '', wrapped_key = ? WHERE id = 1",
+                        (wrapped_key,),
+                    )
+
+        self.data_key = data_key
+        self.cipher_suite = NoteCipher(data_key)
+        self.search_index = SearchIndex(data_key)
+        self.chunk_store = ChunkStore(data_key)
 
         if is_first_setup:
             self.create_welcome_note()
 
-    def verify_password(self, password):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash FROM user_auth WHERE id = 1")
-        result = cursor.fetchone()
-        conn.close()
+        if background:
+            threading.Thread(
+                target=self.run_background_tasks,
+                name="hiddenote-maintenance",
+                daemon=True,
+            ).start()
+
+    def change_password(self, old_password, new_password):
+        if self.data_key is None or not self.verify_password(old_password):
+            return False
+
+        salt = os.urandom(16)
+        password_key = self.derive_password_key(new_password, salt)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE user_auth SET password_hash = '', salt = ?, wrapped_key = ? WHERE id = 1",
+                (salt, wrap_key(password_key, self.data_key)),
+            )
+        return True
 
-        if result:
-            stored_hash = result[0]
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            return stored_hash == password_hash
-        return False
+    def verify_password(self, password):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT password_hash, salt, wrapped_key FROM user_auth WHERE id = 1"
+            )
+            result = cursor.fetchone()
+
+        if not result:
+            return False
+        password_hash, salt, wrapped_key = result
+        if wrapped_key is None:
+            return password_hash == legacy_password_hash(password)
+        try:
+            self.unwrap_data_key(password, salt, wrapped_key)
+        except ValueError:
+            return False
+        return True
+
+    def unwrap_data_key(self, password, salt, wrapped_key):
+        try:
+            return unwrap_key(self.derive_password_key(password, salt), wrapped_key)
+        except InvalidTag:
+            raise ValueError(WRONG_PASSWORD) from None
 
     def is_first_time(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM user_auth")
-        count = cursor.fetchone()[0]
-        conn.close()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM user_auth")
+            count = cursor.fetchone()[0]
         return count == 0
 
     def encrypt_content(self, content):
-        return self.cipher_suite.encrypt(content.encode())
+        payload = compression.pack(
+            content.encode(), self.compression_codec, self.compression_level
+        )
+        return self.cipher_suite.encrypt(payload)
 
     def decrypt_content(self, encrypted_content):
-        return self.cipher_suite.decrypt(encrypted_content).decode()
+        payload = self.cipher_suite.decrypt(encrypted_content)
+        return compression.unpack(payload).decode()
+
+    @staticmethod
+    def content_digest(content):
+        return hashlib.blake2b(content.encode(), digest_size=16).digest()
 
     def save_note(self, title, content):
-        encrypted_content = self.encrypt_content(content)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        pending = self.writer.snapshot(title)
+        if pending is None:
+            unchanged = self.note_digests.get(title) == self.content_digest(content)
+        else:
+            unchanged = pending == content
+        if unchanged:
+            self.skipped_saves += 1
+            return False
+
+        self.note_cache.invalidate(title)
+        self.writer.submit(title, content)
+        return True
+
+    def flush(self):
+        self.writer.flush()
+
+    def write_notes(self, notes):
+        plans = []
+        for title, content in notes.items():
+            plan = self.prepare_note(title, content)
+            plan["text"] = content
+            plans.append(plan)
+        with self.lock:
+            plans = [plan for plan in plans if self.writer.holds(plan["title"])]
+            if plans:
+                self.commit_notes(plans)
+            for plan in plans:
+                self.note_cache.put(plan["title"], plan["text"])
+                self.note_digests[plan["title"]] = self.content_digest(plan["text"])
+
+    def commit_notes(self, plans):
+        with self.lock, self.conn:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            prepared_notes = []
+            for plan in plans:
+                if "text" in plan:
+                    previous = self.stored_content(cursor, plan["title"])
+                note_id = self.store_note(cursor, plan)
+                prepared_notes.append((note_id, plan["terms"]))
+                if "text" in plan:
+                    self.revisions.record(cursor, note_id, previous, plan["text"])
+                if "journal" in plan:
+                    self.journal.store(cursor, plan["title"], *plan["journal"])
+                else:
+                    self.journal.record(cursor, plan["title"])
+            self.search_index.index_notes(cursor, prepared_notes)
+        for plan in plans:
+            self.title_index.add(plan["title"])
+        self.advance_feed()
+
+    def read_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def advance_feed(self):
+        with self.lock:
+            if self.read_data_version() != self.data_version:
+                return
+            self.feed_position = self.conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM note_changes"
+            ).fetchone()[0]
+
+    def poll_changes(self):
+        with self.lock:
+            if self.conn is None:
+                return []
+            data_version = self.read_data_version()
+            if data_version == self.data_version:
+                return []
+            self.data_version = data_version
+
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT MIN(seq) FROM note_changes")
+            oldest = cursor.fetchone()[0]
+            trimmed = oldest is not None and oldest > self.feed_position + 1
+            if trimmed:
+                self.feed_position = self.conn.execute(
+                    "SELECT MAX(seq) FROM note_changes"
+                ).fetchone()[0]
+                self.note_cache.clear()
+                self.note_digests.clear()
+            else:
+                cursor.execute(
+                    "SELECT seq, title FROM note_changes WHERE seq > ? ORDER BY seq",
+                    (self.feed_position,),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    return []
+                self.feed_position = rows[-1][0]
+
+        if trimmed:
+            self.title_index.unload()
+            return None
+
+        changes = []
+        for title in dict.fromkeys(title for _, title in rows):
+            with self.lock:
+                cursor = self.conn.cursor()
+                cursor.execute(
+                    "SELECT created_at, updated_at FROM notes WHERE title = ?",
+                    (title,),
+                )
+                result = cursor.fetchone()
+            if result is None:
+                self.forget_notes([title])
+                self.title_index.discard(title)
+                changes.append((title, None, None, True))
+                continue
+
+            if self.writer.snapshot(title) is not None:
+                continue
+            known_digest = self.note_digests.get(title)
+            if known_digest is not None:
+                content = "".join(self.iter_note_chunks(title))
+                if self.content_digest(content) == known_digest:
+                    continue
+            self.forget_notes([title])
+            self.title_index.add(title)
+            changes.append((title, result[0], result[1], False))
+        return changes
+
+    def committed_content(self, title):
+        content = self.note_cache.peek(title)
+        if content is not None:
+            return content
+        chunks = list(self.iter_note_chunks(title))
+        return "".join(chunks) if chunks else None
+
+    def forget_notes(self, titles):
+        for title in titles:
+            self.note_cache.invalidate(title)
+            self.note_digests.pop(title, None)
+
+    def prepare_note(self, title, content):
+        terms = self.search_index.prepare_terms(content)
+        if len(content) < CHUNK_THRESHOLD:
+            return {
+                "title": title,
+                "format": NOTE_FORMAT_INLINE,
+                "content": self.encrypt_content(content),
+                "terms": terms,
+            }
+
+        with self.lock:
+            existing = self.chunk_store.existing_chunks(self.conn.cursor(), title)
+
+        order = []
+        new_chunks = {}
+        for chunk in split_chunks(content):
+            digest = self.chunk_store.chunk_digest(chunk)
+            order.append(digest)
+            if digest not in existing and digest not in new_chunks:
+                new_chunks[digest] = self.encrypt_content(chunk)
+
+        return {
+            "title": title,
+            "format": NOTE_FORMAT_CHUNKED,
+            "order": order,
+            "existing": existing,
+            "new_chunks": new_chunks,
+            "terms": terms,
+        }
+
+    def store_note(self, cursor, plan):
+        title = plan["title"]
+        if plan["format"] == NOTE_FORMAT_INLINE:
+            cursor.execute(UPSERT_NOTE_SQL, (title, plan["content"], NOTE_FORMAT_INLINE))
+            note_id = self.note_id(cursor, title)
+            cursor.execute("DELETE FROM note_chunks WHERE note_id = ?", (note_id,))
+            return note_id
+
+        cursor.execute(UPSERT_NOTE_SQL, (title, b"", NOTE_FORMAT_CHUNKED))
+        note_id = self.note_id(cursor, title)
+
+        chunk_ids = dict(plan["existing"])
+        for digest, encrypted_chunk in plan["new_chunks"].items():
+            cursor.execute(
+                "INSERT INTO note_chunks (note_id, digest, content) VALUES (?, ?, ?)",
+                (note_id, digest, encrypted_chunk),
+            )
+            chunk_ids[digest] = cursor.lastrowid
 
+        manifest = [chunk_ids[digest] for digest in plan["order"]]
+        unused = set(chunk_ids.values()) - set(manifest)
+        cursor.executemany(
+            "DELETE FROM note_chunks WHERE id = ?", [(chunk_id,) for chunk_id in unused]
+        )
+        cursor.execute(
+            "UPDATE notes SET content = ? WHERE id = ?",
+            (self.encrypt_content(json.dumps(manifest)), note_id),
+        )
+        return note_id
+
+    def note_id(self, cursor, title):
         cursor.execute("SELECT id FROM notes WHERE title = ?", (title,))
-        existing = cursor.fetchone()
+        return cursor.fetchone()[0]
 
-        if existing:
+    def stored_content(self, cursor, title):
+        cursor.execute("SELECT content, format FROM notes WHERE title = ?", (title,))
+        result = cursor.fetchone()
+        if not result:
+            return None
+
+        encrypted_content, note_format = result
+        if note_format != NOTE_FORMAT_CHUNKED:
+            return self.decrypt_content(encrypted_content)
+
+        chunks = []
+        for chunk_id in json.loads(self.decrypt_content(encrypted_content)):
+            cursor.execute("SELECT content FROM note_chunks WHERE id = ?", (chunk_id,))
+            chunks.append(self.decrypt_content(cursor.fetchone()[0]))
+        return "".join(chunks)
+
+    def iter_note_chunks(self, title):
+        with self.lock:
+            cursor = self.conn.cursor()
             cursor.execute(
-                "UPDATE notes SET content = ?, updated_at = CURRENT_TIMESTAMP WHERE title = ?",
-                (encrypted_content, title),
+                "SELECT content, format FROM notes WHERE title = ?", (title,)
             )
-        else:
+            result = cursor.fetchone()
+        if not result:
+            return
+
+        encrypted_content, note_format = result
+        if note_format != NOTE_FORMAT_CHUNKED:
+            yield self.decrypt_content(encrypted_content)
+            return
+
+        for chunk_id in json.loads(self.decrypt_content(encrypted_content)):
+            with self.lock:
+                cursor = self.conn.cursor()
+                cursor.execute(
+                    "SELECT content FROM note_chunks WHERE id = ?", (chunk_id,)
+                )
+                encrypted_chunk = cursor.fetchone()[0]
+            yield self.decrypt_content(encrypted_chunk)
+
+    def run_background_tasks(self):
+        MigrationRunner(self).run()
+
+    def search_notes(self, query, limit=50):
+        with self.lock:
+            cursor = self.conn.cursor()
+            ranked = self.search_index.search(cursor, query, limit)
+            if not ranked:
+                return []
+
+            placeholders = ", ".join("?" * len(ranked))
             cursor.execute(
-                "INSERT INTO notes (title, content) VALUES (?, ?)",
-                (title, encrypted_content),
+                f"""
+                SELECT id, title, created_at, updated_at FROM notes
+                WHERE id IN ({placeholders})
+                """,
+                [note_id for note_id, _ in ranked],
             )
+            rows = {row[0]: row[1:] for row in cursor.fetchall()}
 
-        conn.commit()
-        conn.close()
+        results = []
+        for note_id, score in ranked:
+            title, created_at, updated_at = rows[note_id]
+            content = self.load_note(title)
+            snippet = self.search_index.snippet(content, query)
+            results.append((title, created_at, updated_at, score, snippet))
+        return results
 
     def load_note(self, title):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT content FROM notes WHERE title = ?", (title,))
-        result = cursor.fetchone()
-        conn.close()
-
-        if result:
-            return self.decrypt_content(result[0])
+        content = self.writer.snapshot(title)
+        if content is not None:
+            return content
+
+        content = self.note_cache.get(title)
+        if content is not None:
+            self.note_digests[title] = self.content_digest(content)
+            return content
+
+        chunks = list(self.iter_note_chunks(title))
+        if chunks:
+            content = "".join(chunks)
+            self.note_cache.put(title, content)
+            self.note_digests[title] = self.content_digest(content)
+            return content
         return ""
 
+    def list_revisions(self, title):
+        self.writer.flush()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id FROM notes WHERE title = ?", (title,))
+            result = cursor.fetchone()
+            if not result:
+                return []
+            return self.revisions.list_revisions(cursor, result[0])
+
+    def load_revision(self, title, revision_id):
+        self.writer.flush()
+        current = self.load_note(title)
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id FROM notes WHERE title = ?", (title,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+            return self.revisions.load_revision(
+                cursor, result[0], current, revision_id
+            )
+
+    def restore_revision(self, title, revision_id):
+        content = self.load_revision(title, revision_id)
+        if content is None:
+            return None
+        self.save_note(title, content)
+        return content
+
+    def cache_stats(self):
+        return self.note_cache.stats()
+
     def get_all_notes(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.writer.flush()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT title, created_at, updated_at FROM notes ORDER BY updated_at DESC, title DESC"
+            )
+            return cursor.fetchall()
+
+    def pending_summaries(self, cursor):
+        titles = self.writer.pending_titles()
+        if not titles:
+            return {}
+        now = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        placeholders = ", ".join("?" * len(titles))
         cursor.execute(
-            "SELECT title, created_at, updated_at FROM notes ORDER BY updated_at DESC"
+            f"SELECT title, created_at FROM notes WHERE title IN ({placeholders})",
+            titles,
         )
-        notes = cursor.fetchall()
-        conn.close()
-        return notes
-
-    def delete_note(self, title):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM notes WHERE title = ?", (title,))
-        conn.commit()
-        conn.close()
+        created = dict(cursor.fetchall())
+        return {title: (title, created.get(title, now), now) for title in titles}
+
+    def get_notes_page(self, after=None, limit=CATALOG_PAGE_SIZE):
+        with self.lock:
+            cursor = self.conn.cursor()
+            pending = self.pending_summaries(cursor)
+            if after is None:
+                cursor.execute(
+                    """
+                    SELECT title, created_at, updated_at FROM notes
+                    ORDER BY updated_at DESC, title DESC
+                    LIMIT ?
+                    """,
+                    (limit + len(pending),),
+                )
+            else:
+                updated_at, title = after
+                cursor.execute(
+                    """
+                    SELECT title, created_at, updated_at FROM notes
+                    WHERE (updated_at, title) < (?, ?)
+                    ORDER BY updated_at DESC, title DESC
+                    LIMIT ?
+                    """,
+                    (updated_at, title, limit + len(pending)),
+                )
+            rows = cursor.fetchall()
+
+        if not pending:
+            return rows
+        rows = [row for row in rows if row[0] not in pending]
+        rows += [
+            row
+            for row in pending.values()
+            if after is None or (row[2], row[0]) < tuple(after)
+        ]
+        rows.sort(key=lambda row: (row[2], row[0]), reverse=True)
+        return rows[:limit]
+
+    def load_title_index(self):
+        replay = self.title_index.start_load()
+        if replay is None:
+            return
+        with self.lock:
+            if self.conn is None:
+                return
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT title FROM notes ORDER BY updated_at DESC, title DESC"
+            )
+            titles = [row[0] for row in cursor.fetchall()]
+        self.title_index.load(titles, replay)
+
+    def search_titles(self, text, limit=CATALOG_PAGE_SIZE):
+        titles = self.title_index.search(text, limit)
+        if titles is None:
+            return self.match_titles(text, limit)
+        if not titles:
+            return []
+        placeholders = ", ".join("?" * len(titles))
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT title, created_at, updated_at FROM notes
+                WHERE title IN ({placeholders})
+                """,
+                titles,
+            )
+            rows = {row[0]: row for row in cursor.fetchall()}
+            rows.update(self.pending_summaries(cursor))
+        return [rows[title] for title in titles if title in rows]
+
+    def match_titles(self, text, limit):
+        pattern = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                """
+                SELECT title, created_at, updated_at FROM notes
+                WHERE title LIKE ? ESCAPE '\\'
+                ORDER BY updated_at DESC, title DESC
+                LIMIT ?
+                """,
+                (f"%{pattern}%", limit),
+            )
+            rows = cursor.fetchall()
+            pending = self.pending_summaries(cursor)
+        return [pending.get(row[0], row) for row in rows]
+
+    def get_note_summary(self, title):
+        with self.lock:
+            cursor = self.conn.cursor()
+            pending = self.pending_summaries(cursor)
+            if title in pending:
+                return pending[title]
+            cursor.execute(
+                "SELECT title, created_at, updated_at FROM notes WHERE title = ?",
+                (title,),
+            )
+            return cursor.fetchone()
+
+    def note_exists(self, title):
+        if self.writer.snapshot(title) is not None:
+            return True
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT 1 FROM notes WHERE title = ?", (title,))
+            return cursor.fetchone() is not None
+
+    def delete_note(self, title, journal=None):
+        with self.lock, self.conn:
+            self.writer.discard(title)
+            self.note_cache.invalidate(title)
+            self.note_digests.pop(title, None)
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM notes WHERE title = ?", (title,))
+            if journal:
+                self.journal.store(cursor, title, *journal)
+            elif cursor.rowcount:
+                self.journal.record(cursor, title, deleted=True)
+        self.title_index.discard(title)
+        self.advance_feed()
 
     def create_welcome_note(self):
         welcome_content = """# Welcome to hiddenote!
@@ -161,6 +708,7 @@ Here are some essential shortcuts to help you navigate:
 - **Ctrl+N** or **Insert** - Create a new note
 - **Ctrl+S** - Save current note
 - **Ctrl+F** - Focus search box
+- **Ctrl+P** - Jump to any note by typing part of its title
 - **Delete** - Delete selected note (when note is selected in list)
 
 ### Interface Tips
@@ -0,0 +1,166 @@
+import json
+import time
+
+
+MIN_REVISION_INTERVAL = 60
+PRUNE_SLACK = 64
+RETENTION_TIERS = (
+    (60 * 60, 0),
+    (24 * 60 * 60, 60 * 60),
+    (30 * 24 * 60 * 60, 24 * 60 * 60),
+)
+
+
+def retention_capacity():
+    capacity = 0
+    tier_start = 0
+    for max_age, spacing in RETENTION_TIERS:
+        capacity += (max_age - tier_start) // (spacing or MIN_REVISION_INTERVAL) + 1
+        tier_start = max_age
+    return capacity
+
+
+PRUNE_THRESHOLD = retention_capacity() + PRUNE_SLACK
+
+
+def make_delta(current, previous):
+    current_lines = current.splitlines(keepends=True)
+    previous_lines = previous.splitlines(keepends=True)
+
+    prefix = 0
+    limit = min(len(current_lines), len(previous_lines))
+    while prefix < limit and current_lines[prefix] == previous_lines[prefix]:
+        prefix += 1
+
+    suffix = 0
+    limit -= prefix
+    while (
+        suffix < limit
+        and current_lines[-1 - suffix] == previous_lines[-1 - suffix]
+    ):
+        suffix += 1
+
+    middle = previous_lines[prefix : len(previous_lines) - suffix]
+    return [prefix, suffix, "".join(middle)]
+
+
+def apply_delta(current, delta):
+    prefix, suffix, middle = delta
+    current_lines = current.splitlines(keepends=True)
+    head = current_lines[:prefix]
+    tail = current_lines[len(current_lines) - suffix :] if suffix else []
+    return "".join(head) + middle + "".join(tail)
+
+
+def retention_slot(age):
+    for max_age, spacing in RETENTION_TIERS:
+        if age < max_age:
+            return spacing
+    return None
+
+
+class RevisionStore:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def encode(self, delta):
+        return self.db_manager.encrypt_content(json.dumps(delta))
+
+    def decode(self, blob):
+        return json.loads(self.db_manager.decrypt_content(blob))
+
+    def record(self, cursor, note_id, previous, current):
+        if previous is None or previous == current:
+            return
+
+        now = time.time()
+        cursor.execute(
+            """
+            SELECT id, saved_at, content FROM note_revisions
+            WHERE note_id = ? ORDER BY id DESC LIMIT 1
+            """,
+            (note_id,),
+        )
+        newest = cursor.fetchone()
+
+        if newest and now - newest[1] < MIN_REVISION_INTERVAL:
+            older = apply_delta(previous, self.decode(newest[2]))
+            if older == current:
+                cursor.execute("DELETE FROM note_revisions WHERE id = ?", (newest[0],))
+            else:
+                cursor.execute(
+                    "UPDATE note_revisions SET content = ? WHERE id = ?",
+                    (self.encode(make_delta(current, older)), newest[0]),
+                )
+            return
+
+        cursor.execute(
+            "INSERT INTO note_revisions (note_id, saved_at, content) VALUES (?, ?, ?)",
+            (note_id, now, self.encode(make_delta(current, previous))),
+        )
+
+        cursor.execute(
+            "SELECT COUNT(*) FROM note_revisions WHERE note_id = ?", (note_id,)
+        )
+        if cursor.fetchone()[0] > PRUNE_THRESHOLD:
+            self.prune(cursor, note_id, current, now)
+
+    def list_revisions(self, cursor, note_id):
+        cursor.execute(
+            """
+            SELECT id, saved_at FROM note_revisions
+            WHERE note_id = ? ORDER BY id DESC
+            """,
+            (note_id,),
+        )
+        return cursor.fetchall()
+
+    def iter_versions(self, cursor, note_id, current):
+        cursor.execute(
+            """
+            SELECT id, saved_at, content FROM note_revisions
+            WHERE note_id = ? ORDER BY id DESC
+            """,
+            (note_id,),
+        )
+        version = current
+        for revision_id, saved_at, blob in cursor:
+            version = apply_delta(version, self.decode(blob))
+            yield revision_id, saved_at, version
+
+    def load_revision(self, cursor, note_id, current, revision_id):
+        for candidate_id, _, version in self.iter_versions(cursor, note_id, current):
+            if candidate_id == revision_id:
+                return version
+        return None
+
+    def prune(self, cursor, note_id, current, now=None):
+        now = time.time() if now is None else now
+        reader = cursor.connection.cursor()
+
+        dropped = []
+        rewritten = []
+        taken_slots = set()
+        newer = current
+        neighbour_dropped = False
+        for revision_id, saved_at, version in self.iter_versions(
+            reader, note_id, current
+        ):
+            spacing = retention_slot(now - saved_at)
+            slot = (spacing, int(saved_at // spacing)) if spacing else None
+            if spacing is None or slot in taken_slots:
+                dropped.append((revision_id,))
+                neighbour_dropped = True
+                continue
+            if slot:
+                taken_slots.add(slot)
+            if neighbour_dropped:
+                rewritten.append((self.encode(make_delta(newer, version)), revision_id))
+                neighbour_dropped = False
+            newer = version
+        reader.close()
+
+        cursor.executemany("DELETE FROM note_revisions WHERE id = ?", dropped)
+        cursor.executemany(
+            "UPDATE note_revisions SET content = ? WHERE id = ?", rewritten
+        )
@@ -0,0 +1,233 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+MAINTENANCE_INTERVAL = 15 * 60
+REINDEX_INTERVAL = 7 * 24 * 60 * 60
+CHANGE_FEED_RETENTION = 7 * 24 * 60 * 60
+VACUUM_PAGES_PER_STEP = 64
+CONVERT_MAX_BYTES = 16 * 1024 * 1024
+ANALYSIS_LIMIT = 400
+REINDEX_MAX_ROWS = 5000
+SLICE_SECONDS = 0.01
+STEP_PAUSE = 0.01
+
+
+def convert_auto_vacuum(conn):
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 0:
+        return
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    if page_count * page_size > CONVERT_MAX_BYTES:
+        return
+    try:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    except sqlite3.OperationalError:
+        pass
+
+
+class MaintenanceRunner:
+    def __init__(
+        self, db_manager, step_pause=STEP_PAUSE, interval=MAINTENANCE_INTERVAL
+    ):
+        self.db_manager = db_manager
+        self.step_pause = step_pause
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.last_completed = 0
+        self.last_report = None
+
+    def tasks(self):
+        return [
+            ("trim-change-feed", self.trim_change_feed),
+            ("incremental-vacuum", self.incremental_vacuum),
+            ("reindex", self.reindex),
+            ("optimize", self.optimize),
+            ("checkpoint", self.checkpoint),
+        ]
+
+    def is_due(self):
+        return time.time() - self.last_completed >= self.interval
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        self.stop_event.clear()
+        report = {"reclaimed": 0, "elapsed": 0.0, "tasks": {}, "completed": False}
+        started = time.perf_counter()
+
+        for name, task in self.tasks():
+            task_started = time.perf_counter()
+            for reclaimed in task():
+                report["reclaimed"] += reclaimed
+                if self.stop_event.is_set() or self.db_manager.conn is None:
+                    break
+                time.sleep(self.step_pause)
+            report["tasks"][name] = time.perf_counter() - task_started
+            if self.stop_event.is_set() or self.db_manager.conn is None:
+                break
+        else:
+            report["completed"] = True
+            self.last_completed = time.time()
+
+        report["elapsed"] = time.perf_counter() - started
+        self.last_report = report
+        return report
+
+    def locked_cursor(self):
+        self.db_manager.lock.acquire()
+        if self.db_manager.conn is None:
+            self.db_manager.lock.release()
+            return None
+        return self.db_manager.conn.cursor()
+
+    def pragma(self, cursor, name):
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+    def wal_size(self):
+        path = self.db_manager.db_path + "-wal"
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def checkpoint(self):
+        cursor = self.locked_cursor()
+        if cursor is None:
+            return
+        try:
+            before = self.wal_size()
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            cursor.fetchall()
+            reclaimed = before - self.wal_size()
+        finally:
+            self.db_manager.lock.release()
+        yield max(reclaimed, 0)
+
+    def trim_change_feed(self):
+        cursor = self.locked_cursor()
+        if cursor is None:
+            return
+        try:
+            with self.db_manager.conn:
+                cursor.execute(
+                    "DELETE FROM note_changes WHERE changed_at < ?",
+                    (time.time() - CHANGE_FEED_RETENTION,),
+                )
+        finally:
+            self.db_manager.lock.release()
+        yield 0
+
+    def incremental_vacuum(self):
+        cursor = self.locked_cursor()
+        if cursor is None:
+            return
+        try:
+            page_size = self.pragma(cursor, "page_size")
+            auto_vacuum = self.pragma(cursor, "auto_vacuum")
+            free_pages = self.pragma(cursor, "freelist_count")
+        finally:
+            self.db_manager.lock.release()
+        if auto_vacuum == 0:
+            return
+
+        while free_pages:
+            cursor = self.locked_cursor()
+            if cursor is None:
+                return
+            try:
+                remaining = self.vacuum_slice(cursor, free_pages)
+            finally:
+                self.db_manager.lock.release()
+            reclaimed = (free_pages - remaining) * page_size
+            if not reclaimed:
+                return
+            free_pages = remaining
+            yield reclaimed
+
+    def vacuum_slice(self, cursor, free_pages):
+        deadline = time.perf_counter() + SLICE_SECONDS
+        target = max(free_pages - VACUUM_PAGES_PER_STEP, 0)
+        remaining = free_pages
+        cursor.execute("BEGIN")
+        try:
+            while remaining > target and time.perf_counter() < deadline:
+                cursor.execute("PRAGMA incremental_vacuum(1)")
+                remaining = self.pragma(cursor, "freelist_count")
+        finally:
+            self.db_manager.conn.commit()
+        return remaining
+
+    def reindex(self):
+        cursor = self.locked_cursor()
+        if cursor is None:
+            return
+        try:
+            cursor.execute(
+                "SELECT finished_at FROM maintenance_runs WHERE task = 'reindex'"
+            )
+            result = cursor.fetchone()
+            if result and time.time() - result[0] < REINDEX_INTERVAL:
+                return
+            indexes = self.small_indexes(cursor)
+        finally:
+            self.db_manager.lock.release()
+
+        for index in indexes:
+            cursor = self.locked_cursor()
+            if cursor is None:
+                return
+            try:
+                cursor.execute(f'REINDEX "{index}"')
+            finally:
+                self.db_manager.lock.release()
+            yield 0
+
+        self.record_run("reindex")
+
+    def small_indexes(self, cursor):
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        )
+        if cursor.fetchone() is None:
+            return []
+        cursor.execute(
+            """
+            SELECT m.name, s.stat FROM sqlite_master m
+            JOIN sqlite_stat1 s ON s.idx = m.name
+            WHERE m.type = 'index' AND m.sql IS NOT NULL
+            ORDER BY m.name
+            """
+        )
+        return [
+            name
+            for name, stat in cursor.fetchall()
+            if int(stat.split()[0]) <= REINDEX_MAX_ROWS
+        ]
+
+    def optimize(self):
+        cursor = self.locked_cursor()
+        if cursor is None:
+            return
+        try:
+            cursor.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            cursor.execute("PRAGMA optimize")
+        finally:
+            self.db_manager.lock.release()
+        self.record_run("optimize")
+        yield 0
+
+    def record_run(self, task):
+        with self.db_manager.lock:
+            if self.db_manager.conn is None:
+                return
+            with self.db_manager.conn:
+                self.db_manager.conn.execute(
+                    """
+                    INSERT INTO maintenance_runs (task, finished_at) VALUES (?, ?)
+                    ON CONFLICT (task) DO UPDATE SET finished_at = excluded.finished_at
+                    """,
+                    (task, time.time()),
+                )
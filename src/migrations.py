@@ -0,0 +1,341 @@
+import time
+
+from .attachments import AttachmentStore
+from .chunks import ChunkStore
+from .note_cipher import FERNET_PREFIX
+from .search_index import SearchIndex
+from .sync import ChangeJournal
+
+
+BACKGROUND_BATCH_SIZE = 200
+BACKGROUND_THROTTLE = 0.05
+
+
+def add_column(cursor, table, column, definition):
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def create_base_tables(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_auth (
+            id INTEGER PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            salt BLOB NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL UNIQUE,
+            content BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def add_search_index(cursor):
+    SearchIndex.create_tables(cursor)
+
+
+def add_chunked_storage(cursor):
+    add_column(cursor, "notes", "format", "INTEGER NOT NULL DEFAULT 0")
+    ChunkStore.create_tables(cursor)
+
+
+def add_wrapped_key(cursor):
+    add_column(cursor, "user_auth", "wrapped_key", "BLOB")
+
+
+def add_catalog_index(cursor):
+    cursor.execute("DROP INDEX IF EXISTS idx_notes_updated_at")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_notes_catalog ON notes (updated_at, title)"
+    )
+
+
+def add_migration_progress(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS migration_progress (
+            name TEXT PRIMARY KEY,
+            position INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def add_revision_history(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS note_revisions (
+            id INTEGER PRIMARY KEY,
+            note_id INTEGER NOT NULL REFERENCES notes (id) ON DELETE CASCADE,
+            saved_at REAL NOT NULL,
+            content BLOB NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_note_revisions_note
+        ON note_revisions (note_id, id)
+    """)
+
+
+def add_maintenance_runs(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS maintenance_runs (
+            task TEXT PRIMARY KEY,
+            finished_at REAL NOT NULL
+        )
+    """)
+
+
+def add_attachments(cursor):
+    AttachmentStore.create_tables(cursor)
+
+
+def add_change_journal(cursor):
+    ChangeJournal.create_tables(cursor)
+
+
+def add_change_feed(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS note_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            changed_at REAL NOT NULL
+                DEFAULT ((julianday('now') - 2440587.5) * 86400.0)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS notes_feed_insert AFTER INSERT ON notes
+        BEGIN
+            INSERT INTO note_changes (title) VALUES (new.title);
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS notes_feed_update
+        AFTER UPDATE OF title, updated_at ON notes
+        BEGIN
+            INSERT INTO note_changes (title, deleted)
+            SELECT old.title, 1 WHERE old.title IS NOT new.title;
+            INSERT INTO note_changes (title) VALUES (new.title);
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS notes_feed_delete AFTER DELETE ON notes
+        BEGIN
+            INSERT INTO note_changes (title, deleted) VALUES (old.title, 1);
+        END
+    """)
+
+
+def clear_journal_bases(cursor):
+    cursor.execute("UPDATE note_journal SET base = NULL")
+
+
+def drop_search_hits(cursor):
+    cursor.execute("DROP INDEX IF EXISTS idx_search_terms_note")
+    cursor.execute("ALTER TABLE search_terms RENAME TO search_terms_hits")
+    SearchIndex.create_tables(cursor)
+    cursor.execute(
+        "INSERT INTO search_terms (term, note_id) "
+        "SELECT term, note_id FROM search_terms_hits"
+    )
+    cursor.execute("DROP TABLE search_terms_hits")
+
+
+SCHEMA_MIGRATIONS = [
+    (1, create_base_tables),
+    (2, add_search_index),
+    (3, add_chunked_storage),
+    (4, add_wrapped_key),
+    (5, add_catalog_index),
+    (6, add_migration_progress),
+    (7, add_revision_history),
+    (8, add_maintenance_runs),
+    (9, add_attachments),
+    (10, add_change_journal),
+    (11, add_change_feed),
+    (12, clear_journal_bases),
+    (13, drop_search_hits),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_schema(conn):
+    version = schema_version(conn)
+    for target, apply in SCHEMA_MIGRATIONS:
+        if target <= version:
+            continue
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = schema_version(conn)
+            if target <= version:
+                continue
+            apply(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {target}")
+
+
+class BackgroundMigration:
+    def __init__(self, name, fetch, transform, apply):
+        self.name = name
+        self.fetch = fetch
+        self.transform = transform
+        self.apply = apply
+
+
+def reencrypt_fetch(table):
+    def fetch(db_manager, cursor, position, limit):
+        cursor.execute(
+            f"""
+            SELECT id, content FROM {table}
+            WHERE id > ? AND substr(content, 1, 1) = ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (position, FERNET_PREFIX, limit),
+        )
+        return cursor.fetchall()
+
+    return fetch
+
+
+def reencrypt_transform(db_manager, rows):
+    return [
+        (db_manager.encrypt_content(db_manager.decrypt_content(blob)), row_id, blob)
+        for row_id, blob in rows
+    ]
+
+
+def reencrypt_apply(table):
+    def apply(db_manager, cursor, rows):
+        cursor.executemany(
+            f"UPDATE {table} SET content = ? WHERE id = ? AND content = ?", rows
+        )
+
+    return apply
+
+
+def unindexed_fetch(db_manager, cursor, position, limit):
+    cursor.execute(
+        """
+        SELECT id, title FROM notes
+        WHERE id > ? AND id NOT IN (SELECT note_id FROM search_documents)
+        ORDER BY id
+        LIMIT ?
+        """,
+        (position, limit),
+    )
+    return cursor.fetchall()
+
+
+def unindexed_transform(db_manager, rows):
+    return [
+        (note_id, "".join(db_manager.iter_note_chunks(title))) for note_id, title in rows
+    ]
+
+
+def unindexed_apply(db_manager, cursor, rows):
+    for note_id, content in rows:
+        cursor.execute("SELECT 1 FROM search_documents WHERE note_id = ?", (note_id,))
+        if cursor.fetchone() is None:
+            db_manager.search_index.index_note(cursor, note_id, content)
+
+
+BACKGROUND_MIGRATIONS = [
+    BackgroundMigration(
+        "aead-notes",
+        reencrypt_fetch("notes"),
+        reencrypt_transform,
+        reencrypt_apply("notes"),
+    ),
+    BackgroundMigration(
+        "aead-note-chunks",
+        reencrypt_fetch("note_chunks"),
+        reencrypt_transform,
+        reencrypt_apply("note_chunks"),
+    ),
+    BackgroundMigration(
+        "search-index-backfill",
+        unindexed_fetch,
+        unindexed_transform,
+        unindexed_apply,
+    ),
+]
+
+
+class MigrationRunner:
+    def __init__(
+        self,
+        db_manager,
+        migrations=None,
+        batch_size=BACKGROUND_BATCH_SIZE,
+        throttle=BACKGROUND_THROTTLE,
+    ):
+        self.db_manager = db_manager
+        self.migrations = BACKGROUND_MIGRATIONS if migrations is None else migrations
+        self.batch_size = batch_size
+        self.throttle = throttle
+
+    def run(self):
+        for migration in self.migrations:
+            if not self.run_migration(migration):
+                return
+
+    def run_migration(self, migration):
+        db_manager = self.db_manager
+        with db_manager.lock:
+            if db_manager.conn is None:
+                return False
+            cursor = db_manager.conn.cursor()
+            cursor.execute(
+                "SELECT position, completed FROM migration_progress WHERE name = ?",
+                (migration.name,),
+            )
+            result = cursor.fetchone()
+        position, completed = result if result else (0, 0)
+
+        while not completed:
+            with db_manager.lock:
+                if db_manager.conn is None:
+                    return False
+                rows = migration.fetch(
+                    db_manager, db_manager.conn.cursor(), position, self.batch_size
+                )
+
+            transformed = migration.transform(db_manager, rows) if rows else []
+
+            with db_manager.lock:
+                if db_manager.conn is None:
+                    return False
+                with db_manager.conn:
+                    cursor = db_manager.conn.cursor()
+                    if rows:
+                        migration.apply(db_manager, cursor, transformed)
+                        position = rows[-1][0]
+                    else:
+                        completed = 1
+                    cursor.execute(
+                        """
+                        INSERT INTO migration_progress (name, position, completed)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT (name) DO UPDATE SET
+                            position = excluded.position,
+                            completed = excluded.completed
+                        """,
+                        (migration.name, position, completed),
+                    )
+
+            if not completed:
+                time.sleep(self.throttle)
+        return True
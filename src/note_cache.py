@@ -0,0 +1,67 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_BUDGET = 32 * 1024 * 1024
+
+
+class NoteCache:
+    def __init__(self, max_bytes=DEFAULT_CACHE_BUDGET, sizeof=sys.getsizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, title):
+        with self.lock:
+            content = self.entries.get(title)
+            if content is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(title)
+            self.hits += 1
+            return content
+
+    def peek(self, title):
+        with self.lock:
+            return self.entries.get(title)
+
+    def put(self, title, content):
+        entry_size = self.sizeof(content)
+        with self.lock:
+            self.discard(title)
+            if entry_size > self.max_bytes:
+                return
+            self.entries[title] = content
+            self.size += entry_size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= self.sizeof(evicted)
+
+    def invalidate(self, title):
+        with self.lock:
+            self.discard(title)
+
+    def discard(self, title):
+        content = self.entries.pop(title, None)
+        if content is not None:
+            self.size -= self.sizeof(content)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,58 @@
+import base64
+import hashlib
+import hmac
+import os
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+
+AEAD_FORMAT_VERSION = 0x02
+NONCE_SIZE = 12
+FERNET_PREFIX = b"g"
+KEY_WRAP_CONTEXT = b"hiddenote-master-key"
+
+
+def key_encryption_key(password_key):
+    return hmac.new(password_key, b"hiddenote-key-wrap", hashlib.sha256).digest()
+
+
+def wrap_key(password_key, data_key):
+    nonce = os.urandom(NONCE_SIZE)
+    aead = AESGCM(key_encryption_key(password_key))
+    return nonce + aead.encrypt(nonce, data_key, KEY_WRAP_CONTEXT)
+
+
+def unwrap_key(password_key, wrapped_key):
+    wrapped_key = bytes(wrapped_key)
+    aead = AESGCM(key_encryption_key(password_key))
+    return aead.decrypt(
+        wrapped_key[:NONCE_SIZE], wrapped_key[NONCE_SIZE:], KEY_WRAP_CONTEXT
+    )
+
+
+class NoteCipher:
+    def __init__(self, key):
+        self.fernet = Fernet(base64.urlsafe_b64encode(key))
+        self.aead = AESGCM(
+            hmac.new(key, b"hiddenote-note-aead-v2", hashlib.sha256).digest()
+        )
+
+    def encrypt(self, data, context=b""):
+        header = bytes((AEAD_FORMAT_VERSION,))
+        nonce = os.urandom(NONCE_SIZE)
+        return header + nonce + self.aead.encrypt(nonce, data, header + context)
+
+    def decrypt(self, blob, context=b""):
+        blob = bytes(blob)
+        if self.is_legacy(blob):
+            return self.fernet.decrypt(blob)
+
+        header = blob[:1]
+        if header[0] != AEAD_FORMAT_VERSION:
+            raise ValueError(f"unsupported note encryption version: {header[0]}")
+        nonce = blob[1 : 1 + NONCE_SIZE]
+        return self.aead.decrypt(nonce, blob[1 + NONCE_SIZE :], header + context)
+
+    @staticmethod
+    def is_legacy(blob):
+        return blob[:1] == FERNET_PREFIX
@@ -0,0 +1,140 @@
+import hashlib
+import hmac
+import re
+from collections import Counter
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 16
+TERM_DIGEST_SIZE = 16
+MAX_INDEXED_TERMS = 20000
+DIGEST_CACHE_SIZE = 200000
+SNIPPET_RADIUS = 40
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    def __init__(self, key):
+        self.key = hmac.new(key, b"hiddenote-search-index", hashlib.sha256).digest()
+        self.digest_cache = {}
+
+    @staticmethod
+    def create_tables(cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_documents (
+                note_id INTEGER PRIMARY KEY REFERENCES notes (id) ON DELETE CASCADE,
+                length INTEGER NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_terms (
+                term BLOB NOT NULL,
+                note_id INTEGER NOT NULL REFERENCES notes (id) ON DELETE CASCADE,
+                PRIMARY KEY (term, note_id)
+            ) WITHOUT ROWID
+        """)
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_terms_note ON search_terms (note_id)"
+        )
+
+    def term_digest(self, term):
+        digest = self.digest_cache.get(term)
+        if digest is None:
+            digest = hmac.digest(self.key, term.encode(), "sha256")[:TERM_DIGEST_SIZE]
+            if len(self.digest_cache) >= DIGEST_CACHE_SIZE:
+                self.digest_cache.clear()
+            self.digest_cache[term] = digest
+        return digest
+
+    def index_terms(self, content):
+        words = tokenize(content)
+        counts = Counter()
+        for word, hits in Counter(words).items():
+            prefix_end = min(len(word), MAX_PREFIX_LENGTH)
+            for length in range(MIN_PREFIX_LENGTH, prefix_end + 1):
+                counts[word[:length]] += hits
+        return len(words), counts
+
+    def query_terms(self, query):
+        terms = set()
+        for word in tokenize(query):
+            if len(word) >= MIN_PREFIX_LENGTH:
+                terms.add(word[:MAX_PREFIX_LENGTH])
+        return terms
+
+    def prepare_terms(self, content):
+        length, counts = self.index_terms(content)
+        digests = {
+            self.term_digest(term) for term, _ in counts.most_common(MAX_INDEXED_TERMS)
+        }
+        return length, digests
+
+    def index_note(self, cursor, note_id, content=None, prepared=None):
+        self.index_notes(cursor, [(note_id, prepared or self.prepare_terms(content))])
+
+    def index_notes(self, cursor, prepared_notes):
+        removed = []
+        added = []
+        for note_id, (_, digests) in prepared_notes:
+            cursor.execute(
+                "SELECT term FROM search_terms WHERE note_id = ?", (note_id,)
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            removed.extend((digest, note_id) for digest in existing - digests)
+            added.extend((digest, note_id) for digest in digests - existing)
+        cursor.executemany(
+            "DELETE FROM search_terms WHERE term = ? AND note_id = ?", sorted(removed)
+        )
+        cursor.executemany(
+            "INSERT INTO search_terms (term, note_id) VALUES (?, ?)", sorted(added)
+        )
+        cursor.executemany(
+            "INSERT OR REPLACE INTO search_documents (note_id, length) VALUES (?, ?)",
+            [(note_id, length) for note_id, (length, _) in prepared_notes],
+        )
+
+    def search(self, cursor, query, limit):
+        terms = self.query_terms(query)
+        if not terms:
+            return []
+
+        digests = [self.term_digest(term) for term in terms]
+        placeholders = ", ".join("?" * len(digests))
+        cursor.execute(
+            f"""
+            SELECT t.note_id, 1.0 / (d.length + 10) AS score
+            FROM search_terms t
+            JOIN search_documents d ON d.note_id = t.note_id
+            WHERE t.term IN ({placeholders})
+            GROUP BY t.note_id
+            HAVING COUNT(*) = ?
+            ORDER BY score DESC
+            LIMIT ?
+            """,
+            (*digests, len(digests), limit),
+        )
+        return cursor.fetchall()
+
+    def snippet(self, content, query):
+        lowered = content.lower()
+        positions = [
+            lowered.find(term) for term in self.query_terms(query) if term in lowered
+        ]
+        if not positions:
+            return content[: SNIPPET_RADIUS * 2].strip()
+
+        position = min(positions)
+        start = max(0, position - SNIPPET_RADIUS)
+        end = min(len(content), position + SNIPPET_RADIUS)
+        snippet = " ".join(content[start:end].split())
+        if start > 0:
+            snippet = "…" + snippet
+        if end < len(content):
+            snippet = snippet + "…"
+        return snippet
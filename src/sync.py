@@ -0,0 +1,560 @@
+import difflib
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+
+SYNC_FILE_SUFFIX = ".hnsync"
+SYNC_KEY_FILE = "vault.json"
+SYNC_BATCH_SIZE = 500
+SYNC_DIGEST_SIZE = 16
+
+
+def dominates(left, right):
+    return all(left.get(replica, 0) >= counter for replica, counter in right.items())
+
+
+def bootstrap_vector(digest):
+    return {f"#{digest.hex()}": 1}
+
+
+def rekey_vector(vector, key):
+    rekeyed = {}
+    for replica, counter in vector.items():
+        if replica.startswith("="):
+            digest = hmac.digest(key, replica.encode(), "sha256")[:SYNC_DIGEST_SIZE]
+            replica = f"#{digest.hex()}"
+        rekeyed[replica] = max(rekeyed.get(replica, 0), counter)
+    return rekeyed
+
+
+def merge_vectors(left, right):
+    merged = dict(left)
+    for replica, counter in right.items():
+        merged[replica] = max(merged.get(replica, 0), counter)
+    return merged
+
+
+def diff_hunks(base, other):
+    matcher = difflib.SequenceMatcher(None, base, other, autojunk=False)
+    return [
+        (base_start, base_end, other[other_start:other_end])
+        for tag, base_start, base_end, other_start, other_end in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_hunks(base, start, end, hunks):
+    lines = []
+    position = start
+    for hunk_start, hunk_end, replacement in hunks:
+        lines.extend(base[position:hunk_start])
+        lines.extend(replacement)
+        position = hunk_end
+    lines.extend(base[position:end])
+    return lines
+
+
+def merge_texts(base, left, right, left_label, right_label):
+    base_lines = base.splitlines(keepends=True)
+    hunks = [(hunk, 0) for hunk in diff_hunks(base_lines, left.splitlines(True))]
+    hunks += [(hunk, 1) for hunk in diff_hunks(base_lines, right.splitlines(True))]
+    hunks.sort(key=lambda item: (item[0][0], item[0][1], item[1]))
+
+    merged = []
+    conflicts = 0
+    position = 0
+    index = 0
+    while index < len(hunks):
+        group = [hunks[index]]
+        start, end = hunks[index][0][0], hunks[index][0][1]
+        index += 1
+        while index < len(hunks) and (
+            hunks[index][0][0] < end
+            or hunks[index][0][0] == start
+            or hunks[index][0][0] == end == hunks[index][0][1]
+        ):
+            end = max(end, hunks[index][0][1])
+            group.append(hunks[index])
+            index += 1
+
+        merged.extend(base_lines[position:start])
+        sides = [
+            [hunk for hunk, side in group if side == 0],
+            [hunk for hunk, side in group if side == 1],
+        ]
+        left_text = apply_hunks(base_lines, start, end, sides[0])
+        right_text = apply_hunks(base_lines, start, end, sides[1])
+        if not sides[0] or left_text == right_text:
+            merged.extend(right_text)
+        elif not sides[1]:
+            merged.extend(left_text)
+        else:
+            conflicts += 1
+            merged.append(f"<<<<<<< {left_label}\n")
+            merged.extend(ensure_newline(left_text))
+            merged.append("=======\n")
+            merged.extend(ensure_newline(right_text))
+            merged.append(f">>>>>>> {right_label}\n")
+        position = end
+
+    merged.extend(base_lines[position:])
+    return "".join(merged), conflicts
+
+
+def ensure_newline(lines):
+    if lines and not lines[-1].endswith("\n"):
+        return lines[:-1] + [lines[-1] + "\n"]
+    return lines
+
+
+class ChangeJournal:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.replica_id = None
+
+    @staticmethod
+    def create_tables(cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS note_journal (
+                title TEXT PRIMARY KEY,
+                vector TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                pending INTEGER NOT NULL DEFAULT 1,
+                base BLOB
+            )
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_note_journal_pending
+            ON note_journal (pending) WHERE pending = 1
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+
+    def load(self, cursor):
+        self.replica_id = self.get_state(cursor, "replica_id")
+
+    def get_state(self, cursor, key, default=None):
+        cursor.execute("SELECT value FROM sync_state WHERE key = ?", (key,))
+        result = cursor.fetchone()
+        return result[0] if result else default
+
+    def set_state(self, cursor, key, value):
+        cursor.execute(
+            """
+            INSERT INTO sync_state (key, value) VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+            """,
+            (key, str(value)),
+        )
+
+    def entry(self, cursor, title):
+        cursor.execute(
+            "SELECT vector, deleted, base FROM note_journal WHERE title = ?", (title,)
+        )
+        result = cursor.fetchone()
+        if not result:
+            return None
+        vector, deleted, base = result
+        return {"vector": json.loads(vector), "deleted": bool(deleted), "base": base}
+
+    def last_sync_dir(self):
+        with self.db_manager.lock:
+            return self.get_state(self.db_manager.conn.cursor(), "sync_dir")
+
+    def record(self, cursor, title, deleted=False):
+        if self.replica_id is None:
+            return
+        entry = self.entry(cursor, title)
+        vector = entry["vector"] if entry else {}
+        vector[self.replica_id] = vector.get(self.replica_id, 0) + 1
+        cursor.execute(
+            """
+            INSERT INTO note_journal (title, vector, deleted, pending)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (title) DO UPDATE SET
+                vector = excluded.vector,
+                deleted = excluded.deleted,
+                pending = 1
+            """,
+            (title, json.dumps(vector, sort_keys=True), int(deleted)),
+        )
+
+    def store(self, cursor, title, vector, deleted, pending, base):
+        cursor.execute(
+            """
+            INSERT INTO note_journal (title, vector, deleted, pending, base)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (title) DO UPDATE SET
+                vector = excluded.vector,
+                deleted = excluded.deleted,
+                pending = excluded.pending,
+                base = excluded.base
+            """,
+            (
+                title,
+                json.dumps(vector, sort_keys=True),
+                int(deleted),
+                int(pending),
+                base,
+            ),
+        )
+
+
+class SyncEngine:
+    def __init__(self, db_manager, sync_dir, batch_size=SYNC_BATCH_SIZE):
+        self.db_manager = db_manager
+        self.journal = db_manager.journal
+        self.sync_dir = sync_dir
+        self.batch_size = batch_size
+        self.digest_key = hmac.new(
+            db_manager.data_key, b"hiddenote-sync-digest", hashlib.sha256
+        ).digest()
+
+    def content_digest(self, content):
+        return hmac.digest(self.digest_key, content.encode(), "sha256")[
+            :SYNC_DIGEST_SIZE
+        ]
+
+    def sync(self):
+        started = time.perf_counter()
+        report = {"sent": 0, "received": 0, "merged": 0, "conflicts": 0, "changed": []}
+
+        os.makedirs(self.sync_dir, exist_ok=True)
+        self.check_key()
+        self.db_manager.flush()
+        self.ensure_replica()
+        self.rekey_journal()
+
+        for peer in self.peers():
+            self.receive_from(peer, report)
+        self.send(report)
+
+        with self.db_manager.lock, self.db_manager.conn:
+            self.journal.set_state(
+                self.db_manager.conn.cursor(), "sync_dir", os.path.abspath(self.sync_dir)
+            )
+        report["elapsed"] = time.perf_counter() - started
+        return report
+
+    def key_check(self):
+        return hmac.new(
+            self.db_manager.data_key, b"hiddenote-sync", hashlib.sha256
+        ).hexdigest()
+
+    def check_key(self):
+        path = os.path.join(self.sync_dir, SYNC_KEY_FILE)
+        if os.path.exists(path):
+            with open(path) as file:
+                if json.load(file)["key_check"] != self.key_check():
+                    raise ValueError(
+                        "this folder syncs a different vault; sync copies of one vault"
+                    )
+            return
+        write_atomic(path, json.dumps({"key_check": self.key_check()}).encode())
+
+    def ensure_replica(self):
+        db_manager = self.db_manager
+        with db_manager.lock, db_manager.conn:
+            cursor = db_manager.conn.cursor()
+            if self.journal.replica_id is not None:
+                return
+            replica_id = secrets.token_hex(8)
+            self.journal.set_state(cursor, "replica_id", replica_id)
+            self.journal.replica_id = replica_id
+            cursor.execute(
+                """
+                SELECT title FROM notes
+                WHERE title NOT IN (SELECT title FROM note_journal)
+                """
+            )
+            titles = [row[0] for row in cursor.fetchall()]
+
+        for start in range(0, len(titles), self.batch_size):
+            batch = titles[start : start + self.batch_size]
+            contents = [(title, db_manager.committed_content(title)) for title in batch]
+            with db_manager.lock, db_manager.conn:
+                cursor = db_manager.conn.cursor()
+                for title, content in contents:
+                    self.journal.store(
+                        cursor,
+                        title,
+                        bootstrap_vector(self.content_digest(content)),
+                        False,
+                        True,
+                        db_manager.encrypt_content(content),
+                    )
+
+    def rekey_journal(self):
+        db_manager = self.db_manager
+        with db_manager.lock, db_manager.conn:
+            cursor = db_manager.conn.cursor()
+            cursor.execute(
+                """
+                SELECT title, vector FROM note_journal
+                WHERE vector LIKE '%"=%'
+                """
+            )
+            cursor.executemany(
+                "UPDATE note_journal SET vector = ? WHERE title = ?",
+                [
+                    (
+                        json.dumps(
+                            rekey_vector(json.loads(vector), self.digest_key),
+                            sort_keys=True,
+                        ),
+                        title,
+                    )
+                    for title, vector in cursor.fetchall()
+                ],
+            )
+
+    def outbox(self, replica_id):
+        return os.path.join(self.sync_dir, replica_id)
+
+    def peers(self):
+        return sorted(
+            name
+            for name in os.listdir(self.sync_dir)
+            if name != self.journal.replica_id
+            and os.path.isdir(os.path.join(self.sync_dir, name))
+        )
+
+    def change_files(self, replica_id, after):
+        files = []
+        for name in os.listdir(self.outbox(replica_id)):
+            if not name.endswith(SYNC_FILE_SUFFIX):
+                continue
+            sequence = int(name[: -len(SYNC_FILE_SUFFIX)])
+            if sequence > after:
+                files.append((sequence, os.path.join(self.outbox(replica_id), name)))
+        return sorted(files)
+
+    def receive_from(self, peer, report):
+        db_manager = self.db_manager
+        with db_manager.lock:
+            position = int(
+                self.journal.get_state(db_manager.conn.cursor(), f"peer:{peer}", 0)
+            )
+
+        for sequence, path in self.change_files(peer, position):
+            with open(path, "rb") as file:
+                entries = json.loads(db_manager.decrypt_content(file.read()))
+            for entry in entries:
+                self.apply_entry(peer, entry, report)
+                report["received"] += 1
+            with db_manager.lock, db_manager.conn:
+                self.journal.set_state(
+                    db_manager.conn.cursor(), f"peer:{peer}", sequence
+                )
+
+    def apply_entry(self, peer, entry, report):
+        db_manager = self.db_manager
+        title = entry["title"]
+        remote_vector = rekey_vector(entry["vector"], self.digest_key)
+        if db_manager.writer.snapshot(title) is not None:
+            db_manager.flush()
+        with db_manager.lock:
+            local = self.journal.entry(db_manager.conn.cursor(), title)
+        local_vector = local["vector"] if local else {}
+
+        if dominates(local_vector, remote_vector):
+            return
+        if dominates(remote_vector, local_vector):
+            self.apply_remote(title, entry, remote_vector, pending=False)
+            report["changed"].append(title)
+            return
+
+        vector = merge_vectors(local_vector, remote_vector)
+        local_content = None if local["deleted"] else db_manager.committed_content(title)
+        remote_content = entry["content"]
+
+        if local_content is None and remote_content is None:
+            with db_manager.lock, db_manager.conn:
+                self.journal.store(
+                    db_manager.conn.cursor(), title, vector, True, False, None
+                )
+            return
+
+        if local_content == remote_content:
+            with db_manager.lock, db_manager.conn:
+                self.journal.store(
+                    db_manager.conn.cursor(),
+                    title,
+                    vector,
+                    False,
+                    True,
+                    db_manager.encrypt_content(local_content),
+                )
+            return
+
+        vector[self.journal.replica_id] = vector.get(self.journal.replica_id, 0) + 1
+        if remote_content is None:
+            self.keep_local(title, local_content, vector)
+            return
+        if local_content is None:
+            self.apply_remote(title, entry, vector, pending=True)
+            report["changed"].append(title)
+            return
+
+        base = self.find_base(title, local_content, entry["parent"])
+        mine, theirs = self.journal.replica_id, peer
+        if mine < theirs:
+            merged, conflicts = merge_texts(
+                base, local_content, remote_content, mine, theirs
+            )
+        else:
+            merged, conflicts = merge_texts(
+                base, remote_content, local_content, theirs, mine
+            )
+        self.apply_remote(
+            title,
+            {"content": merged, "deleted": False},
+            vector,
+            pending=True,
+            base=remote_content,
+        )
+        report["changed"].append(title)
+        report["merged"] += 1
+        report["conflicts"] += conflicts
+
+    def keep_local(self, title, content, vector):
+        db_manager = self.db_manager
+        with db_manager.lock, db_manager.conn:
+            cursor = db_manager.conn.cursor()
+            entry = self.journal.entry(cursor, title)
+            self.journal.store(cursor, title, vector, False, True, entry["base"])
+
+    def apply_remote(self, title, entry, vector, pending, base=None):
+        db_manager = self.db_manager
+        if entry["deleted"]:
+            db_manager.delete_note(title, journal=(vector, True, pending, None))
+            return
+
+        content = entry["content"]
+        encrypted_base = db_manager.encrypt_content(content if base is None else base)
+        if db_manager.committed_content(title) == content:
+            with db_manager.lock, db_manager.conn:
+                self.journal.store(
+                    db_manager.conn.cursor(),
+                    title,
+                    vector,
+                    False,
+                    pending,
+                    encrypted_base,
+                )
+            return
+
+        plan = db_manager.prepare_note(title, content)
+        plan["text"] = content
+        plan["journal"] = (vector, False, pending, encrypted_base)
+        db_manager.commit_notes([plan])
+        db_manager.forget_notes([title])
+
+    def find_base(self, title, current, parent):
+        if not parent:
+            return ""
+        parent = bytes.fromhex(parent)
+        db_manager = self.db_manager
+        if self.content_digest(current) == parent:
+            return current
+        with db_manager.lock:
+            cursor = db_manager.conn.cursor()
+            base = self.journal.entry(cursor, title)["base"]
+        if base is not None:
+            base = db_manager.decrypt_content(base)
+            if self.content_digest(base) == parent:
+                return base
+        with db_manager.lock:
+            cursor = db_manager.conn.cursor()
+            note_id = db_manager.note_id(cursor, title)
+            for _, _, version in db_manager.revisions.iter_versions(
+                cursor, note_id, current
+            ):
+                if self.content_digest(version) == parent:
+                    return version
+        return ""
+
+    def parent_digest(self, base):
+        if base is None:
+            return None
+        base = self.db_manager.decrypt_content(base)
+        return self.content_digest(base).hex()
+
+    def send(self, report):
+        db_manager = self.db_manager
+        replica_id = self.journal.replica_id
+        outbox = self.outbox(replica_id)
+        os.makedirs(outbox, exist_ok=True)
+
+        with db_manager.lock:
+            cursor = db_manager.conn.cursor()
+            sequence = int(self.journal.get_state(cursor, "outbox", 0))
+            cursor.execute(
+                """
+                SELECT title, vector, deleted, base FROM note_journal
+                WHERE pending = 1
+                ORDER BY title
+                """
+            )
+            pending = cursor.fetchall()
+
+        existing = self.change_files(replica_id, sequence)
+        if existing:
+            raise ValueError(
+                "another copy of this vault is syncing as the same replica; "
+                "sync from a fresh copy instead of duplicating a synced vault"
+            )
+
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            entries = []
+            sent = []
+            for title, vector, deleted, base in batch:
+                content = None if deleted else db_manager.committed_content(title)
+                entries.append(
+                    {
+                        "title": title,
+                        "vector": json.loads(vector),
+                        "deleted": bool(deleted),
+                        "parent": self.parent_digest(base),
+                        "content": content,
+                    }
+                )
+                sent_base = None
+                if content is not None:
+                    sent_base = db_manager.encrypt_content(content)
+                sent.append((sent_base, title, vector))
+
+            sequence += 1
+            payload = db_manager.encrypt_content(json.dumps(entries))
+            write_atomic(
+                os.path.join(outbox, f"{sequence:012d}{SYNC_FILE_SUFFIX}"), payload
+            )
+            with db_manager.lock, db_manager.conn:
+                cursor = db_manager.conn.cursor()
+                cursor.executemany(
+                    """
+                    UPDATE note_journal SET pending = 0, base = ?
+                    WHERE title = ? AND vector = ?
+                    """,
+                    sent,
+                )
+                self.journal.set_state(cursor, "outbox", sequence)
+            report["sent"] += len(entries)
+
+
+def write_atomic(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
@@ -0,0 +1,281 @@
+import bisect
+import re
+import threading
+import unicodedata
+
+
+SCAN_BUDGET = 1000
+WORD_SEPARATORS = " -_/.:"
+SEPARATOR_TABLE = str.maketrans(WORD_SEPARATORS, " " * len(WORD_SEPARATORS))
+STRING_MASK_ALPHABET = 128
+
+
+def normalize_title(title):
+    if title.isascii():
+        return title.lower()
+    decomposed = unicodedata.normalize("NFKD", title.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def trigrams(key):
+    return {key[index : index + 3] for index in range(len(key) - 2)}
+
+
+def split_words(key):
+    return set(key.translate(SEPARATOR_TABLE).split())
+
+
+def iter_bits(mask):
+    digits = bin(mask)
+    top = len(digits) - 1
+    position = digits.find("1", 2)
+    while position >= 0:
+        yield top - position
+        position = digits.find("1", position + 1)
+
+
+def fuzzy_pattern(key):
+    return re.compile(".*?".join(re.escape(char) for char in key))
+
+
+def rank_match(key, title_key, pattern):
+    if title_key == key:
+        return (0,)
+    if title_key.startswith(key):
+        return (1, len(title_key))
+    position = title_key.find(key)
+    if position >= 0:
+        at_word = title_key[position - 1] in WORD_SEPARATORS
+        return (2 if at_word else 3, position, len(title_key))
+    match = pattern.search(title_key)
+    if match is None:
+        return None
+    return (4, match.end() - match.start(), match.start(), len(title_key))
+
+
+class TitleIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.replay = None
+        self.clear()
+
+    def clear(self):
+        self.titles = []
+        self.keys = []
+        self.ids = {}
+        self.chars = {}
+        self.grams = {}
+        self.sorted_keys = []
+        self.words = []
+        self.alive = 0
+        self.dead = 0
+        self.forget_query()
+
+    def unload(self):
+        with self.lock:
+            self.clear()
+            self.loaded = False
+            self.replay = None
+
+    def forget_query(self):
+        self.last_key = None
+        self.last_candidates = 0
+        self.last_matches = None
+
+    def start_load(self):
+        with self.lock:
+            if self.loaded or self.replay is not None:
+                return None
+            self.replay = []
+            return self.replay
+
+    def load(self, titles, replay=None):
+        fresh = TitleIndex()
+        fresh.fill(titles)
+        with self.lock:
+            if replay is not None and replay is not self.replay:
+                return
+            self.titles = fresh.titles
+            self.keys = fresh.keys
+            self.ids = fresh.ids
+            self.chars = fresh.chars
+            self.grams = fresh.grams
+            self.sorted_keys = fresh.sorted_keys
+            self.words = fresh.words
+            self.alive = fresh.alive
+            self.dead = 0
+            self.forget_query()
+            self.loaded = True
+            self.replay = None
+            for added, title in replay or ():
+                if added:
+                    self.add(title)
+                else:
+                    self.discard(title)
+
+    def fill(self, titles):
+        self.titles = titles[::-1]
+        self.keys = [normalize_title(title) for title in self.titles]
+        self.ids = {title: title_id for title_id, title in enumerate(self.titles)}
+        self.sorted_keys = sorted(zip(self.keys, range(len(self.keys))))
+
+        self.chars = self.char_masks()
+
+        grams = self.grams
+        for title_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings = grams.get(gram)
+                if postings is None:
+                    grams[gram] = [title_id]
+                else:
+                    postings.append(title_id)
+            self.words.extend((word, title_id) for word in split_words(key))
+
+        self.words.sort()
+        self.alive = (1 << len(self.titles)) - 1
+
+    def remember(self, added, title):
+        if self.replay is not None:
+            self.replay.append((added, title))
+
+    def char_masks(self):
+        alphabet = set("".join(self.keys))
+        if len(alphabet) <= STRING_MASK_ALPHABET:
+            newest_first = self.keys[::-1]
+            return {
+                char: int(
+                    "".join(["1" if char in key else "0" for key in newest_first]), 2
+                )
+                for char in alphabet
+            }
+
+        size = len(self.keys) // 8 + 1
+        char_bits = {}
+        for title_id, key in enumerate(self.keys):
+            byte, bit = title_id >> 3, 1 << (title_id & 7)
+            for char in set(key):
+                bits = char_bits.get(char)
+                if bits is None:
+                    bits = char_bits[char] = bytearray(size)
+                bits[byte] |= bit
+        return {
+            char: int.from_bytes(bits, "little") for char, bits in char_bits.items()
+        }
+
+    def add(self, title):
+        with self.lock:
+            if not self.loaded:
+                self.remember(True, title)
+                return
+            self.discard(title)
+            title_id = len(self.titles)
+            key = normalize_title(title)
+            self.titles.append(title)
+            self.keys.append(key)
+            self.ids[title] = title_id
+
+            bit = 1 << title_id
+            for char in set(key):
+                self.chars[char] = self.chars.get(char, 0) | bit
+            for gram in trigrams(key):
+                self.grams.setdefault(gram, []).append(title_id)
+            bisect.insort(self.sorted_keys, (key, title_id))
+            for word in split_words(key):
+                bisect.insort(self.words, (word, title_id))
+            self.alive |= bit
+            self.forget_query()
+
+    def discard(self, title):
+        with self.lock:
+            if not self.loaded:
+                self.remember(False, title)
+                return
+            title_id = self.ids.pop(title, None)
+            if title_id is None:
+                return
+            self.titles[title_id] = None
+            self.alive &= ~(1 << title_id)
+            self.dead += 1
+            self.forget_query()
+            if self.dead > max(1024, len(self.ids)):
+                self.load([title for title in reversed(self.titles) if title])
+
+    def search(self, query, limit=50):
+        key = normalize_title(query).strip()
+        if not key:
+            return []
+
+        with self.lock:
+            if not self.loaded:
+                return None
+            pattern = fuzzy_pattern(key)
+            found = set(self.prefix_matches(self.sorted_keys, key, limit))
+            found.update(self.prefix_matches(self.words, key, limit))
+
+            found.update(self.substring_matches(key, limit))
+            candidates = self.narrowed_candidates(key)
+            scanned, matches = self.scan(candidates, pattern)
+            found.update(scanned)
+
+            self.last_key = key
+            self.last_candidates = candidates
+            self.last_matches = matches
+
+            ranked = []
+            for title_id in found:
+                rank = rank_match(key, self.keys[title_id], pattern)
+                if rank is not None:
+                    ranked.append((rank, -title_id, self.titles[title_id]))
+            ranked.sort()
+            return [title for _, _, title in ranked[:limit]]
+
+    def prefix_matches(self, entries, key, limit):
+        found = []
+        index = bisect.bisect_left(entries, (key, -1))
+        while index < len(entries) and len(found) < limit:
+            entry_key, title_id = entries[index]
+            if not entry_key.startswith(key):
+                break
+            if self.titles[title_id] is not None:
+                found.append(title_id)
+            index += 1
+        return found
+
+    def substring_matches(self, key, limit):
+        postings = [self.grams.get(gram, ()) for gram in trigrams(key)]
+        if not postings:
+            return []
+        found = []
+        for title_id in reversed(min(postings, key=len)):
+            if self.titles[title_id] is not None and key in self.keys[title_id]:
+                found.append(title_id)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def narrowed_candidates(self, key):
+        if self.last_key is not None and key.startswith(self.last_key):
+            candidates = self.last_matches
+            if candidates is None:
+                candidates = self.last_candidates
+            added = key[len(self.last_key) :]
+        else:
+            candidates = self.alive
+            added = key
+        for char in set(added):
+            candidates &= self.chars.get(char, 0)
+        return candidates
+
+    def scan(self, candidates, pattern):
+        found = []
+        for examined, title_id in enumerate(iter_bits(candidates)):
+            if examined >= SCAN_BUDGET:
+                return found, None
+            if pattern.search(self.keys[title_id]):
+                found.append(title_id)
+
+        bits = bytearray(len(self.titles) // 8 + 1)
+        for title_id in found:
+            bits[title_id >> 3] |= 1 << (title_id & 7)
+        return found, int.from_bytes(bits, "little")
@@ -10,7 +10,7 @@ from PyQt6.QtWidgets import (
     QFrame,
     QApplication,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 
 
 class CustomTitleBar(QWidget):
@@ -265,7 +265,9 @@ class CustomInputDialog(QDialog):
 
 
 class PasswordDialog(QDialog):
-    def __init__(self, is_new_user=False, parent=None):
+    password_submitted = pyqtSignal(str)
+
+    def __init__(self, is_new_user=False, parent=None, vault_name=None):
         super().__init__(None)
         self.parent_window = parent
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
@@ -275,6 +277,7 @@ class PasswordDialog(QDialog):
         self.setModal(True)
         self.is_new_user = is_new_user
         self.password = None
+        self.busy = False
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -286,8 +289,10 @@ class PasswordDialog(QDialog):
         frame_layout.setContentsMargins(0, 0, 0, 0)
         frame_layout.setSpacing(0)
 
-        title_text = "create your password" if is_new_user else "enter password"
-        self.title_bar = CustomTitleBar(self, title_text)
+        self.title_text = "create your password" if is_new_user else "enter password"
+        if vault_name:
+            self.title_text = f"{self.title_text} for {vault_name}"
+        self.title_bar = CustomTitleBar(self, self.title_text)
         frame_layout.addWidget(self.title_bar)
 
         content_layout = QVBoxLayout()
@@ -302,14 +307,14 @@ class PasswordDialog(QDialog):
 
         button_layout = QHBoxLayout()
         button_layout.setSpacing(8)
-        cancel_button = QPushButton("bye")
-        cancel_button.clicked.connect(self.reject)
-        ok_button = QPushButton("ok")
-        ok_button.clicked.connect(self.accept_password)
-        ok_button.setDefault(True)
-
-        button_layout.addWidget(cancel_button)
-        button_layout.addWidget(ok_button)
+        self.cancel_button = QPushButton("bye")
+        self.cancel_button.clicked.connect(self.reject)
+        self.ok_button = QPushButton("ok")
+        self.ok_button.clicked.connect(self.accept_password)
+        self.ok_button.setDefault(True)
+
+        button_layout.addWidget(self.cancel_button)
+        button_layout.addWidget(self.ok_button)
         content_layout.addLayout(button_layout)
 
         frame_layout.addLayout(content_layout)
@@ -335,8 +340,22 @@ class PasswordDialog(QDialog):
         self.move(x, y)
 
     def accept_password(self):
+        if self.busy:
+            return
         self.password = self.password_input.text()
         if self.password:
-            self.accept()
+            self.password_submitted.emit(self.password)
         else:
             CustomMessageBox.warning(self, "oops", "password can't be empty")
+
+    def set_busy(self, busy):
+        self.busy = busy
+        self.password_input.setEnabled(not busy)
+        self.cancel_button.setEnabled(not busy)
+        self.ok_button.setEnabled(not busy)
+        self.ok_button.setText("unlocking..." if busy else "ok")
+        self.title_bar.update_title("unlocking..." if busy else self.title_text)
+
+    def reject(self):
+        if not self.busy:
+            super().reject()
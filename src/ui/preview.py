@@ -0,0 +1,111 @@
+from PyQt6.QtCore import QUrl, pyqtSignal
+from PyQt6.QtGui import QImage, QTextDocument, QColor
+from PyQt6.QtWidgets import QTextBrowser
+
+from ..attachments import ATTACHMENT_SCHEME, attachment_url
+from ..note_cache import NoteCache
+from .workers import run_in_background
+
+
+PREVIEW_CACHE_BUDGET = 64 * 1024 * 1024
+MAX_PREVIEW_WIDTH = 1600
+
+
+def decode_attachment_image(db_manager, key):
+    image = QImage.fromData(db_manager.attachments.read(key))
+    if image.isNull():
+        raise ValueError(f"attachment {key} is not an image")
+    if image.width() > MAX_PREVIEW_WIDTH:
+        image = image.scaledToWidth(MAX_PREVIEW_WIDTH)
+    return image
+
+
+def placeholder_image():
+    image = QImage(1, 1, QImage.Format.Format_ARGB32)
+    image.fill(QColor(0, 0, 0, 0))
+    return image
+
+
+class NotePreview(QTextBrowser):
+    attachment_clicked = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db_manager = None
+        self.html = ""
+        self.image_cache = NoteCache(
+            PREVIEW_CACHE_BUDGET, sizeof=lambda image: image.sizeInBytes()
+        )
+        self.pending = {}
+        self.failed = set()
+        self.placeholder = placeholder_image()
+        self.setOpenLinks(False)
+        self.anchorClicked.connect(self.on_anchor_clicked)
+
+    def set_database_manager(self, db_manager):
+        self.db_manager = db_manager
+        self.clear()
+
+    def set_preview_html(self, html):
+        self.html = html
+        self.document().clear()
+        self.setHtml(html)
+
+    def clear(self):
+        self.html = ""
+        super().clear()
+
+    def loadResource(self, resource_type, url):
+        if url.scheme() != ATTACHMENT_SCHEME:
+            return super().loadResource(resource_type, url)
+        if (
+            self.db_manager is None
+            or resource_type != QTextDocument.ResourceType.ImageResource.value
+        ):
+            return None
+
+        cache_key = (self.db_manager.db_path, url.path())
+        image = self.image_cache.get(cache_key)
+        if image is not None:
+            return image
+        if cache_key not in self.failed:
+            self.request_image(cache_key)
+        return self.placeholder
+
+    def request_image(self, cache_key):
+        if cache_key in self.pending:
+            return
+
+        db_manager = self.db_manager
+        _, key = cache_key
+        self.pending[cache_key] = run_in_background(
+            lambda: decode_attachment_image(db_manager, key),
+            lambda image: self.on_image_decoded(cache_key, image),
+            lambda message: self.on_image_failed(cache_key),
+        )
+
+    def on_image_decoded(self, cache_key, image):
+        self.pending.pop(cache_key, None)
+        self.image_cache.put(cache_key, image)
+
+        db_path, key = cache_key
+        if self.db_manager is None or db_path != self.db_manager.db_path:
+            return
+        url = attachment_url(key)
+        if url not in self.html:
+            return
+        document = self.document()
+        document.addResource(
+            QTextDocument.ResourceType.ImageResource.value, QUrl(url), image
+        )
+        document.markContentsDirty(0, document.characterCount())
+
+    def on_image_failed(self, cache_key):
+        self.pending.pop(cache_key, None)
+        self.failed.add(cache_key)
+
+    def on_anchor_clicked(self, url):
+        if url.scheme() == ATTACHMENT_SCHEME:
+            self.attachment_clicked.emit(url.path())
+        else:
+            self.setSource(url)
@@ -0,0 +1,93 @@
+from PyQt6.QtWidgets import QDialog, QFrame, QLineEdit, QListView, QVBoxLayout
+from PyQt6.QtCore import Qt
+
+from .widgets import NoteItemDelegate, NoteListModel
+
+
+SWITCHER_LIMIT = 50
+
+
+class QuickSwitcher(QDialog):
+    def __init__(self, db_manager, parent=None):
+        super().__init__(None)
+        self.parent_window = parent
+        self.db_manager = db_manager
+        self.chosen_title = None
+        self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setModal(True)
+        self.setFixedSize(520, 420)
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.main_frame = QFrame()
+        self.main_frame.setObjectName("dialogFrame")
+        frame_layout = QVBoxLayout(self.main_frame)
+        frame_layout.setContentsMargins(16, 16, 16, 16)
+        frame_layout.setSpacing(10)
+
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("jump to note...")
+        self.query_input.textChanged.connect(self.show_results)
+        self.query_input.returnPressed.connect(self.accept_current)
+        frame_layout.addWidget(self.query_input)
+
+        self.results = NoteListModel(self)
+        self.results_view = QListView()
+        self.results_view.setModel(self.results)
+        self.results_view.setItemDelegate(NoteItemDelegate(self.results_view))
+        self.results_view.setUniformItemSizes(True)
+        self.results_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.results_view.setHorizontalScrollBarPolicy(
+            Qt.ScrollBarPolicy.ScrollBarAlwaysOff
+        )
+        self.results_view.clicked.connect(self.accept_current)
+        frame_layout.addWidget(self.results_view)
+
+        main_layout.addWidget(self.main_frame)
+        self.show_results("")
+        self.query_input.setFocus()
+        self.position_over_parent()
+
+    def position_over_parent(self):
+        if not self.parent_window:
+            return
+        geometry = self.parent_window.geometry()
+        x = geometry.x() + (geometry.width() - self.width()) // 2
+        y = geometry.y() + min(120, max(0, geometry.height() - self.height()) // 2)
+        self.move(x, y)
+
+    def show_results(self, text):
+        if text.strip():
+            notes = self.db_manager.search_titles(text, SWITCHER_LIMIT)
+        else:
+            notes = self.db_manager.get_notes_page(limit=SWITCHER_LIMIT)
+        self.results.set_notes(notes)
+        if notes:
+            self.results_view.setCurrentIndex(self.results.index(0, 0))
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+            step = 1 if event.key() == Qt.Key.Key_Down else -1
+            row = self.results_view.currentIndex().row() + step
+            if 0 <= row < self.results.rowCount():
+                index = self.results.index(row, 0)
+                self.results_view.setCurrentIndex(index)
+                self.results_view.scrollTo(index)
+            return
+        super().keyPressEvent(event)
+
+    def accept_current(self):
+        index = self.results_view.currentIndex()
+        if not index.isValid():
+            return
+        self.chosen_title = self.results.title(index.row())
+        self.accept()
+
+    @staticmethod
+    def pick(parent, db_manager):
+        dialog = QuickSwitcher(db_manager, parent)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            return dialog.chosen_title
+        return None
@@ -216,7 +216,7 @@ def apply_theme(app, custom_font_family=None):
             color: #6C6F7E;
         }}
 
-        QListWidget {{
+        QListView {{
             background-color: #23262F;
             color: #E6E6E6;
             border: none;
@@ -227,40 +227,6 @@ def apply_theme(app, custom_font_family=None):
             font-size: 15px;
         }}
 
-        QListWidget::item {{
-            padding: 0px;
-            border: none;
-            background: transparent;
-            border-radius: 10px;
-            margin: 4px 0px;
-        }}
-
-        QListWidget::item:selected {{
-            background-color: #FFD580;
-            color: #23262F;
-            border-radius: 10px;
-        }}
-
-        QListWidget::item:selected QLabel#noteTitle {{
-            color: #23262F;
-            font-weight: bold;
-        }}
-
-        QListWidget::item QLabel#noteTitle {{
-            color: #6C6F7E;
-            font-weight: bold;
-            font-size: 16px;
-        }}
-
-        QListWidget::item:selected QLabel#noteDate {{
-            color: #6C6F7E;
-        }}
-
-        QListWidget::item:hover {{
-            background-color: #35384A;
-            border-radius: 10px;
-        }}
-
         QTextEdit, QTextBrowser {{
             background-color: #181A20;
             color: #E6E6E6;
@@ -389,14 +355,14 @@ def apply_theme(app, custom_font_family=None):
             background: transparent;
         }}
 
-        QListWidget QScrollBar:vertical {{
+        QListView QScrollBar:vertical {{
             background: transparent;
             width: 8px;
             border: none;
             margin: 4px 1px;
         }}
 
-        QListWidget QScrollBar::handle:vertical {{
+        QListView QScrollBar::handle:vertical {{
             background-color: rgba(108, 111, 126, 0.3);
             border-radius: 4px;
             min-height: 20px;
@@ -404,33 +370,33 @@ def apply_theme(app, custom_font_family=None):
             border: none;
         }}
 
-        QListWidget QScrollBar::handle:vertical:hover {{
+        QListView QScrollBar::handle:vertical:hover {{
             background-color: rgba(255, 213, 128, 0.6);
             width: 8px;
         }}
 
-        QListWidget QScrollBar::handle:vertical:pressed {{
+        QListView QScrollBar::handle:vertical:pressed {{
             background-color: rgba(255, 213, 128, 0.8);
         }}
 
-        QListWidget QScrollBar::add-line:vertical, QListWidget QScrollBar::sub-line:vertical {{
+        QListView QScrollBar::add-line:vertical, QListView QScrollBar::sub-line:vertical {{
             border: none;
             background: transparent;
             height: 0px;
         }}
 
-        QListWidget QScrollBar::add-page:vertical, QListWidget QScrollBar::sub-page:vertical {{
+        QListView QScrollBar::add-page:vertical, QListView QScrollBar::sub-page:vertical {{
             background: transparent;
         }}
 
-        QListWidget QScrollBar:horizontal {{
+        QListView QScrollBar:horizontal {{
             background: transparent;
             height: 8px;
             border: none;
             margin: 1px 4px;
         }}
 
-        QListWidget QScrollBar::handle:horizontal {{
+        QListView QScrollBar::handle:horizontal {{
             background-color: rgba(108, 111, 126, 0.3);
             border-radius: 4px;
             min-width: 20px;
@@ -438,21 +404,21 @@ def apply_theme(app, custom_font_family=None):
             border: none;
         }}
 
-        QListWidget QScrollBar::handle:horizontal:hover {{
+        QListView QScrollBar::handle:horizontal:hover {{
             background-color: rgba(255, 213, 128, 0.6);
         }}
 
-        QListWidget QScrollBar::handle:horizontal:pressed {{
+        QListView QScrollBar::handle:horizontal:pressed {{
             background-color: rgba(255, 213, 128, 0.8);
         }}
 
-        QListWidget QScrollBar::add-line:horizontal, QListWidget QScrollBar::sub-line:horizontal {{
+        QListView QScrollBar::add-line:horizontal, QListView QScrollBar::sub-line:horizontal {{
             border: none;
             background: transparent;
             width: 0px;
         }}
 
-        QListWidget QScrollBar::add-page:horizontal, QListWidget QScrollBar::sub-page:horizontal {{
+        QListView QScrollBar::add-page:horizontal, QListView QScrollBar::sub-page:horizontal {{
             background: transparent;
         }}
 
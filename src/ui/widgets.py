@@ -1,89 +1,408 @@
 from datetime import datetime
-from PyQt6.QtWidgets import (
-    QWidget,
-    QVBoxLayout,
-    QListWidget,
-    QLabel,
-    QListWidgetItem,
+from PyQt6.QtWidgets import QListView, QStyle, QStyledItemDelegate, QTextEdit
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPoint,
+    QRect,
+    QRectF,
+    QSize,
+    Qt,
+    pyqtSignal,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter
 
 
-class NoteItemWidget(QWidget):
-    def __init__(self, title, created_at, updated_at):
-        super().__init__()
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        layout = QVBoxLayout()
-        layout.setContentsMargins(8, 4, 8, 4)
-        layout.setSpacing(2)
+TITLE_ROLE = Qt.ItemDataRole.UserRole
+DATE_ROLE = Qt.ItemDataRole.UserRole + 1
+SNIPPET_ROLE = Qt.ItemDataRole.UserRole + 2
 
-        self.title_label = QLabel(title)
-        self.title_label.setObjectName("noteTitle")
-        layout.addWidget(self.title_label)
+ITEM_MARGIN = 4
+ITEM_PADDING = 8
+SNIPPET_LINES = 2
+SELECTED_BACKGROUND = QColor("#FFD580")
+HOVER_BACKGROUND = QColor("#35384A")
+SELECTED_TEXT = QColor("#23262F")
+UNSELECTED_TEXT = QColor("#6C6F7E")
 
-        date_to_show = updated_at if updated_at else created_at
-        date_dt = datetime.fromisoformat(date_to_show.replace("Z", "+00:00")).replace(
-            tzinfo=None
-        )
 
-        self.updated_label = QLabel(f"updated: {date_dt.strftime('%m/%d/%Y %H:%M')}")
-        self.updated_label.setObjectName("noteDate")
-        layout.addWidget(self.updated_label)
+def format_note_date(created_at, updated_at):
+    date_to_show = updated_at if updated_at else created_at
+    date_dt = datetime.fromisoformat(date_to_show.replace("Z", "+00:00")).replace(
+        tzinfo=None
+    )
+    return f"updated: {date_dt.strftime('%m/%d/%Y %H:%M')}"
+
+
+def catalog_key(title, updated_at):
+    return (updated_at or "", title)
+
+
+class NoteListModel(QAbstractListModel):
+    def __init__(self, parent=None, ordered=False):
+        super().__init__(parent)
+        self.notes = []
+        self.ordered = ordered
+        self.updated = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.notes)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        title, created_at, updated_at, snippet = self.notes[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, TITLE_ROLE):
+            return title
+        if role == DATE_ROLE:
+            return format_note_date(created_at, updated_at)
+        if role == SNIPPET_ROLE:
+            return snippet
+        return None
+
+    def set_notes(self, notes):
+        self.beginResetModel()
+        self.notes = [(*note[:3], note[3] if len(note) > 3 else None) for note in notes]
+        self.updated = {note[0]: note[2] for note in self.notes}
+        self.endResetModel()
+
+    def append_notes(self, notes):
+        if not notes:
+            return
+        first = len(self.notes)
+        self.beginInsertRows(QModelIndex(), first, first + len(notes) - 1)
+        for title, created_at, updated_at in notes:
+            self.notes.append((title, created_at, updated_at, None))
+            self.updated[title] = updated_at
+        self.endInsertRows()
+
+    def bisect(self, title, updated_at):
+        key = catalog_key(title, updated_at)
+        low, high = 0, len(self.notes)
+        while low < high:
+            middle = (low + high) // 2
+            note = self.notes[middle]
+            if catalog_key(note[0], note[2]) > key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find_row(self, title):
+        if self.ordered:
+            if title not in self.updated:
+                return -1
+            return self.bisect(title, self.updated[title])
+        for row, note in enumerate(self.notes):
+            if note[0] == title:
+                return row
+        return -1
+
+    def title(self, row):
+        return self.notes[row][0]
+
+    def has_snippets(self):
+        return any(note[3] for note in self.notes)
+
+    def insert_note(self, title, created_at, updated_at, append=False):
+        row = self.bisect(title, updated_at) if self.ordered else 0
+        if row == len(self.notes) and not append:
+            return -1
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.notes.insert(row, (title, created_at, updated_at, None))
+        self.updated[title] = updated_at
+        self.endInsertRows()
+        return row
 
-        self.setLayout(layout)
-        self.set_unselected_style()
+    def update_note(self, row, created_at, updated_at):
+        title, _, _, snippet = self.notes[row]
+        note = (title, created_at, updated_at, snippet)
+        if self.ordered:
+            del self.notes[row]
+            new_row = self.bisect(title, updated_at)
+            self.notes.insert(row, note)
+            self.updated[title] = updated_at
+            if new_row != row:
+                destination = new_row + 1 if new_row > row else new_row
+                self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+                del self.notes[row]
+                self.notes.insert(new_row, note)
+                self.endMoveRows()
+                row = new_row
+        self.notes[row] = note
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+        return row
 
-    def set_selected_style(self):
-        self.title_label.setStyleSheet(
-            "color: #23262F; font-weight: bold; font-size: 16px;"
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        title = self.notes.pop(row)[0]
+        self.updated.pop(title, None)
+        self.endRemoveRows()
+
+
+class NoteItemDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.font_family = None
+
+    def update_fonts(self, base_font):
+        if base_font.family() == self.font_family:
+            return
+        self.font_family = base_font.family()
+        self.title_font = QFont(base_font)
+        self.title_font.setPixelSize(16)
+        self.title_font.setBold(True)
+        self.date_font = QFont(base_font)
+        self.date_font.setPixelSize(13)
+        self.date_font.setBold(False)
+        self.snippet_font = QFont(base_font)
+        self.snippet_font.setPixelSize(12)
+        self.snippet_font.setBold(False)
+        self.title_height = QFontMetrics(self.title_font).height()
+        self.date_height = QFontMetrics(self.date_font).height()
+        self.snippet_height = QFontMetrics(self.snippet_font).height() * SNIPPET_LINES
+
+    def sizeHint(self, option, index):
+        self.update_fonts(option.font)
+        height = 4 * ITEM_MARGIN + self.title_height + 2 + self.date_height
+        if index.data(SNIPPET_ROLE):
+            height += 2 + self.snippet_height
+        return QSize(option.rect.width(), height)
+
+    def paint(self, painter, option, index):
+        self.update_fonts(option.font)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        rect = option.rect.adjusted(0, ITEM_MARGIN, 0, -ITEM_MARGIN)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        if selected:
+            background = SELECTED_BACKGROUND
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            background = HOVER_BACKGROUND
+        else:
+            background = None
+        if background is not None:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(background)
+            painter.drawRoundedRect(QRectF(rect), 10, 10)
+
+        text_color = SELECTED_TEXT if selected else UNSELECTED_TEXT
+        text_rect = rect.adjusted(ITEM_PADDING, ITEM_MARGIN, -ITEM_PADDING, -ITEM_MARGIN)
+        left, top, width = text_rect.left(), text_rect.top(), text_rect.width()
+        flags = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+        painter.setPen(text_color)
+        painter.setFont(self.title_font)
+        title = painter.fontMetrics().elidedText(
+            index.data(TITLE_ROLE), Qt.TextElideMode.ElideRight, width
         )
-        self.updated_label.setStyleSheet("color: #6C6F7E; font-size: 13px;")
+        painter.drawText(QRect(left, top, width, self.title_height), flags, title)
+        top += self.title_height + 2
 
-    def set_unselected_style(self):
-        self.title_label.setStyleSheet(
-            "color: #6C6F7E; font-weight: bold; font-size: 16px;"
+        painter.setPen(UNSELECTED_TEXT)
+        painter.setFont(self.date_font)
+        painter.drawText(
+            QRect(left, top, width, self.date_height), flags, index.data(DATE_ROLE)
         )
-        self.updated_label.setStyleSheet("color: #6C6F7E; font-size: 13px;")
+        top += self.date_height + 2
 
+        snippet = index.data(SNIPPET_ROLE)
+        if snippet:
+            snippet_rect = QRect(left, top, width, self.snippet_height)
+            painter.setPen(text_color)
+            painter.setFont(self.snippet_font)
+            painter.setClipRect(snippet_rect)
+            painter.drawText(
+                snippet_rect,
+                Qt.AlignmentFlag.AlignLeft | Qt.TextFlag.TextWordWrap,
+                snippet,
+            )
+        painter.restore()
+
+
+class NoteListView(QListView):
+    currentRowChanged = pyqtSignal(int)
 
-class NoteListWidget(QListWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_app = parent
-        self.all_notes = []
-        self.currentRowChanged.connect(self.update_item_styles)
+        self.catalog = NoteListModel(self, ordered=True)
+        self.results = NoteListModel(self)
+        self.catalog_scroll = 0
+        self.setItemDelegate(NoteItemDelegate(self))
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setMouseTracking(True)
+        self.show_model(self.catalog)
 
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+
+    def show_model(self, model, title=None):
+        if self.model() is not model:
+            previous = self.selectionModel()
+            self.setModel(model)
+            if previous is not None:
+                previous.deleteLater()
+            self.selectionModel().currentRowChanged.connect(
+                lambda current, _: self.currentRowChanged.emit(current.row())
+            )
+        self.setUniformItemSizes(not model.has_snippets())
+        if title is not None:
+            self.select_quietly(model.find_row(title))
 
-    def set_all_notes(self, notes):
-        self.all_notes = notes
+    def select_quietly(self, row):
+        self.selectionModel().blockSignals(True)
+        if row >= 0:
+            self.setCurrentRow(row)
+        else:
+            self.setCurrentIndex(QModelIndex())
+            self.clearSelection()
+        self.selectionModel().blockSignals(False)
+
+    def searching(self):
+        return self.model() is self.results
+
+    def count(self):
+        return self.model().rowCount()
+
+    def currentRow(self):
+        return self.currentIndex().row()
+
+    def setCurrentRow(self, row):
+        self.setCurrentIndex(self.model().index(row, 0))
+
+    def title(self, row):
+        return self.model().title(row)
+
+    def current_title(self):
+        row = self.currentRow()
+        return self.title(row) if row >= 0 else None
+
+    def last_note(self):
+        return self.catalog.notes[-1][:3] if self.catalog.notes else None
 
-    def filter_notes(self, search_text):
-        self.clear()
-        for title, created_at, updated_at in self.all_notes:
-            if search_text.lower() in title.lower():
-                item = QListWidgetItem()
-                widget = NoteItemWidget(title, created_at, updated_at)
-                item.setSizeHint(widget.sizeHint())
-                self.addItem(item)
-                self.setItemWidget(item, widget)
+    def set_notes(self, notes):
+        had_current = self.currentIndex().isValid()
+        if self.searching():
+            self.show_model(self.catalog)
+        self.catalog.set_notes(notes)
+        if had_current:
+            self.currentRowChanged.emit(-1)
+
+    def append_notes(self, notes):
+        self.catalog.append_notes(notes)
+
+    def on_scrolled(self, value):
+        scroll_bar = self.verticalScrollBar()
+        if value >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self.parent_app.fetch_more_notes()
+
+    def filter_notes(self, title_matches, content_matches=()):
+        notes = list(title_matches)
+        shown = {title for title, _, _ in notes}
+        for title, created_at, updated_at, _, snippet in content_matches:
+            if title not in shown:
+                notes.append((title, created_at, updated_at, snippet))
+                shown.add(title)
+
+        title = self.current_title()
+        if not self.searching():
+            self.catalog_scroll = self.verticalScrollBar().value()
+        self.results.set_notes(notes)
+        self.show_model(self.results, title)
+
+    def show_catalog(self, title=None):
+        if not self.searching():
+            return
+        self.results.set_notes([])
+        self.show_model(self.catalog, title)
+        self.doItemsLayout()
+        self.verticalScrollBar().setValue(self.catalog_scroll)
+
+    def find_row(self, title):
+        return self.model().find_row(title)
+
+    def upsert_note(self, title, created_at, updated_at, append=False):
+        self.keep_viewport(
+            self.catalog,
+            lambda: self.patch_catalog(title, created_at, updated_at, append),
+        )
+        row = self.results.find_row(title)
+        if row >= 0:
+            self.results.update_note(row, created_at, updated_at)
+
+    def patch_catalog(self, title, created_at, updated_at, append):
+        row = self.catalog.find_row(title)
+        if row >= 0:
+            self.catalog.update_note(row, created_at, updated_at)
+        else:
+            self.catalog.insert_note(title, created_at, updated_at, append)
+
+    def remove_note(self, title):
+        shown_row = self.find_row(title)
+        current_row = self.currentRow()
+        for model in (self.catalog, self.results):
+            row = model.find_row(title)
+            if row >= 0:
+                self.keep_viewport(model, lambda: model.remove_row(row))
+        if shown_row >= 0 and shown_row == current_row:
+            self.select_quietly(-1)
+        return shown_row
+
+    def keep_viewport(self, model, change):
+        if model is not self.model():
+            change()
+            return
+
+        current_title = self.current_title()
+        top_index = self.indexAt(QPoint(0, 0))
+        top_title = top_index.data(TITLE_ROLE) if top_index.isValid() else None
+        offset = self.visualRect(top_index).top() if top_index.isValid() else 0
+
+        self.selectionModel().blockSignals(True)
+        change()
+        if current_title is not None:
+            self.setCurrentRow(model.find_row(current_title))
+        self.selectionModel().blockSignals(False)
+
+        if top_title is None:
+            return
+        top_row = model.find_row(top_title)
+        if top_row < 0:
+            return
+        self.doItemsLayout()
+        scroll_bar = self.verticalScrollBar()
+        top = self.visualRect(model.index(top_row, 0)).top()
+        scroll_bar.setValue(scroll_bar.value() + top - offset)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Delete:
-            current_item = self.currentItem()
-            if current_item:
-                widget = self.itemWidget(current_item)
-                title = widget.findChild(QLabel, "noteTitle").text()
-                self.parent_app.delete_note(title)
+            index = self.currentIndex()
+            if index.isValid():
+                self.parent_app.delete_note(index.data(TITLE_ROLE))
         else:
             super().keyPressEvent(event)
 
-    def update_item_styles(self, current_row):
-        for i in range(self.count()):
-            item = self.item(i)
-            widget = self.itemWidget(item)
-            if widget:
-                if i == current_row:
-                    widget.set_selected_style()
-                else:
-                    widget.set_unselected_style()
+
+class NoteEditor(QTextEdit):
+    image_pasted = pyqtSignal(object)
+    files_dropped = pyqtSignal(list)
+
+    def canInsertFromMimeData(self, source):
+        return source.hasImage() or source.hasUrls() or super().canInsertFromMimeData(
+            source
+        )
+
+    def insertFromMimeData(self, source):
+        if source.hasImage():
+            self.image_pasted.emit(source.imageData())
+            return
+
+        paths = [url.toLocalFile() for url in source.urls() if url.isLocalFile()]
+        if paths:
+            self.files_dropped.emit(paths)
+            return
+
+        super().insertFromMimeData(source)
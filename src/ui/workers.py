@@ -0,0 +1,90 @@
+from PyQt6.QtCore import QEvent, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+IDLE_TIMEOUT_MS = 30000
+INPUT_EVENTS = {
+    QEvent.Type.KeyPress,
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.MouseMove,
+    QEvent.Type.Wheel,
+}
+
+
+class PersistenceBridge(QObject):
+    notes_saved = pyqtSignal(list)
+    save_failed = pyqtSignal(str)
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        db_manager.writer.on_saved = self.notes_saved.emit
+        db_manager.writer.on_error = lambda error: self.save_failed.emit(str(error))
+
+    def detach(self):
+        self.db_manager.writer.on_saved = None
+        self.db_manager.writer.on_error = None
+
+
+class IdleWatcher(QObject):
+    idle = pyqtSignal()
+    active = pyqtSignal()
+
+    def __init__(self, application, timeout=IDLE_TIMEOUT_MS, parent=None):
+        super().__init__(parent)
+        self.is_idle = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(timeout)
+        self.timer.timeout.connect(self.on_timeout)
+        application.installEventFilter(self)
+        self.timer.start()
+
+    def eventFilter(self, watched, event):
+        if event.type() in INPUT_EVENTS:
+            if self.is_idle:
+                self.is_idle = False
+                self.active.emit()
+            self.timer.start()
+        return False
+
+    def on_timeout(self):
+        self.is_idle = True
+        self.idle.emit()
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+
+
+class BackgroundTask(QRunnable):
+    def __init__(self, task, reports_progress=False):
+        super().__init__()
+        self.task = task
+        self.reports_progress = reports_progress
+        self.signals = TaskSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            if self.reports_progress:
+                result = self.task(self.signals.progress.emit)
+            else:
+                result = self.task()
+        except Exception as error:
+            self.signals.failed.emit(str(error))
+            return
+        self.signals.finished.emit(result)
+
+
+def run_in_background(task, on_finished=None, on_failed=None, on_progress=None):
+    background_task = BackgroundTask(task, reports_progress=on_progress is not None)
+    if on_progress:
+        background_task.signals.progress.connect(on_progress)
+    if on_finished:
+        background_task.signals.finished.connect(on_finished)
+    if on_failed:
+        background_task.signals.failed.connect(on_failed)
+    QThreadPool.globalInstance().start(background_task)
+    return background_task
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+
+
+APP_DIR_NAME = "hiddenote"
+DEFAULT_VAULT_NAME = "default"
+DEFAULT_VAULT_FILE = "hiddenote.db"
+REGISTRY_FILE = "vaults.json"
+LEGACY_REGISTRY_PATH = "hiddenote-vaults.json"
+
+
+def user_data_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, APP_DIR_NAME)
+
+
+def default_vault_path():
+    if os.path.exists(DEFAULT_VAULT_FILE):
+        return os.path.abspath(DEFAULT_VAULT_FILE)
+    os.makedirs(user_data_dir(), exist_ok=True)
+    return os.path.join(user_data_dir(), DEFAULT_VAULT_FILE)
+
+
+class VaultRegistry:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(user_data_dir(), REGISTRY_FILE)
+        self.vaults = {}
+        self.last_used = None
+        self.load()
+
+    def load(self):
+        path = self.path
+        if not os.path.exists(path) and os.path.exists(LEGACY_REGISTRY_PATH):
+            path = LEGACY_REGISTRY_PATH
+        if os.path.exists(path):
+            with open(path) as file:
+                data = json.load(file)
+            self.vaults = {entry["name"]: entry["path"] for entry in data["vaults"]}
+            self.last_used = data.get("last_used")
+
+        if not self.vaults:
+            self.vaults[DEFAULT_VAULT_NAME] = default_vault_path()
+        if self.last_used not in self.vaults:
+            self.last_used = next(iter(self.vaults))
+
+    def save(self):
+        data = {
+            "vaults": [
+                {"name": name, "path": path} for name, path in self.vaults.items()
+            ],
+            "last_used": self.last_used,
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def names(self):
+        return list(self.vaults)
+
+    def vault_path(self, name):
+        return self.vaults[name]
+
+    def add_vault(self, name, path):
+        if name in self.vaults:
+            raise ValueError(f"a vault called '{name}' already exists")
+        self.vaults[name] = os.path.abspath(path)
+        self.save()
+
+    def remove_vault(self, name):
+        del self.vaults[name]
+        if self.last_used == name:
+            self.last_used = next(iter(self.vaults), None)
+        self.save()
+
+    def mark_used(self, name):
+        if self.last_used != name:
+            self.last_used = name
+            self.save()
@@ -0,0 +1,117 @@
+import threading
+import time
+
+
+WRITE_COALESCE_DELAY = 0.25
+MAX_RETRY_DELAY = 30.0
+
+
+class NoteWriter(threading.Thread):
+    def __init__(self, write_batch, delay=WRITE_COALESCE_DELAY):
+        super().__init__(name="hiddenote-writer", daemon=True)
+        self.write_batch = write_batch
+        self.delay = delay
+        self.condition = threading.Condition()
+        self.pending = {}
+        self.in_flight = {}
+        self.flush_requested = False
+        self.stopping = False
+        self.error_count = 0
+        self.failures = 0
+        self.on_saved = None
+        self.on_error = None
+
+    def submit(self, title, content):
+        with self.condition:
+            self.pending[title] = content
+            self.condition.notify_all()
+
+    def discard(self, title):
+        with self.condition:
+            self.pending.pop(title, None)
+            self.in_flight.pop(title, None)
+
+    def holds(self, title):
+        with self.condition:
+            return title in self.in_flight
+
+    def pending_titles(self):
+        with self.condition:
+            return list(dict.fromkeys([*self.pending, *self.in_flight]))
+
+    def snapshot(self, title):
+        with self.condition:
+            if title in self.pending:
+                return self.pending[title]
+            return self.in_flight.get(title)
+
+    def flush(self):
+        with self.condition:
+            if not self.is_alive():
+                return
+            errors = self.error_count
+            self.flush_requested = True
+            self.condition.notify_all()
+            while (self.pending or self.in_flight) and self.error_count == errors:
+                self.condition.wait()
+            self.flush_requested = False
+
+    def stop(self):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        if self.is_alive():
+            self.join()
+        if self.pending:
+            self.write_pending()
+
+    def retry_delay(self):
+        return min(self.delay * 2 ** min(self.failures, 8), MAX_RETRY_DELAY)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if not self.pending or (self.stopping and self.failures):
+                    return
+
+                deadline = time.monotonic() + self.retry_delay()
+                while not (self.stopping or self.flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+            try:
+                batch = self.write_pending()
+            except Exception as error:
+                if self.on_error:
+                    self.on_error(error)
+                continue
+            if self.on_saved:
+                self.on_saved(list(batch))
+
+    def write_pending(self):
+        with self.condition:
+            batch = self.pending
+            self.pending = {}
+            self.in_flight = dict(batch)
+
+        try:
+            self.write_batch(batch)
+        except Exception:
+            with self.condition:
+                for title, content in self.in_flight.items():
+                    self.pending.setdefault(title, content)
+                self.in_flight = {}
+                self.error_count += 1
+                self.failures += 1
+                self.condition.notify_all()
+            raise
+
+        with self.condition:
+            self.in_flight = {}
+            self.failures = 0
+            self.condition.notify_all()
+        return batch
@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.backup import BackupManager, load_manifest, restore_backup
+from src.database import DatabaseManager
+from src.migrations import MigrationRunner
+
+
+def open_vault(path):
+    db_manager = DatabaseManager(path)
+    db_manager.setup_encryption("pw", background=False)
+    return db_manager
+
+
+class BackupTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.backup_dir = os.path.join(self.directory, "backups")
+        self.db_manager = open_vault(os.path.join(self.directory, "vault.db"))
+        self.db_manager.save_note("kept", "unchanged note")
+        self.db_manager.save_note("edited", "first draft")
+        self.db_manager.save_note("removed", "going away")
+        self.db_manager.flush()
+        self.backups = BackupManager(self.db_manager, self.backup_dir)
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.directory)
+
+    def restore(self, upto=None):
+        path = os.path.join(self.directory, "restored.db")
+        if os.path.exists(path):
+            os.remove(path)
+        restore_backup(self.backup_dir, path, upto)
+        restored = open_vault(path)
+        self.addCleanup(restored.close)
+        return restored
+
+    def test_full_backup_restores_every_note(self):
+        entry = self.backups.backup()
+
+        self.assertEqual(entry["kind"], "full")
+        restored = self.restore()
+        for title in ("kept", "edited", "removed"):
+            self.assertEqual(
+                restored.load_note(title), self.db_manager.load_note(title)
+            )
+
+    def test_incremental_chain_replays_edits_and_deletions(self):
+        first = self.backups.backup()
+        self.db_manager.save_note("edited", "second draft")
+        self.db_manager.save_note("added", "new note")
+        self.db_manager.delete_note("removed")
+        self.db_manager.flush()
+        self.assertEqual(self.backups.backup()["kind"], "incremental")
+        self.db_manager.save_note("edited", "final draft")
+        self.db_manager.flush()
+        self.backups.backup()
+
+        restored = self.restore()
+        self.assertEqual(restored.load_note("kept"), "unchanged note")
+        self.assertEqual(restored.load_note("edited"), "final draft")
+        self.assertEqual(restored.load_note("added"), "new note")
+        self.assertFalse(restored.note_exists("removed"))
+
+        MigrationRunner(restored, throttle=0).run()
+        self.assertEqual(
+            [result[0] for result in restored.search_notes("draft")], ["edited"]
+        )
+
+        restored.close()
+        earlier = self.restore(upto=first["name"])
+        self.assertEqual(earlier.load_note("edited"), "first draft")
+        self.assertTrue(earlier.note_exists("removed"))
+
+    def test_incremental_picks_up_attachment_changes(self):
+        self.backups.backup()
+        key = self.db_manager.attachments.add("kept", "data.bin", b"payload" * 100)
+        self.backups.backup()
+
+        restored = self.restore()
+        self.assertEqual(restored.attachments.read(key), b"payload" * 100)
+
+        restored.close()
+        self.db_manager.attachments.delete(key)
+        self.backups.backup()
+        self.assertIsNone(self.restore().attachments.info(key))
+
+    def test_retention_keeps_the_newest_full_backups(self):
+        backups = BackupManager(
+            self.db_manager, self.backup_dir, keep_full=2, max_incrementals=1
+        )
+        for number in range(7):
+            self.db_manager.save_note("edited", f"draft {number}")
+            self.db_manager.flush()
+            backups.backup()
+
+        entries = load_manifest(self.backup_dir)["backups"]
+        kinds = [entry["kind"] for entry in entries]
+        self.assertEqual(kinds.count("full"), 2)
+        self.assertEqual(kinds[0], "full")
+        files = [name for name in os.listdir(self.backup_dir) if name.endswith(".db")]
+        self.assertEqual(sorted(files), sorted(entry["name"] for entry in entries))
+        self.assertEqual(self.restore().load_note("edited"), "draft 6")
+
+    def test_restore_refuses_an_open_vault(self):
+        self.backups.backup()
+        with self.assertRaises(ValueError):
+            restore_backup(self.backup_dir, self.db_manager.db_path)
+        self.assertEqual(self.db_manager.load_note("kept"), "unchanged note")
+
+
+if __name__ == "__main__":
+    unittest.main()
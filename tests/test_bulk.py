@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from src.bulk import export_filename, export_notes, import_notes
+from src.database import DatabaseManager
+
+
+LARGE_NOTE = "".join(f"line {number} of a long note\n" for number in range(8000))
+
+
+def open_vault(path):
+    db_manager = DatabaseManager(path)
+    db_manager.setup_encryption("pw", background=False)
+    db_manager.delete_note("Welcome to hiddenote")
+    db_manager.flush()
+    return db_manager
+
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+class BulkTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_manager = open_vault(os.path.join(self.directory, "vault.db"))
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.directory)
+
+    def path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    def titles(self, db_manager=None):
+        db_manager = db_manager or self.db_manager
+        rows = db_manager.conn.execute("SELECT title FROM notes ORDER BY title")
+        return [row[0] for row in rows]
+
+    def test_import_directory_in_batches(self):
+        source = self.path("source")
+        for number in range(7):
+            write_file(os.path.join(source, f"note {number}.md"), f"body {number}")
+        write_file(os.path.join(source, "nested", "big.md"), LARGE_NOTE)
+        write_file(os.path.join(source, "readme.txt"), "not a note")
+        reports = []
+
+        imported, skipped = import_notes(
+            self.db_manager,
+            source,
+            progress=lambda done, total: reports.append((done, total)),
+            workers=2,
+            batch_size=3,
+        )
+
+        self.assertEqual((imported, skipped), (8, 0))
+        self.assertEqual(reports[-1], (8, 8))
+        self.assertEqual(len(self.titles()), 8)
+        self.assertEqual(self.db_manager.load_note("note 4"), "body 4")
+        self.assertEqual(self.db_manager.load_note("big"), LARGE_NOTE)
+        self.assertEqual(
+            [result[0] for result in self.db_manager.search_notes("long")], ["big"]
+        )
+
+    def test_import_skips_duplicates_and_existing_titles(self):
+        self.db_manager.save_note("existing", "keep me")
+        self.db_manager.flush()
+        source = self.path("source.zip")
+        with zipfile.ZipFile(source, "w") as archive:
+            archive.writestr("existing.md", "overwrite attempt")
+            archive.writestr("one/twin.md", "first twin")
+            archive.writestr("two/twin.md", "second twin")
+            archive.writestr("fresh.MD", "fresh note")
+            archive.writestr("image.png", b"\x89PNG")
+
+        imported, skipped = import_notes(self.db_manager, source, workers=2)
+
+        self.assertEqual((imported, skipped), (2, 2))
+        self.assertEqual(self.titles(), ["existing", "fresh", "twin"])
+        self.assertEqual(self.db_manager.load_note("existing"), "keep me")
+        self.assertEqual(self.db_manager.load_note("twin"), "first twin")
+
+    def test_export_round_trips_through_a_directory_and_a_zip(self):
+        notes = {"first": "one", "second": "two", "big": LARGE_NOTE}
+        for title, content in notes.items():
+            self.db_manager.save_note(title, content)
+
+        for destination in (self.path("export"), self.path("export.zip")):
+            self.assertEqual(
+                export_notes(self.db_manager, destination, workers=2), len(notes)
+            )
+            restored = open_vault(self.path(f"{os.path.basename(destination)}.db"))
+            self.addCleanup(restored.close)
+            self.assertEqual(import_notes(restored, destination), (3, 0))
+            for title, content in notes.items():
+                self.assertEqual(restored.load_note(title), content)
+
+    def test_export_filenames_are_safe_and_unique(self):
+        used = set()
+        self.assertEqual(export_filename("a/b", used), "a_b.md")
+        self.assertEqual(export_filename("A_B", used), "A_B (2).md")
+        self.assertEqual(export_filename("...", used), "untitled.md")
+        self.assertEqual(export_filename('x:*?"<>|', used), "x_______.md")
+
+        self.db_manager.save_note("plans/2024", "slash")
+        self.db_manager.save_note("plans_2024", "underscore")
+        destination = self.path("export")
+        export_notes(self.db_manager, destination)
+
+        exported = {}
+        for filename in os.listdir(destination):
+            with open(os.path.join(destination, filename), encoding="utf-8") as file:
+                exported[filename] = file.read()
+        self.assertEqual(
+            exported, {"plans_2024.md": "slash", "plans_2024 (2).md": "underscore"}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from src.chunks import (
+    CHUNK_THRESHOLD,
+    MAX_CHUNK_SIZE,
+    MIN_CHUNK_SIZE,
+    NOTE_FORMAT_CHUNKED,
+    NOTE_FORMAT_INLINE,
+    split_chunks,
+)
+from src.database import DatabaseManager
+
+
+WORDS = "alpha beta gamma delta epsilon zeta theta kappa lambda sigma".split()
+
+
+def large_text(lines=8000, seed=1):
+    rng = random.Random(seed)
+    return "".join(" ".join(rng.choices(WORDS, k=6)) + "\n" for _ in range(lines))
+
+
+class SplitChunksTest(unittest.TestCase):
+    def test_chunks_rebuild_the_content(self):
+        content = large_text()
+        chunks = split_chunks(content)
+        self.assertEqual("".join(chunks), content)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), MAX_CHUNK_SIZE)
+        for chunk in chunks[:-1]:
+            self.assertGreaterEqual(len(chunk), MIN_CHUNK_SIZE)
+            self.assertTrue(chunk.endswith("\n"))
+
+    def test_text_without_newlines_is_cut_at_the_maximum(self):
+        content = "x" * (MAX_CHUNK_SIZE * 2 + 10)
+        self.assertEqual(
+            [len(chunk) for chunk in split_chunks(content)],
+            [MAX_CHUNK_SIZE, MAX_CHUNK_SIZE, 10],
+        )
+
+    def test_boundaries_follow_the_content(self):
+        content = large_text()
+        edited = "inserted line\n" + content
+        before = split_chunks(content)
+        after = split_chunks(edited)
+        shared = set(before) & set(after)
+        self.assertGreaterEqual(len(shared), len(before) - 2)
+
+
+class ChunkedStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.directory, "v.db"))
+        self.db_manager.setup_encryption("pw", background=False)
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.directory)
+
+    def save(self, content):
+        self.db_manager.save_note("big", content)
+        self.db_manager.flush()
+
+    def stored(self):
+        conn = self.db_manager.conn
+        note_id, blob, note_format = conn.execute(
+            "SELECT id, content, format FROM notes WHERE title = 'big'"
+        ).fetchone()
+        chunk_ids = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM note_chunks WHERE note_id = ? ORDER BY id", (note_id,)
+            )
+        ]
+        return blob, note_format, chunk_ids
+
+    def reload(self):
+        self.db_manager.forget_notes(["big"])
+        return self.db_manager.load_note("big")
+
+    def test_large_note_is_stored_as_a_manifest_of_chunks(self):
+        content = large_text()
+        self.assertGreater(len(content), CHUNK_THRESHOLD)
+        self.save(content)
+
+        blob, note_format, chunk_ids = self.stored()
+        self.assertEqual(note_format, NOTE_FORMAT_CHUNKED)
+        manifest = json.loads(self.db_manager.decrypt_content(blob))
+        self.assertEqual(sorted(manifest), chunk_ids)
+        self.assertEqual(len(manifest), len(split_chunks(content)))
+        self.assertEqual(self.reload(), content)
+
+    def test_small_edit_rewrites_only_nearby_chunks(self):
+        content = large_text()
+        self.save(content)
+        _, _, before = self.stored()
+
+        lines = content.splitlines(keepends=True)
+        lines[len(lines) // 2] = "edited in the middle\n"
+        edited = "".join(lines)
+        self.save(edited)
+
+        _, _, after = self.stored()
+        self.assertEqual(len(set(after) - set(before)), 1)
+        self.assertEqual(len(after), len(split_chunks(edited)))
+        self.assertEqual(self.reload(), edited)
+
+    def test_shrinking_below_the_threshold_drops_the_chunks(self):
+        self.save(large_text())
+        self.save("small again")
+
+        blob, note_format, chunk_ids = self.stored()
+        self.assertEqual(note_format, NOTE_FORMAT_INLINE)
+        self.assertEqual(chunk_ids, [])
+        self.assertEqual(self.reload(), "small again")
+
+
+if __name__ == "__main__":
+    unittest.main()
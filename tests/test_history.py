@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.database import DatabaseManager
+from src.history import (
+    MIN_REVISION_INTERVAL,
+    PRUNE_THRESHOLD,
+    apply_delta,
+    make_delta,
+)
+
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+NOW = 1_700_000_000.0
+BODY = "".join(f"line {number}\n" for number in range(20))
+
+
+def version(number):
+    return BODY.replace("line 10\n", f"version {number}\n")
+
+
+class DeltaTest(unittest.TestCase):
+    def test_delta_rebuilds_the_previous_text(self):
+        pairs = [
+            ("a\nb\nc\n", "a\nB\nc\n"),
+            ("a\nb\nc\n", "a\nc\n"),
+            ("a\nc\n", "a\nb\nc\n"),
+            ("", "a\nb\n"),
+            ("a\nb\n", ""),
+            ("a\nb", "a\nb\n"),
+            ("same\n", "same\n"),
+        ]
+        for current, previous in pairs:
+            delta = make_delta(current, previous)
+            self.assertEqual(apply_delta(current, delta), previous)
+
+    def test_delta_keeps_only_the_changed_lines(self):
+        prefix, suffix, middle = make_delta(version(2), version(1))
+        self.assertEqual((prefix, suffix, middle), (10, 9, "version 1\n"))
+
+
+class RevisionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.directory, "v.db"))
+        self.db_manager.setup_encryption("pw", background=False)
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.directory)
+
+    def save_at(self, content, when):
+        with mock.patch("src.history.time") as clock:
+            clock.time.return_value = when
+            self.db_manager.save_note("note", content)
+            self.db_manager.flush()
+
+    def versions(self):
+        return {
+            revision_id: self.db_manager.load_revision("note", revision_id)
+            for revision_id, _ in self.db_manager.list_revisions("note")
+        }
+
+    def test_each_save_keeps_the_previous_version(self):
+        for number in range(4):
+            self.save_at(version(number), NOW + number * HOUR)
+
+        revisions = self.db_manager.list_revisions("note")
+        self.assertEqual(len(revisions), 3)
+        self.assertEqual(
+            list(self.versions().values()), [version(2), version(1), version(0)]
+        )
+
+    def test_quick_saves_are_coalesced(self):
+        self.save_at(version(0), NOW)
+        self.save_at(version(1), NOW + HOUR)
+        self.save_at(version(2), NOW + HOUR + 1)
+        self.save_at(version(3), NOW + HOUR + 2)
+
+        self.assertEqual(list(self.versions().values()), [version(0)])
+
+        self.save_at(version(0), NOW + HOUR + 3)
+        self.assertEqual(self.versions(), {})
+
+        self.save_at(version(4), NOW + HOUR + MIN_REVISION_INTERVAL)
+        self.save_at(version(5), NOW + HOUR + 2 * MIN_REVISION_INTERVAL)
+        self.assertEqual(list(self.versions().values()), [version(4), version(0)])
+
+    def test_restore_revision_saves_it_as_the_current_note(self):
+        self.save_at(version(0), NOW)
+        self.save_at(version(1), NOW + HOUR)
+        revision_id = self.db_manager.list_revisions("note")[0][0]
+
+        with mock.patch("src.history.time") as clock:
+            clock.time.return_value = NOW + 2 * HOUR
+            self.assertEqual(
+                self.db_manager.restore_revision("note", revision_id), version(0)
+            )
+            self.db_manager.flush()
+        self.assertEqual(self.db_manager.load_note("note"), version(0))
+
+    def test_prune_thins_old_revisions_by_tier(self):
+        saved = {}
+        times = [NOW - 40 * DAY + number * 6 * HOUR for number in range(158)]
+        times += [NOW - HOUR + number * 5 * 60 for number in range(12)]
+        for number, when in enumerate(times):
+            self.save_at(version(number), when)
+            saved[when] = version(number)
+
+        db_manager = self.db_manager
+        with db_manager.lock, db_manager.conn:
+            cursor = db_manager.conn.cursor()
+            note_id = db_manager.note_id(cursor, "note")
+            current = db_manager.load_note("note")
+            db_manager.revisions.prune(cursor, note_id, current, NOW)
+
+        revisions = db_manager.list_revisions("note")
+        ages = [NOW - saved_at for _, saved_at in revisions]
+        self.assertTrue(all(age < 30 * DAY for age in ages))
+        recent = [age for age in ages if age < HOUR]
+        self.assertEqual(len(recent), 11)
+        hourly = [int((NOW - age) // HOUR) for age in ages if HOUR <= age < DAY]
+        self.assertEqual(len(hourly), len(set(hourly)))
+        daily = [int((NOW - age) // DAY) for age in ages if age >= DAY]
+        self.assertEqual(len(daily), len(set(daily)))
+        self.assertGreater(len(daily), 20)
+
+        following = {}
+        for index, when in enumerate(times[1:]):
+            following[when] = saved[times[index]]
+        for revision_id, saved_at in revisions:
+            self.assertEqual(
+                db_manager.load_revision("note", revision_id), following[saved_at]
+            )
+
+    def test_history_is_pruned_once_it_passes_the_threshold(self):
+        start = NOW - (PRUNE_THRESHOLD + 2) * 6 * HOUR
+        for number in range(PRUNE_THRESHOLD + 2):
+            self.save_at(version(number), start + number * 6 * HOUR)
+
+        self.assertLessEqual(
+            len(self.db_manager.list_revisions("note")), PRUNE_THRESHOLD
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
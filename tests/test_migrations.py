@@ -0,0 +1,210 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from src.database import DatabaseManager
+from src.migrations import (
+    SCHEMA_MIGRATIONS,
+    BackgroundMigration,
+    MigrationRunner,
+    migrate_schema,
+    schema_version,
+)
+
+
+LATEST_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+def columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+class SchemaMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.directory, "v.db"))
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.directory)
+
+    def test_fresh_database_reaches_the_latest_version(self):
+        migrate_schema(self.conn)
+
+        self.assertEqual(schema_version(self.conn), LATEST_VERSION)
+        self.assertIn("wrapped_key", columns(self.conn, "user_auth"))
+        self.assertIn("format", columns(self.conn, "notes"))
+        self.assertEqual(columns(self.conn, "search_terms"), ["term", "note_id"])
+
+        migrate_schema(self.conn)
+        self.assertEqual(schema_version(self.conn), LATEST_VERSION)
+
+    def test_original_vault_keeps_its_rows(self):
+        with self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE user_auth (
+                    id INTEGER PRIMARY KEY,
+                    password_hash TEXT NOT NULL,
+                    salt BLOB NOT NULL
+                )
+                """
+            )
+            self.conn.execute(
+                """
+                CREATE TABLE notes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL UNIQUE,
+                    content BLOB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+            self.conn.execute("INSERT INTO user_auth VALUES (1, 'hash', x'00')")
+            self.conn.execute(
+                "INSERT INTO notes (title, content) VALUES ('old', x'01')"
+            )
+
+        migrate_schema(self.conn)
+
+        self.assertEqual(
+            self.conn.execute("SELECT title, content, format FROM notes").fetchall(),
+            [("old", b"\x01", 0)],
+        )
+        self.assertEqual(
+            self.conn.execute("SELECT wrapped_key FROM user_auth").fetchone(), (None,)
+        )
+
+    def test_failing_step_rolls_back_and_keeps_the_previous_version(self):
+        def broken(cursor):
+            cursor.execute("CREATE TABLE half_done (id INTEGER)")
+            raise sqlite3.OperationalError("disk I/O error")
+
+        migrations = SCHEMA_MIGRATIONS + [(LATEST_VERSION + 1, broken)]
+        with mock.patch("src.migrations.SCHEMA_MIGRATIONS", migrations):
+            with self.assertRaises(sqlite3.OperationalError):
+                migrate_schema(self.conn)
+
+        self.assertEqual(schema_version(self.conn), LATEST_VERSION)
+        self.assertIsNone(
+            self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'half_done'"
+            ).fetchone()
+        )
+
+    def test_step_already_applied_by_another_connection_is_skipped(self):
+        migrate_schema(self.conn)
+        calls = []
+        migrations = SCHEMA_MIGRATIONS + [(LATEST_VERSION + 1, calls.append)]
+
+        other = sqlite3.connect(os.path.join(self.directory, "v.db"))
+        self.addCleanup(other.close)
+        with mock.patch("src.migrations.SCHEMA_MIGRATIONS", migrations):
+            with mock.patch(
+                "src.migrations.schema_version",
+                side_effect=[LATEST_VERSION, LATEST_VERSION + 1],
+            ):
+                migrate_schema(other)
+
+        self.assertEqual(calls, [])
+
+
+class BackgroundMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.directory, "v.db"))
+        self.db_manager.setup_encryption("pw", background=False)
+        with self.db_manager.conn as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)")
+            conn.executemany(
+                "INSERT INTO items (value) VALUES (?)",
+                [(f"item {number}",) for number in range(25)],
+            )
+        self.transformed = []
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.directory)
+
+    def fetch(self, db_manager, cursor, position, limit):
+        cursor.execute(
+            "SELECT id, value FROM items WHERE id > ? ORDER BY id LIMIT ?",
+            (position, limit),
+        )
+        return cursor.fetchall()
+
+    def transform(self, db_manager, rows):
+        self.transformed.extend(row_id for row_id, _ in rows)
+        return [(value.upper(), row_id) for row_id, value in rows]
+
+    def apply(self, db_manager, cursor, rows):
+        cursor.executemany("UPDATE items SET value = ? WHERE id = ?", rows)
+
+    def run_migration(self, transform=None):
+        migration = BackgroundMigration(
+            "upper-items", self.fetch, transform or self.transform, self.apply
+        )
+        runner = MigrationRunner(
+            self.db_manager, migrations=[migration], batch_size=10, throttle=0
+        )
+        runner.run()
+
+    def progress(self):
+        return self.db_manager.conn.execute(
+            "SELECT position, completed FROM migration_progress WHERE name = ?",
+            ("upper-items",),
+        ).fetchone()
+
+    def values(self):
+        cursor = self.db_manager.conn.execute("SELECT value FROM items ORDER BY id")
+        return [row[0] for row in cursor]
+
+    def test_runs_in_batches_until_complete(self):
+        self.run_migration()
+
+        self.assertEqual(self.values(), [f"ITEM {number}" for number in range(25)])
+        self.assertEqual(self.progress(), (25, 1))
+        self.assertEqual(self.transformed, list(range(1, 26)))
+
+        self.run_migration()
+        self.assertEqual(self.transformed, list(range(1, 26)))
+
+    def test_resumes_after_an_interruption(self):
+        def interrupted(db_manager, rows):
+            if rows[0][0] > 10:
+                raise KeyboardInterrupt
+            return self.transform(db_manager, rows)
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_migration(interrupted)
+        self.assertEqual(self.progress(), (10, 0))
+        self.assertEqual(self.values()[9:11], ["ITEM 9", "item 10"])
+
+        self.run_migration()
+        self.assertEqual(self.transformed, list(range(1, 26)))
+        self.assertEqual(self.values(), [f"ITEM {number}" for number in range(25)])
+        self.assertEqual(self.progress(), (25, 1))
+
+    def test_search_index_backfill_indexes_unindexed_notes(self):
+        db_manager = self.db_manager
+        db_manager.save_note("plans", "quarterly budget review")
+        db_manager.flush()
+        with db_manager.conn as conn:
+            conn.execute("DELETE FROM search_documents")
+            conn.execute("DELETE FROM search_terms")
+            conn.execute("DELETE FROM migration_progress")
+        self.assertEqual(db_manager.search_notes("budget"), [])
+
+        MigrationRunner(db_manager, throttle=0).run()
+
+        self.assertEqual(
+            [result[0] for result in db_manager.search_notes("budget")], ["plans"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
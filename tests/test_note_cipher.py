@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from cryptography.exceptions import InvalidTag
+
+from src.database import DatabaseManager
+from src.migrations import BACKGROUND_MIGRATIONS, MigrationRunner
+from src.note_cipher import (
+    AEAD_FORMAT_VERSION,
+    NONCE_SIZE,
+    NoteCipher,
+    unwrap_key,
+    wrap_key,
+)
+
+
+KEY = bytes(range(32))
+
+
+class NoteCipherTest(unittest.TestCase):
+    def setUp(self):
+        self.cipher = NoteCipher(KEY)
+
+    def test_round_trip(self):
+        blob = self.cipher.encrypt(b"secret note")
+        self.assertEqual(blob[0], AEAD_FORMAT_VERSION)
+        self.assertEqual(len(blob), 1 + NONCE_SIZE + len(b"secret note") + 16)
+        self.assertEqual(self.cipher.decrypt(blob), b"secret note")
+        self.assertEqual(self.cipher.decrypt(bytearray(blob)), b"secret note")
+
+    def test_nonces_are_fresh(self):
+        self.assertNotEqual(self.cipher.encrypt(b"same"), self.cipher.encrypt(b"same"))
+
+    def test_context_is_bound(self):
+        blob = self.cipher.encrypt(b"chunk", b"key:0")
+        self.assertEqual(self.cipher.decrypt(blob, b"key:0"), b"chunk")
+        with self.assertRaises(InvalidTag):
+            self.cipher.decrypt(blob, b"key:1")
+        with self.assertRaises(InvalidTag):
+            self.cipher.decrypt(blob)
+
+    def test_tampering_is_detected(self):
+        blob = bytearray(self.cipher.encrypt(b"secret note"))
+        blob[-1] ^= 1
+        with self.assertRaises(InvalidTag):
+            self.cipher.decrypt(blob)
+
+    def test_reads_legacy_fernet_blobs(self):
+        legacy = self.cipher.fernet.encrypt(b"old note")
+        self.assertTrue(NoteCipher.is_legacy(legacy))
+        self.assertFalse(NoteCipher.is_legacy(self.cipher.encrypt(b"old note")))
+        self.assertEqual(self.cipher.decrypt(legacy), b"old note")
+
+    def test_rejects_unknown_versions(self):
+        blob = bytes((0x03,)) + self.cipher.encrypt(b"x")[1:]
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt(blob)
+
+    def test_key_wrapping(self):
+        password_key = os.urandom(32)
+        wrapped = wrap_key(password_key, KEY)
+        self.assertEqual(unwrap_key(password_key, wrapped), KEY)
+        with self.assertRaises(InvalidTag):
+            unwrap_key(os.urandom(32), wrapped)
+
+
+class LegacyMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.directory, "v.db"))
+        self.db_manager.setup_encryption("pw", background=False)
+        self.db_manager.conn.execute("DELETE FROM migration_progress")
+        self.db_manager.conn.commit()
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.directory)
+
+    def make_legacy(self, table, row_id):
+        conn = self.db_manager.conn
+        blob = conn.execute(
+            f"SELECT content FROM {table} WHERE id = ?", (row_id,)
+        ).fetchone()[0]
+        plain = self.db_manager.decrypt_content(blob).encode()
+        legacy = self.db_manager.cipher_suite.fernet.encrypt(plain)
+        with conn:
+            conn.execute(
+                f"UPDATE {table} SET content = ? WHERE id = ?", (legacy, row_id)
+            )
+        return legacy
+
+    def stored(self, table):
+        return [
+            bytes(row[0])
+            for row in self.db_manager.conn.execute(f"SELECT content FROM {table}")
+        ]
+
+    def test_migration_reencrypts_legacy_rows(self):
+        small = "short note"
+        large = "".join(f"line {number}\n" for number in range(40000))
+        self.db_manager.save_note("small", small)
+        self.db_manager.save_note("large", large)
+        self.db_manager.flush()
+        for (note_id,) in self.db_manager.conn.execute("SELECT id FROM notes"):
+            self.make_legacy("notes", note_id)
+        for (chunk_id,) in self.db_manager.conn.execute("SELECT id FROM note_chunks"):
+            self.make_legacy("note_chunks", chunk_id)
+        self.db_manager.forget_notes(["small", "large"])
+
+        self.assertEqual(self.db_manager.load_note("large"), large)
+        MigrationRunner(self.db_manager, throttle=0).run()
+
+        for table in ("notes", "note_chunks"):
+            blobs = self.stored(table)
+            self.assertTrue(blobs)
+            self.assertFalse([blob for blob in blobs if NoteCipher.is_legacy(blob)])
+        self.db_manager.forget_notes(["small", "large"])
+        self.assertEqual(self.db_manager.load_note("small"), small)
+        self.assertEqual(self.db_manager.load_note("large"), large)
+
+    def test_migration_keeps_rows_written_meanwhile(self):
+        self.db_manager.save_note("note", "old")
+        self.db_manager.flush()
+        note_id = self.db_manager.conn.execute("SELECT id FROM notes").fetchone()[0]
+        self.make_legacy("notes", note_id)
+
+        migration = BACKGROUND_MIGRATIONS[0]
+        rows = migration.fetch(self.db_manager, self.db_manager.conn.cursor(), 0, 10)
+        transformed = migration.transform(self.db_manager, rows)
+        self.db_manager.save_note("note", "new")
+        self.db_manager.flush()
+        with self.db_manager.conn:
+            migration.apply(self.db_manager, self.db_manager.conn.cursor(), transformed)
+
+        self.db_manager.forget_notes(["note"])
+        self.assertEqual(self.db_manager.load_note("note"), "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.database import DatabaseManager
+from src.sync import SyncEngine, dominates, merge_texts, rekey_vector
+
+
+BASE_TEXT = "".join(f"line {number}\n" for number in range(20))
+
+
+def open_vault(path):
+    db_manager = DatabaseManager(path)
+    db_manager.setup_encryption("pw", background=False)
+    return db_manager
+
+
+class MergeTest(unittest.TestCase):
+    def test_dominates(self):
+        self.assertTrue(dominates({"a": 2, "b": 1}, {"a": 1, "b": 1}))
+        self.assertTrue(dominates({"a": 1}, {"a": 1}))
+        self.assertTrue(dominates({"a": 1}, {}))
+        self.assertFalse(dominates({"a": 1}, {"b": 1}))
+        self.assertFalse(dominates({"a": 2}, {"a": 1, "b": 1}))
+
+    def test_rekey_vector_replaces_plain_digests(self):
+        vector = {"=00ff": 1, "a": 2}
+        rekeyed = rekey_vector(vector, b"key")
+        self.assertEqual(rekeyed, rekey_vector(vector, b"key"))
+        self.assertNotEqual(rekeyed, rekey_vector(vector, b"other key"))
+        self.assertEqual(rekeyed["a"], 2)
+        self.assertNotIn("=00ff", rekeyed)
+        self.assertEqual(rekey_vector(rekeyed, b"key"), rekeyed)
+
+    def test_merge_keeps_edits_to_different_lines(self):
+        merged, conflicts = merge_texts(
+            "a\nb\nc\n", "a\nB\nc\n", "a\nb\nC\n", "left", "right"
+        )
+        self.assertEqual(merged, "a\nB\nC\n")
+        self.assertEqual(conflicts, 0)
+
+    def test_merge_marks_edits_to_the_same_line(self):
+        merged, conflicts = merge_texts(
+            "a\nb\nc\n", "a\nleft\nc\n", "a\nright\nc\n", "one", "two"
+        )
+        self.assertEqual(
+            merged,
+            "a\n<<<<<<< one\nleft\n=======\nright\n>>>>>>> two\nc\n",
+        )
+        self.assertEqual(conflicts, 1)
+
+    def test_merge_of_identical_edits_is_clean(self):
+        merged, conflicts = merge_texts("a\n", "b\n", "b\n", "one", "two")
+        self.assertEqual(merged, "b\n")
+        self.assertEqual(conflicts, 0)
+
+
+class SyncEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.sync_dir = os.path.join(self.directory, "sync")
+        first_path = os.path.join(self.directory, "a.db")
+        second_path = os.path.join(self.directory, "b.db")
+
+        first = open_vault(first_path)
+        first.save_note("shared", BASE_TEXT)
+        first.close()
+        shutil.copy(first_path, second_path)
+
+        self.first = open_vault(first_path)
+        self.second = open_vault(second_path)
+        self.sync_round()
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        shutil.rmtree(self.directory)
+
+    def sync(self, db_manager):
+        return SyncEngine(db_manager, self.sync_dir).sync()
+
+    def sync_round(self):
+        reports = [self.sync(self.first), self.sync(self.second)]
+        reports.append(self.sync(self.first))
+        return reports
+
+    def assert_converged(self, title):
+        content = self.first.load_note(title)
+        self.assertEqual(content, self.second.load_note(title))
+        return content
+
+    def test_fast_forward(self):
+        edited = BASE_TEXT.replace("line 4\n", "edited\n")
+        self.first.save_note("shared", edited)
+        self.first.save_note("added", "new note")
+
+        _, second_report, _ = self.sync_round()
+
+        self.assertEqual(self.second.load_note("shared"), edited)
+        self.assertEqual(self.second.load_note("added"), "new note")
+        self.assertEqual(second_report["merged"], 0)
+        self.assertEqual(sorted(second_report["changed"]), ["added", "shared"])
+
+    def test_concurrent_edits_merge_cleanly(self):
+        self.first.save_note("shared", BASE_TEXT.replace("line 2\n", "from a\n"))
+        self.second.save_note("shared", BASE_TEXT.replace("line 15\n", "from b\n"))
+
+        _, second_report, _ = self.sync_round()
+
+        content = self.assert_converged("shared")
+        self.assertEqual(
+            content,
+            BASE_TEXT.replace("line 2\n", "from a\n").replace(
+                "line 15\n", "from b\n"
+            ),
+        )
+        self.assertEqual(second_report["merged"], 1)
+        self.assertEqual(second_report["conflicts"], 0)
+
+    def test_merge_after_fast_forward_uses_the_synced_base(self):
+        synced = BASE_TEXT.replace("line 2\n", "from a\n")
+        self.first.save_note("shared", synced)
+        self.sync(self.first)
+        self.sync(self.second)
+        self.assertEqual(self.second.load_note("shared"), synced)
+
+        self.first.save_note("shared", synced.replace("line 10\n", "a again\n"))
+        self.second.save_note("shared", synced.replace("line 3\n", "from b\n"))
+
+        _, second_report, _ = self.sync_round()
+
+        self.assertEqual(
+            self.assert_converged("shared"),
+            synced.replace("line 10\n", "a again\n").replace("line 3\n", "from b\n"),
+        )
+        self.assertEqual(second_report["merged"], 1)
+        self.assertEqual(second_report["conflicts"], 0)
+
+    def test_conflicting_edits_produce_markers(self):
+        self.first.save_note("shared", BASE_TEXT.replace("line 7\n", "from a\n"))
+        self.second.save_note("shared", BASE_TEXT.replace("line 7\n", "from b\n"))
+
+        _, second_report, _ = self.sync_round()
+
+        content = self.assert_converged("shared")
+        self.assertEqual(second_report["conflicts"], 1)
+        sides = sorted(
+            [
+                (self.first.journal.replica_id, "from a\n"),
+                (self.second.journal.replica_id, "from b\n"),
+            ]
+        )
+        (left_label, left_text), (right_label, right_text) = sides
+        self.assertIn(
+            f"line 6\n<<<<<<< {left_label}\n{left_text}=======\n"
+            f"{right_text}>>>>>>> {right_label}\nline 8\n",
+            content,
+        )
+
+    def test_edit_wins_over_delete(self):
+        edited = BASE_TEXT.replace("line 9\n", "kept\n")
+        self.first.delete_note("shared")
+        self.second.save_note("shared", edited)
+
+        self.sync_round()
+
+        self.assertEqual(self.assert_converged("shared"), edited)
+
+    def test_delete_propagates_without_concurrent_edit(self):
+        self.first.delete_note("shared")
+
+        self.sync_round()
+
+        self.assertFalse(self.second.note_exists("shared"))
+
+    def test_replicas_converge_after_one_round_trip(self):
+        self.first.save_note("shared", BASE_TEXT.replace("line 1\n", "a\n"))
+        self.first.save_note("only a", "a")
+        self.second.save_note("shared", BASE_TEXT.replace("line 18\n", "b\n"))
+        self.second.save_note("only b", "b")
+
+        self.sync_round()
+
+        for title in ("shared", "only a", "only b"):
+            self.assert_converged(title)
+        for db_manager in (self.first, self.second):
+            report = self.sync(db_manager)
+            self.assertEqual((report["sent"], report["received"]), (0, 0))
+
+    def test_edit_pending_in_writer_is_merged_not_overwritten(self):
+        self.second.save_note("shared", BASE_TEXT.replace("line 2\n", "from b\n"))
+        self.second.flush()
+        SyncEngine(self.second, self.sync_dir).sync()
+
+        self.first.writer.delay = 30
+        engine = SyncEngine(self.first, self.sync_dir)
+        receive_from = engine.receive_from
+
+        def edit_while_syncing(peer, report):
+            self.first.save_note(
+                "shared", BASE_TEXT.replace("line 15\n", "from a\n")
+            )
+            receive_from(peer, report)
+
+        engine.receive_from = edit_while_syncing
+        engine.sync()
+        self.first.writer.delay = 0
+        self.sync_round()
+
+        for db_manager in (self.first, self.second):
+            content = db_manager.load_note("shared")
+            self.assertIn("from a\n", content)
+            self.assertIn("from b\n", content)
+            self.assertNotIn("<<<<<<<", content)
+
+
+if __name__ == "__main__":
+    unittest.main()
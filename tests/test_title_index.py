@@ -0,0 +1,132 @@
+import unittest
+
+from src.title_index import TitleIndex, fuzzy_pattern, normalize_title, rank_match
+
+
+TITLES = [
+    "Project plan",
+    "Meeting notes",
+    "project",
+    "Side projects",
+    "Reproject budget",
+    "Café recipes",
+    "Groceries",
+]
+
+
+def loaded_index(titles=TITLES):
+    index = TitleIndex()
+    index.load(list(titles))
+    return index
+
+
+class RankMatchTest(unittest.TestCase):
+    def rank(self, query, title):
+        key = normalize_title(query)
+        return rank_match(key, normalize_title(title), fuzzy_pattern(key))
+
+    def test_closer_matches_rank_first(self):
+        ranks = [
+            self.rank("plan", "plan"),
+            self.rank("plan", "plans"),
+            self.rank("plan", "project plan"),
+            self.rank("plan", "airplane"),
+            self.rank("plan", "pelican"),
+        ]
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual([rank[0] for rank in ranks], [0, 1, 2, 3, 4])
+        self.assertIsNone(self.rank("plan", "groceries"))
+
+    def test_tighter_fuzzy_matches_rank_first(self):
+        self.assertLess(self.rank("pn", "p-n"), self.rank("pn", "p----n"))
+
+    def test_titles_are_folded_for_matching(self):
+        self.assertEqual(normalize_title("Café Ünïcode"), "cafe unicode")
+        self.assertEqual(normalize_title("Straße"), "strasse")
+
+
+class TitleIndexTest(unittest.TestCase):
+    def test_search_before_loading_returns_none(self):
+        index = TitleIndex()
+        self.assertIsNone(index.search("plan"))
+        self.assertEqual(index.search("   "), [])
+
+    def test_prefix_matches_come_before_word_and_inner_matches(self):
+        index = loaded_index()
+        self.assertEqual(
+            index.search("project"),
+            ["project", "Project plan", "Side projects", "Reproject budget"],
+        )
+        self.assertEqual(index.search("PLAN"), ["Project plan"])
+        self.assertEqual(index.search("cafe"), ["Café recipes"])
+
+    def test_fuzzy_matches_skip_characters(self):
+        index = loaded_index()
+        self.assertEqual(index.search("prjpln"), ["Project plan"])
+        self.assertEqual(index.search("mtng"), ["Meeting notes"])
+        self.assertEqual(index.search("zzz"), [])
+
+    def test_newer_titles_win_ties(self):
+        index = loaded_index(["note b", "note a"])
+        self.assertEqual(index.search("note"), ["note b", "note a"])
+        index.add("note c")
+        self.assertEqual(index.search("note")[0], "note c")
+
+    def test_narrowing_a_query_matches_a_fresh_search(self):
+        index = loaded_index()
+        for query in ["p", "pr", "pro", "proj", "proje", "projp", "projpl"]:
+            self.assertEqual(index.search(query), loaded_index().search(query))
+        index.add("Pro tips")
+        self.assertIn("Pro tips", index.search("pro"))
+
+    def test_add_and_discard_after_loading(self):
+        index = loaded_index()
+        index.add("Groceries list")
+        index.discard("Groceries")
+        index.discard("missing")
+        self.assertEqual(index.search("groc"), ["Groceries list"])
+        index.add("Groceries list")
+        self.assertEqual(index.search("groc"), ["Groceries list"])
+
+    def test_changes_during_loading_are_replayed(self):
+        index = TitleIndex()
+        replay = index.start_load()
+        self.assertIsNone(index.start_load())
+        index.add("Added while loading")
+        index.discard("Groceries")
+        index.load(list(TITLES), replay)
+
+        self.assertTrue(index.loaded)
+        self.assertEqual(index.search("added"), ["Added while loading"])
+        self.assertEqual(index.search("groceries"), [])
+
+    def test_stale_load_is_ignored(self):
+        index = TitleIndex()
+        stale = index.start_load()
+        index.unload()
+        self.assertIsNone(index.search("plan"))
+        index.load(list(TITLES), stale)
+        self.assertFalse(index.loaded)
+
+    def test_discarding_many_titles_rebuilds_the_index(self):
+        titles = [f"note {number:04d}" for number in range(1100)]
+        index = loaded_index(titles[::-1])
+        for title in titles[:1025]:
+            index.discard(title)
+
+        self.assertEqual(index.dead, 0)
+        self.assertEqual(len(index.titles), 75)
+        self.assertEqual(index.search("note 1050"), ["note 1050"])
+        self.assertEqual(index.search("note 0001"), [])
+        self.assertEqual(index.search("nt1099"), ["note 1099"])
+        self.assertEqual(index.search("note 109")[0], "note 1099")
+
+    def test_large_alphabets_use_byte_masks(self):
+        titles = [f"title {chr(0x4E00 + number)}" for number in range(200)]
+        index = loaded_index(titles)
+        self.assertEqual(index.search(chr(0x4E00 + 7)), [titles[7]])
+        self.assertEqual(sorted(index.search("tl", 300)), sorted(titles))
+
+
+if __name__ == "__main__":
+    unittest.main()